@@ -1,18 +1,45 @@
+import time
+
+_STARTUP_T0 = time.perf_counter()
+
 import os
 import sys
 import traceback
 from pathlib import Path
-from typing import Optional
-import shutil
+from typing import TYPE_CHECKING, Optional
 import subprocess
-import json
-import time
-import math
 import logging
+import threading
+from collections import OrderedDict
+
+_STARTUP_MARKS: list[tuple[str, float]] = [("stdlib imported", time.perf_counter())]
 
-import cv2
 from PySide6 import QtCore, QtGui, QtWidgets
-__version__ = "0.1.2"
+
+_STARTUP_MARKS.append(("PySide6 imported", time.perf_counter()))
+
+from frame2image import __version__
+from frame2image.archive import DEFAULT_SHARD_MB
+from frame2image.backends import registered_backends
+from frame2image.batch import BatchJob, BatchScheduler
+from frame2image.encoders import DEFAULT_PRESET, PNG_FILTERS, PRESETS, get_format, measure_png_levels, registered_formats
+from frame2image.engine import ExtractionEngine, default_encoder_threads
+from frame2image.thumbnails import generate_thumbnails
+from frame2image.probe import (
+    ffmpeg_capabilities,
+    find_ffmpeg,
+    format_seconds,
+    parse_time_to_seconds,
+    KeyframeIndex,
+    probe_video_metadata_with_ffprobe,
+)
+
+_STARTUP_MARKS.append(("frame2image imported", time.perf_counter()))
+
+if TYPE_CHECKING:
+    # OpenCV is imported lazily (preview worker / background probes) to keep startup fast
+    import cv2
+
 # Lightweight logging setup
 logger = logging.getLogger("frame2image")
 if not logging.getLogger().handlers:
@@ -22,298 +49,26 @@ if not logging.getLogger().handlers:
     )
 
 # -------------------------
-# Probe helpers (ffprobe)
+# Startup profiling (--profile-startup)
 # -------------------------
-def _ffprobe_path() -> Optional[str]:
-    """Locate ffprobe, preferring bundled copies over system PATH."""
-    try:
-        meipass = getattr(sys, "_MEIPASS", None)
-        if meipass:
-            cand = Path(meipass) / ("ffprobe.exe" if os.name == "nt" else "ffprobe")
-            if cand.exists():
-                return str(cand)
-    except Exception:
-        pass
-    try:
-        exe_dir = Path(sys.executable).parent
-        cand = exe_dir / ("ffprobe.exe" if os.name == "nt" else "ffprobe")
-        if cand.exists():
-            return str(cand)
-    except Exception:
-        pass
-    try:
-        script_dir = Path(__file__).resolve().parent
-        cand = script_dir / ("ffprobe.exe" if os.name == "nt" else "ffprobe")
-        if cand.exists():
-            return str(cand)
-    except Exception:
-        pass
-    p = shutil.which("ffprobe")
-    if p:
-        return p
-    return None
-
-
-def _parse_fraction(frac: str) -> Optional[float]:
-    try:
-        if not frac or frac.upper() == "N/A":
-            return None
-        if "/" in frac:
-            n, d = frac.split("/", 1)
-            n = float(n)
-            d = float(d)
-            if d == 0:
-                return None
-            return n / d
-        # plain number
-        return float(frac)
-    except Exception:
-        return None
+_profile_startup = False
 
 
-def probe_total_frames_with_ffprobe(video_path: str) -> tuple[int, bool]:
-    """Return (frames, exact) using ffprobe when available.
-    exact=True when coming from nb_frames; otherwise an approximation via duration*fps.
-    """
-    fp = _ffprobe_path()
-    if not fp:
-        return 0, False
-    try:
-        cmd = [
-            fp,
-            "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=nb_frames,avg_frame_rate,r_frame_rate:format=duration",
-            "-of", "json",
-            video_path,
-        ]
-        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(out.stdout or "{}")
-        streams = data.get("streams", [])
-        fmt = data.get("format", {})
-        nb_frames_val = None
-        if streams:
-            nb_frames_val = streams[0].get("nb_frames")
-            avg_fr = _parse_fraction(streams[0].get("avg_frame_rate"))
-            r_fr = _parse_fraction(streams[0].get("r_frame_rate"))
-        else:
-            avg_fr = None
-            r_fr = None
-        # Prefer exact nb_frames when numeric
-        try:
-            if nb_frames_val not in (None, "N/A"):
-                frames = int(nb_frames_val)
-                if frames > 0:
-                    return frames, True
-        except Exception:
-            pass
-        # Approximate via duration * fps
-        dur_s = None
-        try:
-            d = fmt.get("duration")
-            if d and d != "N/A":
-                dur_s = float(d)
-        except Exception:
-            dur_s = None
-        fps = avg_fr or r_fr
-        if dur_s and fps and fps > 0:
-            frames = int(round(dur_s * fps))
-            if frames > 0:
-                return frames, False
-    except Exception:
-        pass
-    return 0, False
-
-
-# -------------------------
-# Additional probe helpers and time parsing
-# -------------------------
-def probe_video_metadata_with_ffprobe(video_path: str) -> dict:
-    """Return metadata dict using ffprobe when available.
-    Keys: frames, frames_exact, duration, fps, width, height, codec
-    Missing values will be None/0.
-    """
-    meta = {
-        "frames": 0,
-        "frames_exact": False,
-        "duration": None,
-        "fps": None,
-        "width": None,
-        "height": None,
-        "codec": None,
-    }
-    fp = _ffprobe_path()
-    if not fp:
-        return meta
-    try:
-        cmd = [
-            fp,
-            "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries",
-            "stream=nb_frames,avg_frame_rate,r_frame_rate,width,height,codec_name:format=duration",
-            "-of", "json",
-            video_path,
-        ]
-        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(out.stdout or "{}")
-        streams = data.get("streams", [])
-        fmt = data.get("format", {})
-
-        if streams:
-            s0 = streams[0]
-            # Frames
-            nb_frames_val = s0.get("nb_frames")
-            try:
-                if nb_frames_val not in (None, "N/A"):
-                    meta["frames"] = int(nb_frames_val)
-                    if meta["frames"] > 0:
-                        meta["frames_exact"] = True
-            except Exception:
-                pass
-            # FPS
-            avg_fr = _parse_fraction(s0.get("avg_frame_rate"))
-            r_fr = _parse_fraction(s0.get("r_frame_rate"))
-            meta["fps"] = avg_fr or r_fr
-            # Geometry
-            try:
-                meta["width"] = int(s0.get("width")) if s0.get("width") else None
-            except Exception:
-                meta["width"] = None
-            try:
-                meta["height"] = int(s0.get("height")) if s0.get("height") else None
-            except Exception:
-                meta["height"] = None
-            meta["codec"] = s0.get("codec_name")
+def startup_mark(name: str) -> None:
+    """Record a startup milestone; printed to stderr when --profile-startup is given."""
+    now = time.perf_counter()
+    if not _profile_startup:
+        return
+    prev = _STARTUP_MARKS[-1][1] if _STARTUP_MARKS else _STARTUP_T0
+    _STARTUP_MARKS.append((name, now))
+    print(f"[startup] {1000.0 * (now - _STARTUP_T0):8.1f} ms  (+{1000.0 * (now - prev):7.1f})  {name}", file=sys.stderr, flush=True)
 
-        # Duration
-        try:
-            d = fmt.get("duration")
-            if d and d != "N/A":
-                meta["duration"] = float(d)
-        except Exception:
-            meta["duration"] = None
 
-        # If frames unknown, approximate
-        if not meta["frames"] and meta["duration"] and meta["fps"]:
-            try:
-                est = int(round(meta["duration"] * meta["fps"]))
-                if est > 0:
-                    meta["frames"] = est
-                    meta["frames_exact"] = False
-            except Exception:
-                pass
-    except Exception:
-        pass
-    return meta
-
-
-def probe_total_frames_precise_ffprobe(video_path: str) -> int:
-    """Use ffprobe -count_frames to get precise frame count when possible (can be slow)."""
-    fp = _ffprobe_path()
-    if not fp:
-        return 0
-    try:
-        cmd = [
-            fp,
-            "-v", "error",
-            "-count_frames",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=nb_read_frames",
-            "-of", "json",
-            video_path,
-        ]
-        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(out.stdout or "{}")
-        streams = data.get("streams", [])
-        if streams:
-            val = streams[0].get("nb_read_frames")
-            try:
-                frames = int(val)
-                return frames if frames > 0 else 0
-            except Exception:
-                return 0
-    except Exception:
-        return 0
-    return 0
-
-
-def parse_time_to_seconds(s: Optional[str]) -> Optional[float]:
-    """Parse 'HH:MM:SS(.ms)' or 'MM:SS(.ms)' or 'SS(.ms)' into seconds."""
-    if not s:
-        return None
-    s = s.strip()
-    if not s:
-        return None
-    try:
-        parts = s.split(":")
-        parts = [p.strip() for p in parts]
-        if len(parts) == 1:
-            return float(parts[0])
-        if len(parts) == 2:
-            m = float(parts[0])
-            sec = float(parts[1])
-            return m * 60 + sec
-        if len(parts) == 3:
-            h = float(parts[0])
-            m = float(parts[1])
-            sec = float(parts[2])
-            return h * 3600 + m * 60 + sec
-    except Exception:
-        return None
-    return None
-
-
-def format_seconds(secs: float) -> str:
-    try:
-        secs = max(0, int(round(secs)))
-        h = secs // 3600
-        m = (secs % 3600) // 60
-        s = secs % 60
-        if h > 0:
-            return f"{h:d}:{m:02d}:{s:02d}"
-        return f"{m:d}:{s:02d}"
-    except Exception:
-        return "--:--"
-
-
-def _ffmpeg_path_global() -> Optional[str]:
-    """Locate ffmpeg similarly to the worker method."""
-    try:
-        meipass = getattr(sys, "_MEIPASS", None)
-        if meipass:
-            cand = Path(meipass) / ("ffmpeg.exe" if os.name == "nt" else "ffmpeg")
-            if cand.exists():
-                return str(cand)
-    except Exception:
-        pass
-    try:
-        exe_dir = Path(sys.executable).parent
-        cand = exe_dir / ("ffmpeg.exe" if os.name == "nt" else "ffmpeg")
-        if cand.exists():
-            return str(cand)
-    except Exception:
-        pass
-    try:
-        script_dir = Path(__file__).resolve().parent
-        cand = script_dir / ("ffmpeg.exe" if os.name == "nt" else "ffmpeg")
-        if cand.exists():
-            return str(cand)
-    except Exception:
-        pass
-    p = shutil.which("ffmpeg")
-    if p:
-        return p
-    return None
-
-
-def ffmpeg_supports_cuda(ffmpeg_path: str) -> bool:
-    try:
-        out = subprocess.run([ffmpeg_path, "-hide_banner", "-hwaccels"], capture_output=True, text=True, check=True)
-        txt = (out.stdout + out.stderr).lower()
-        return ("cuda" in txt) or ("nvdec" in txt)
-    except Exception:
-        return False
+def _report_import_marks() -> None:
+    prev = _STARTUP_T0
+    for name, t in _STARTUP_MARKS:
+        print(f"[startup] {1000.0 * (t - _STARTUP_T0):8.1f} ms  (+{1000.0 * (t - prev):7.1f})  {name}", file=sys.stderr, flush=True)
+        prev = t
 
 
 # -------------------------
@@ -374,500 +129,251 @@ def apply_dark_theme(app: QtWidgets.QApplication) -> None:
 # Worker for frame extraction
 # -------------------------
 class FrameExtractorWorker(QtCore.QObject):
+    """Runs an ExtractionEngine on a QThread and relays its callbacks as Qt signals."""
+
     progress = QtCore.Signal(int, int)  # current, total (total may be 0 if unknown)
     message = QtCore.Signal(str)
     finished = QtCore.Signal(bool, bool, str, int)  # success, canceled, out_dir, frames_saved
     error = QtCore.Signal(str)
 
-    def __init__(self, video_path: str, output_folder: str, start_time: Optional[float] = None, end_time: Optional[float] = None, precision_count: bool = False,
-                 out_format: str = "png", jpeg_quality: int = 90, sample_every_n: int = 1, sample_every_t: float = 0.0):
+    def __init__(self, video_path: str, output_folder: str, **options):
         super().__init__()
-        self.video_path = Path(video_path)
-        self.output_folder = Path(output_folder)
-        self._cancel = False
-        self.start_time = start_time
-        self.end_time = end_time
-        self.precision_count = precision_count
-        # Output options
-        of = (out_format or "png").strip().lower()
-        if of in {"jpg", "jpeg"}:
-            of = "jpeg"
-        elif of != "png":
-            of = "png"
-        self.out_format = of  # "png" or "jpeg"
-        self.jpeg_quality = int(max(1, min(100, jpeg_quality)))
-        # Sampling options
-        self.sample_every_n = int(max(1, sample_every_n))
-        self.sample_every_t = float(max(0.0, sample_every_t))
-        logger.debug(
-            "Worker init: video=%s, out=%s, range=(%s,%s), precision=%s, format=%s, jpeg_q=%s, every_n=%s, every_t=%s",
-            self.video_path,
-            self.output_folder,
-            self.start_time,
-            self.end_time,
-            self.precision_count,
-            self.out_format,
-            self.jpeg_quality,
-            self.sample_every_n,
-            self.sample_every_t,
+        self.engine = ExtractionEngine(
+            video_path,
+            output_folder,
+            on_progress=self.progress.emit,
+            on_message=self.message.emit,
+            **options,
         )
 
-    # --------- FFmpeg helpers ---------
-    def _ffmpeg_path(self) -> Optional[str]:
-        # Prefer bundled FFmpeg first, then fall back to system PATH
-        # 1) PyInstaller onefile extraction dir
-        try:
-            meipass = getattr(sys, "_MEIPASS", None)
-            if meipass:
-                cand = Path(meipass) / ("ffmpeg.exe" if os.name == "nt" else "ffmpeg")
-                if cand.exists():
-                    return str(cand)
-        except Exception:
-            pass
-        # 2) Next to the executable (onedir builds)
-        try:
-            exe_dir = Path(sys.executable).parent
-            cand = exe_dir / ("ffmpeg.exe" if os.name == "nt" else "ffmpeg")
-            if cand.exists():
-                return str(cand)
-        except Exception:
-            pass
-        # 3) Next to the script (dev mode)
+    @QtCore.Slot()
+    def run(self) -> None:
         try:
-            script_dir = Path(__file__).resolve().parent
-            cand = script_dir / ("ffmpeg.exe" if os.name == "nt" else "ffmpeg")
-            if cand.exists():
-                return str(cand)
-        except Exception:
-            pass
-        # 4) System PATH
-        p = shutil.which("ffmpeg")
-        if p:
-            return p
-        return None
+            result = self.engine.run()
+            self.finished.emit(result.success, result.canceled, result.out_dir, result.frames_saved)
+        except Exception as e:
+            err = f"Error: {e}\n\n{traceback.format_exc()}"
+            self.error.emit(err)
+            logger.exception("Worker error: %s", e)
 
-    def _ffmpeg_supports_cuda(self, ffmpeg_path: str) -> bool:
-        try:
-            out = subprocess.run([ffmpeg_path, "-hide_banner", "-hwaccels"], capture_output=True, text=True, check=True)
-            txt = (out.stdout + out.stderr).lower()
-            return ("cuda" in txt) or ("nvdec" in txt)
-        except Exception:
-            return False
+    def cancel(self) -> None:
+        self.engine.cancel()
+        logger.info("Worker cancel requested")
 
-    def _run_ffmpeg_nvdec(self, ffmpeg_path: str, out_dir: Path, pad: int, total_frames: int, start_s: Optional[float], end_s: Optional[float]) -> int:
-        """Run FFmpeg with NVDEC (CUDA) to dump frames respecting output format and sampling. Returns frames_saved.
-        Emits progress and respects cancellation.
-        """
-        # Ensure output dir exists
-        out_dir.mkdir(parents=True, exist_ok=True)
-        # Pattern and quality/filters
-        ext = "jpg" if self.out_format == "jpeg" else "png"
-        pattern = str(out_dir / f"frame_%0{pad}d.{ext}")
-        # Build seek args
-        seek_args = []
-        dur_args = []
-        if start_s is not None and start_s > 0:
-            seek_args += ["-ss", f"{start_s:.3f}"]
-        if end_s is not None and (start_s is not None) and (end_s > start_s):
-            dur = max(0.0, end_s - start_s)
-            dur_args += ["-t", f"{dur:.3f}"]
-        # Build sampling filter
-        vf_filters: list[str] = []
-        if self.sample_every_t and self.sample_every_t > 0:
-            try:
-                rate = 1.0 / float(self.sample_every_t)
-                if rate > 0:
-                    vf_filters.append(f"fps=fps={rate:.6f}")
-            except Exception:
-                pass
-        elif self.sample_every_n and self.sample_every_n > 1:
-            # select every Nth decoded frame
-            vf_filters.append(f"select=not(mod(n\\,{self.sample_every_n}))")
-        vsync_args = ["-vsync", "vfr"] if vf_filters else ["-vsync", "0"]
-        # Quality/format args
-        quality_args: list[str] = []
-        if self.out_format == "jpeg":
-            # Map 1..100 -> qscale 31..2 (lower is better)
-            qscale = int(round(31 - (self.jpeg_quality / 100.0) * 29))
-            qscale = max(2, min(31, qscale))
-            quality_args += ["-q:v", str(qscale)]
-        else:
-            quality_args += ["-compression_level", "3"]
-        cmd = [
-            ffmpeg_path,
-            "-hide_banner",
-            "-y",
-            "-hwaccel", "cuda",
-            *seek_args,
-            "-i", str(self.video_path),
-            *dur_args,
-            *( ["-vf", ",".join(vf_filters)] if vf_filters else [] ),
-            *vsync_args,
-            "-start_number", "1",
-            *quality_args,
-            pattern,
-            "-progress", "pipe:1",
-            "-nostats",
-            "-loglevel", "error",
-        ]
-
-        self.message.emit("Using FFmpeg (NVDEC) for GPU-accelerated decoding…")
-        logger.info("FFmpeg NVDEC path engaged: %s", ffmpeg_path)
-        logger.debug("FFmpeg command: %s", " ".join(cmd))
-        if total_frames > 0:
-            self.progress.emit(0, total_frames)
-        else:
-            self.progress.emit(0, 0)
-
-        proc = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
-        )
 
-        saved = 0
-        try:
-            assert proc.stdout is not None
-            for line in proc.stdout:
-                if self._cancel:
-                    try:
-                        proc.terminate()
-                    except Exception:
-                        pass
-                    break
-                line = line.strip()
-                if line.startswith("frame="):
-                    try:
-                        saved = int(line.split("=", 1)[1].strip())
-                    except Exception:
-                        continue
-                    if total_frames > 0:
-                        self.progress.emit(min(saved, total_frames), total_frames)
-                    else:
-                        self.progress.emit(saved, 0)
-                elif line.startswith("progress=") and line.endswith("end"):
-                    # FFmpeg reports completion
-                    pass
+class BatchWorker(QtCore.QObject):
+    """Runs a BatchScheduler on a QThread and relays job updates as Qt signals."""
 
-            proc.wait()
-            if self._cancel:
-                # Determine how many files actually exist in case last frame count wasn't read
-                try:
-                    saved = sum(1 for _ in out_dir.glob(f"frame_*.{ext}"))
-                except Exception:
-                    pass
-                logger.info("FFmpeg NVDEC canceled by user; saved=%d", saved)
-                return saved
+    job_updated = QtCore.Signal(int, str, int, int)  # index, status, current, total
+    progress = QtCore.Signal(int, int, float)  # frames done, frames total (0 if unknown), aggregate fps
+    finished = QtCore.Signal(str)  # summary
 
-            if proc.returncode != 0:
-                err = ""
-                try:
-                    if proc.stderr is not None:
-                        err = proc.stderr.read()
-                except Exception:
-                    pass
-                logger.error("FFmpeg NVDEC failed with code %s", proc.returncode)
-                raise RuntimeError(f"FFmpeg failed (exit {proc.returncode}).\n{err}")
+    def __init__(self, jobs: list[BatchJob], concurrency: int):
+        super().__init__()
+        self.scheduler = BatchScheduler(jobs, concurrency, on_job_update=self._on_job_update)
 
-            if saved == 0:
-                # Fallback to counting files if 'frame=' wasn't seen
-                try:
-                    saved = sum(1 for _ in out_dir.glob(f"frame_*.{ext}"))
-                except Exception:
-                    saved = 0
-            return saved
-        finally:
-            try:
-                if proc.stdout is not None:
-                    proc.stdout.close()
-            except Exception:
-                pass
-            try:
-                if proc.stderr is not None:
-                    proc.stderr.close()
-            except Exception:
-                pass
+    def _on_job_update(self, index: int, job: BatchJob) -> None:
+        current = job.frames_saved if job.status in ("done", "canceled") else job.current
+        self.job_updated.emit(index, job.status, current, job.total)
+        done, total, fps = self.scheduler.aggregate()
+        self.progress.emit(done, total, fps)
 
     @QtCore.Slot()
     def run(self) -> None:
         try:
-            logger.info("Worker run start: %s", self.video_path)
-            if not self.video_path.exists():
-                raise FileNotFoundError(f"Video not found: {self.video_path}")
-
-            # Probe metadata
-            meta = probe_video_metadata_with_ffprobe(str(self.video_path))
-            fps_val = meta.get("fps")
-            # Total frames for whole video (prefer precision if requested)
-            total_full = 0
-            if self.precision_count:
-                total_full = probe_total_frames_precise_ffprobe(str(self.video_path))
-            if total_full <= 0:
-                total_full = int(meta.get("frames") or 0)
-            # Apply time range window to compute frames_in_range (approx if needed)
-            start_s = self.start_time or 0.0
-            end_s = self.end_time if (self.end_time is not None and (self.end_time > start_s)) else None
-            frames_in_range = total_full
-            if (self.start_time is not None or end_s is not None) and fps_val:
-                try:
-                    sf = int(max(0, round(start_s * fps_val)))
-                    ef = int(round((end_s * fps_val))) if end_s is not None else total_full
-                    if total_full > 0:
-                        ef = min(ef, total_full)
-                    frames_in_range = max(0, ef - sf)
-                except Exception:
-                    frames_in_range = 0
-            # Fallback to OpenCV count if still unknown
-            if frames_in_range is None or frames_in_range <= 0:
-                cap_count = cv2.VideoCapture(str(self.video_path))
-                if cap_count.isOpened():
-                    try:
-                        total_frames_cv = int(cap_count.get(cv2.CAP_PROP_FRAME_COUNT))
-                        if total_frames_cv > 0:
-                            if (self.start_time is not None or end_s is not None) and fps_val:
-                                try:
-                                    sf = int(max(0, round(start_s * fps_val)))
-                                    ef = int(round((end_s * fps_val))) if end_s is not None else total_frames_cv
-                                    frames_in_range = max(0, min(total_frames_cv, ef) - sf)
-                                except Exception:
-                                    frames_in_range = total_frames_cv
-                            else:
-                                frames_in_range = total_frames_cv
-                        else:
-                            frames_in_range = 0
-                    finally:
-                        cap_count.release()
-                else:
-                    frames_in_range = 0
+            self.scheduler.run()
+        except Exception:
+            logger.exception("Batch worker error")
+        self.finished.emit(self.scheduler.summary())
 
-            # Adjust expected total for sampling
-            frames_planned = frames_in_range
-            if self.sample_every_t and self.sample_every_t > 0:
-                # Estimate by duration window / T
-                window_dur = None
-                try:
-                    if end_s is not None:
-                        window_dur = max(0.0, end_s - start_s)
-                    else:
-                        d = meta.get("duration")
-                        if d is not None:
-                            window_dur = max(0.0, float(d) - start_s)
-                except Exception:
-                    window_dur = None
-                if window_dur is not None and window_dur > 0:
-                    try:
-                        frames_planned = max(1, int(math.floor(window_dur / self.sample_every_t)) + 1)
-                    except Exception:
-                        frames_planned = 0
-                else:
-                    # Unknown
-                    frames_planned = 0
-            elif self.sample_every_n and self.sample_every_n > 1 and frames_in_range and frames_in_range > 0:
-                try:
-                    frames_planned = int(math.ceil(frames_in_range / self.sample_every_n))
-                except Exception:
-                    frames_planned = frames_in_range
-
-            # Build output directory: <chosen_out>/<video_stem>_frames or unique suffix
-            base_out = self.output_folder / f"{self.video_path.stem}_frames"
-            out_dir = base_out
-            idx_suffix = 1
-            while out_dir.exists():
-                # If exists and contains prior files, create a unique suffixed dir
-                out_dir = base_out.parent / f"{base_out.name}_{idx_suffix}"
-                idx_suffix += 1
-            out_dir.mkdir(parents=True, exist_ok=True)
-
-            # Filename padding
-            pad = len(str(frames_planned)) if frames_planned and frames_planned > 0 else 6
-
-            # Prefer FFmpeg with NVDEC (CUDA) if available; fall back to OpenCV
-            ffmpeg_path = self._ffmpeg_path()
-            if ffmpeg_path and self._ffmpeg_supports_cuda(ffmpeg_path):
-                try:
-                    saved = self._run_ffmpeg_nvdec(ffmpeg_path, out_dir, pad, frames_planned or 0, start_s if self.start_time else 0.0, end_s)
-                    if self._cancel:
-                        self.message.emit("Canceled by user.")
-                        self.finished.emit(False, True, str(out_dir), saved)
-                    else:
-                        if frames_planned and frames_planned > 0:
-                            self.progress.emit(min(saved, frames_planned), frames_planned)
-                        self.message.emit("Done.")
-                        self.finished.emit(True, False, str(out_dir), saved)
-                    logger.info("Worker completed via FFmpeg NVDEC: canceled=%s saved=%d", self._cancel, saved)
-                    return
-                except Exception as e_ff:
-                    # Inform user and continue with CPU fallback
-                    self.message.emit(f"FFmpeg GPU path failed, falling back to CPU (OpenCV)…\n{e_ff}")
-                    logger.warning("FFmpeg NVDEC path failed; falling back to OpenCV: %s", e_ff)
-
-            # ---------- OpenCV CPU fallback ----------
-            logger.info("Starting OpenCV CPU fallback for extraction")
-            cap = cv2.VideoCapture(str(self.video_path))
-            if not cap.isOpened():
-                raise RuntimeError("Failed to open video. Try installing codecs/FFmpeg or a different file.")
-
-            # Seek to start time if specified
-            if self.start_time and self.start_time > 0:
-                try:
-                    cap.set(cv2.CAP_PROP_POS_MSEC, self.start_time * 1000.0)
-                except Exception:
-                    pass
+    def cancel(self) -> None:
+        self.scheduler.cancel()
 
-            # Choose output format params
-            if self.out_format == "jpeg":
-                img_params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
-                out_ext = "jpg"
-            else:
-                img_params = [cv2.IMWRITE_PNG_COMPRESSION, 3]  # lossless; 0-9 only changes size/speed
-                out_ext = "png"
 
-            self.message.emit("Starting extraction…")
-            if frames_in_range and frames_in_range > 0:
-                self.progress.emit(0, frames_in_range)
-            else:
-                self.progress.emit(0, 0)
+# -------------------------
+# Main Window
+# -------------------------
+class PreviewFrameCache:
+    """Least-recently-used store of decoded preview images, bounded by a byte budget."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self.bytes = 0
+        self._items: "OrderedDict[int, QtGui.QImage]" = OrderedDict()
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._items
+
+    def get(self, key: int) -> Optional[QtGui.QImage]:
+        img = self._items.get(key)
+        if img is not None:
+            self._items.move_to_end(key)
+        return img
+
+    def put(self, key: int, img: QtGui.QImage) -> None:
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= old.sizeInBytes()
+        size = img.sizeInBytes()
+        if size > self.max_bytes:
+            return
+        self._items[key] = img
+        self.bytes += size
+        self._trim()
 
-            saved = 0
-            throttle = 10  # emit progress every N frames to reduce signal overhead
-            frame_index = 0  # count of frames read
-            fps_eff = None
-            if not fps_val or fps_val <= 0:
-                try:
-                    fps_eff = cap.get(cv2.CAP_PROP_FPS)
-                    if not fps_eff or fps_eff <= 0:
-                        fps_eff = None
-                except Exception:
-                    fps_eff = None
-            else:
-                fps_eff = fps_val
-            end_limit_frames = None
-            end_limit_ms = None
-            if self.end_time and (self.end_time > (self.start_time or 0)):
-                if fps_eff:
-                    try:
-                        end_limit_frames = int(round((self.end_time - (self.start_time or 0)) * fps_eff))
-                    except Exception:
-                        end_limit_frames = None
-                end_limit_ms = self.end_time * 1000.0
-            # For time-based sampling, track next timestamp to save
-            next_ms = None
-            if self.sample_every_t and self.sample_every_t > 0:
-                try:
-                    next_ms = (self.start_time or 0.0) * 1000.0
-                except Exception:
-                    next_ms = None
+    def clear(self) -> None:
+        self._items.clear()
+        self.bytes = 0
 
-            while not self._cancel:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                frame_index += 1
+    def set_max_bytes(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._trim()
 
-                # Stop at end time if defined
-                if end_limit_frames is not None and frame_index >= end_limit_frames:
-                    break
-                if end_limit_ms is not None:
-                    try:
-                        pos_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
-                        if pos_ms and pos_ms > end_limit_ms:
-                            break
-                    except Exception:
-                        pass
-
-                # Decide whether to save this frame based on sampling settings
-                do_save = False
-                if self.sample_every_t and self.sample_every_t > 0:
-                    pos_ms = None
-                    try:
-                        pos_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
-                    except Exception:
-                        pos_ms = None
-                    if (pos_ms is None) and fps_eff:
-                        try:
-                            pos_ms = (frame_index - 1) * (1000.0 / float(fps_eff))
-                        except Exception:
-                            pos_ms = None
-                    if next_ms is None and pos_ms is not None:
-                        next_ms = pos_ms
-                    if pos_ms is not None and next_ms is not None and (pos_ms + 1e-3) >= next_ms:
-                        do_save = True
-                        next_ms = next_ms + (self.sample_every_t * 1000.0)
-                elif self.sample_every_n and self.sample_every_n > 1:
-                    do_save = ((frame_index - 1) % self.sample_every_n == 0)
-                else:
-                    do_save = True
-
-                if do_save:
-                    filename = out_dir / f"frame_{saved + 1:0{pad}d}.{out_ext}"
-                    ok = cv2.imwrite(str(filename), frame, img_params)
-                    if not ok:
-                        raise RuntimeError(f"Failed to write frame to {filename}")
-                    saved += 1
-
-                if frames_planned and frames_planned > 0:
-                    if saved % throttle == 0 or saved == frames_planned:
-                        self.progress.emit(saved, frames_planned)
-                else:
-                    if saved % throttle == 0:
-                        self.progress.emit(saved, 0)
+    def _trim(self) -> None:
+        while self.bytes > self.max_bytes and self._items:
+            _key, img = self._items.popitem(last=False)
+            self.bytes -= img.sizeInBytes()
 
-            cap.release()
 
-            if self._cancel:
-                self.message.emit("Canceled by user.")
-                self.finished.emit(False, True, str(out_dir), saved)
-                logger.info("Worker canceled during OpenCV path; saved=%d", saved)
-            else:
-                # Final progress update
-                if frames_planned and frames_planned > 0:
-                    self.progress.emit(min(saved, frames_planned), frames_planned)
-                self.message.emit("Done.")
-                self.finished.emit(True, False, str(out_dir), saved)
-                logger.info("Worker finished (OpenCV path); saved=%d", saved)
-        except Exception as e:
-            # Best-effort cleanup of any OpenCV handles
-            cap = locals().get('cap', None)
-            if cap is not None:
-                try:
-                    cap.release()
-                except Exception:
-                    pass
-            cap_count = locals().get('cap_count', None)
-            if cap_count is not None:
-                try:
-                    cap_count.release()
-                except Exception:
-                    pass
-            err = f"Error: {e}\n\n{traceback.format_exc()}"
-            self.error.emit(err)
-            logger.exception("Worker error: %s", e)
+class FilmstripWidget(QtWidgets.QWidget):
+    """Row of keyframe thumbnails spanning the whole video.
 
-    def cancel(self) -> None:
-        self._cancel = True
-        logger.info("Worker cancel requested")
+    Left-click picks a Start time, right-click an End time; the selected range is
+    drawn at full brightness and the rest dimmed.
+    """
+    time_picked = QtCore.Signal(float, bool)  # seconds, is_end
+
+    def __init__(self, parent: Optional[QtWidgets.QWidget] = None):
+        super().__init__(parent)
+        self._thumbs: list[Optional[QtGui.QPixmap]] = []
+        self._duration_s: float = 0.0
+        self._range: tuple[float, Optional[float]] = (0.0, None)
+        self.setMinimumHeight(48)
+        self.setMouseTracking(True)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        self.setToolTip("Left-click: set Start here. Right-click: set End here.")
+
+    def reset(self, count: int, duration_s: float) -> None:
+        self._thumbs = [None] * max(0, int(count))
+        self._duration_s = max(0.0, float(duration_s))
+        self.update()
+
+    def set_thumbnail(self, index: int, img: QtGui.QImage) -> None:
+        if 0 <= index < len(self._thumbs) and not img.isNull():
+            self._thumbs[index] = QtGui.QPixmap.fromImage(img)
+            self.update()
+
+    def set_range(self, start_s: float, end_s: Optional[float]) -> None:
+        self._range = (max(0.0, float(start_s)), end_s)
+        self.update()
+
+    def _seconds_at(self, x: float) -> float:
+        w = max(1, self.width())
+        return max(0.0, min(1.0, x / w)) * self._duration_s
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:  # type: ignore[override]
+        p = QtGui.QPainter(self)
+        p.fillRect(self.rect(), QtGui.QColor("#111"))
+        n = len(self._thumbs)
+        if n and self._duration_s > 0:
+            slot_w = self.width() / n
+            h = self.height()
+            for i, pix in enumerate(self._thumbs):
+                x0 = int(round(i * slot_w))
+                x1 = int(round((i + 1) * slot_w))
+                cell = QtCore.QRect(x0, 0, x1 - x0, h)
+                if pix is None:
+                    p.fillRect(cell.adjusted(1, 1, -1, -1), QtGui.QColor("#1d1d1d"))
+                    continue
+                scaled = pix.scaled(cell.size(), QtCore.Qt.KeepAspectRatioByExpanding, QtCore.Qt.SmoothTransformation)
+                sx = (scaled.width() - cell.width()) // 2
+                sy = (scaled.height() - cell.height()) // 2
+                p.drawPixmap(cell, scaled, QtCore.QRect(sx, sy, cell.width(), cell.height()))
+            # Dim everything outside the selected Start/End range
+            st, et = self._range
+            x_st = int(self.width() * min(1.0, st / self._duration_s))
+            x_et = int(self.width() * min(1.0, (et if et is not None else self._duration_s) / self._duration_s))
+            shade = QtGui.QColor(0, 0, 0, 150)
+            if x_st > 0:
+                p.fillRect(QtCore.QRect(0, 0, x_st, h), shade)
+            if x_et < self.width():
+                p.fillRect(QtCore.QRect(x_et, 0, self.width() - x_et, h), shade)
+        p.setPen(QtGui.QColor("#333"))
+        p.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        p.end()
+
+    def mouseMoveEvent(self, event: QtGui.QMouseEvent) -> None:  # type: ignore[override]
+        if self._duration_s > 0:
+            secs = self._seconds_at(event.position().x())
+            QtWidgets.QToolTip.showText(event.globalPosition().toPoint(), f"{secs:.2f}s ({format_seconds(secs)})", self)
+        super().mouseMoveEvent(event)
+
+    def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:  # type: ignore[override]
+        if self._duration_s > 0 and event.button() in (QtCore.Qt.LeftButton, QtCore.Qt.RightButton):
+            self.time_picked.emit(self._seconds_at(event.position().x()), event.button() == QtCore.Qt.RightButton)
+            event.accept()
+            return
+        super().mousePressEvent(event)
 
 
-# -------------------------
-# Main Window
-# -------------------------
 class MainWindow(QtWidgets.QMainWindow):
     # Queued signal to request preview decoding at a specific millisecond timestamp
     preview_request_ms = QtCore.Signal(float)
+    # Preview cache/prefetch tuning: (slider step ms, window start ms, window end ms) and budget in MB
+    preview_prefetch_hint = QtCore.Signal(float, float, float)
+    preview_cache_budget = QtCore.Signal(int)
+    # Display size (device pixels) the preview worker scales frames down to
+    preview_target_size = QtCore.Signal(int, int)
+    # Filmstrip thumbnail decoded in the background: (video path, slot index, JPEG bytes)
+    filmstrip_thumb_ready = QtCore.Signal(str, int, object)
+    # Background metadata probe: (video path, ffprobe metadata, duration ms or None, opened by OpenCV)
+    metadata_ready = QtCore.Signal(str, object, object, bool)
+    # FFmpeg capabilities probed in the background (dict or None)
+    ffmpeg_caps_ready = QtCore.Signal(object)
+    # (rows, error) from a PNG level measurement
+    png_measure_ready = QtCore.Signal(object, object)
+
+    # Thumbnails in the filmstrip and their decoded height in pixels
+    FILMSTRIP_COUNT = 16
+    FILMSTRIP_HEIGHT = 72
+    # Keyframe index handoff: background builder -> GUI thread -> preview worker
+    keyframe_index_ready = QtCore.Signal(str, object)
+    preview_keyframes = QtCore.Signal(object)
 
     class _PreviewWorker(QtCore.QObject):
         frame_ready = QtCore.Signal(QtGui.QImage, float)
         error = QtCore.Signal(str)
 
-        def __init__(self, video_path: str):
+        # Frames decoded forward beyond the packet-index distance to the target (reordering, rounding)
+        FORWARD_SLACK_FRAMES = 16
+        # Neighbouring slider positions decoded speculatively while idle
+        PREFETCH_AHEAD = 4
+        PREFETCH_BEHIND = 2
+
+        def __init__(self, video_path: str, cache_mb: int = 256, target_size: tuple[int, int] = (0, 0)):
             super().__init__()
             self.video_path = str(video_path)
-            self._cap: Optional[cv2.VideoCapture] = None
+            # Frames are downscaled to fit this box before conversion (0 = full resolution)
+            self._target_w, self._target_h = int(target_size[0]), int(target_size[1])
+            # Decoded frames keyed by frame-quantized timestamp, plus idle prefetch queue
+            self._frames = PreviewFrameCache(int(cache_mb) * 1024 * 1024)
+            self._prefetch_queue: list[float] = []
+            self._prefetch_step_ms: float = 0.0
+            self._window: tuple[float, float] = (0.0, 0.0)
+            self._cap: Optional["cv2.VideoCapture"] = None
             self._pending_ms: Optional[float] = None
             self._working: bool = False
+            # Keyframe index (built in the background) and decoder position tracking
+            self._keyframes: Optional[KeyframeIndex] = None
+            self._pos_ms: Optional[float] = None
+            # False when the last decode stopped short of the requested time
+            self._reached: bool = True
+            self._last_frame = None
+            self._half_frame_ms: float = 1000.0 / 60.0
+
+        @QtCore.Slot(object)
+        def set_keyframe_index(self, index: Optional[KeyframeIndex]) -> None:
+            self._keyframes = index
 
         @QtCore.Slot()
         def close(self) -> None:
@@ -879,54 +385,212 @@ class MainWindow(QtWidgets.QMainWindow):
                 except Exception:
                     pass
 
+        @QtCore.Slot(float, float, float)
+        def set_prefetch_hint(self, step_ms: float, start_ms: float, end_ms: float) -> None:
+            self._prefetch_step_ms = float(step_ms)
+            self._window = (float(start_ms), float(end_ms))
+
+        @QtCore.Slot(int, int)
+        def set_target_size(self, width: int, height: int) -> None:
+            if (int(width), int(height)) == (self._target_w, self._target_h):
+                return
+            self._target_w, self._target_h = int(width), int(height)
+            # Cached images were scaled for the old size
+            self._frames.clear()
+
+        @QtCore.Slot(int)
+        def set_cache_budget_mb(self, mb: int) -> None:
+            self._frames.set_max_bytes(int(mb) * 1024 * 1024)
+
         @QtCore.Slot(float)
         def request_ms(self, ms: float) -> None:
             # Coalesce requests: always keep latest request and process sequentially
             self._pending_ms = float(ms)
+            self._prefetch_queue = []
             if not self._working:
                 self._process()
 
+        def _cache_key(self, ms: float) -> int:
+            return int(round(ms / (2.0 * self._half_frame_ms)))
+
+        def _render(self, ms: float) -> Optional[QtGui.QImage]:
+            """Return the preview image for `ms` from the cache, decoding it on a miss."""
+            import cv2
+
+            key = self._cache_key(ms)
+            cached = self._frames.get(key)
+            if cached is not None:
+                return cached
+            if not self._ensure_cap():
+                return None
+            frame = self._decode_at(ms)
+            if frame is None:
+                return None
+            if not self._reached:
+                # An earlier frame than requested: cache it only under the time it was decoded at
+                key = self._cache_key(self._pos_ms) if self._pos_ms is not None else None
+            frame = self._fit_to_target(frame)
+            h, w = frame.shape[:2]
+            # The buffer is wrapped, not copied; PySide6 keeps the array alive while the image data
+            # is shared (cache, queued signal, pixmap)
+            if sys.byteorder == "little":
+                # One BGR->BGRA pass here; Format_RGB32 is the native pixmap layout, so
+                # QPixmap.fromImage on the UI thread shares this buffer instead of converting it
+                buf = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+                qimg = QtGui.QImage(buf.data, w, h, buf.strides[0], QtGui.QImage.Format_RGB32)
+            else:
+                buf = frame if frame.flags["C_CONTIGUOUS"] else frame.copy()
+                qimg = QtGui.QImage(buf.data, w, h, buf.strides[0], QtGui.QImage.Format_BGR888)
+            if key is not None:
+                self._frames.put(key, qimg)
+            return qimg
+
+        def _fit_to_target(self, frame):
+            """Downscale `frame` to fit the display box, keeping aspect ratio (never upscales)."""
+            import cv2
+
+            tw, th = self._target_w, self._target_h
+            if tw < 2 or th < 2:
+                return frame
+            h, w = frame.shape[:2]
+            scale = min(tw / float(w), th / float(h))
+            if scale >= 1.0:
+                return frame
+            size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+            return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+        def _schedule_prefetch(self, center_ms: float) -> None:
+            step = max(self._prefetch_step_ms, 2.0 * self._half_frame_ms)
+            lo, hi = self._window
+            if step <= 0 or hi <= lo:
+                return
+            # Behind first, then ahead, so the decoder ends up past the current position
+            # where forward scrubbing can continue without a seek
+            targets = [center_ms - k * step for k in range(self.PREFETCH_BEHIND, 0, -1)]
+            targets += [center_ms + k * step for k in range(1, self.PREFETCH_AHEAD + 1)]
+            self._prefetch_queue = [t for t in targets if lo <= t <= hi and self._cache_key(t) not in self._frames]
+            if self._prefetch_queue:
+                QtCore.QTimer.singleShot(0, self._prefetch_next)
+
+        def _prefetch_next(self) -> None:
+            # One frame per event-loop turn so new requests are picked up immediately
+            if self._working or self._pending_ms is not None or not self._prefetch_queue:
+                return
+            ms = self._prefetch_queue.pop(0)
+            try:
+                self._render(ms)
+            except Exception:
+                self._prefetch_queue = []
+                return
+            if self._prefetch_queue:
+                QtCore.QTimer.singleShot(0, self._prefetch_next)
+
         def _ensure_cap(self) -> bool:
             if self._cap is None:
+                # First use imports OpenCV here, on the preview thread
+                import cv2
+
                 c = cv2.VideoCapture(self.video_path)
+                startup_mark("preview decoder opened")
                 if not c.isOpened():
                     self.error.emit("Preview unavailable (failed to open video)")
                     return False
                 self._cap = c
+                self._pos_ms = None
+                try:
+                    fps = c.get(cv2.CAP_PROP_FPS)
+                    if fps and fps > 0:
+                        self._half_frame_ms = 500.0 / float(fps)
+                except Exception:
+                    pass
             return True
 
+        def _decode_at(self, ms: float):
+            """Decode the frame shown at `ms`, returning a BGR array or None."""
+            import cv2
+
+            cap = self._cap
+            index = self._keyframes
+            self._reached = True
+            if index is None:
+                # No index yet: let OpenCV seek on its own
+                self._pos_ms = None
+                try:
+                    cap.set(cv2.CAP_PROP_POS_MSEC, ms)
+                except Exception:
+                    pass
+                ok, frame = cap.read()
+                if not ok or frame is None:
+                    # Some codecs need an extra read after seek
+                    ok, frame = cap.read()
+                return frame if ok else None
+
+            pos = self._pos_ms
+            if pos is not None and self._last_frame is not None and abs(ms - pos) <= self._half_frame_ms:
+                return self._last_frame
+            target_s = ms / 1000.0
+            # Decoding forward from the current position is cheapest unless we would pass a keyframe
+            if pos is None or ms < pos or index.has_keyframe_between(pos / 1000.0, target_s):
+                kf_ms = index.keyframe_at_or_before(target_s) * 1000.0
+                try:
+                    # Landing exactly on a keyframe makes the backend seek cheap and exact
+                    cap.set(cv2.CAP_PROP_POS_MSEC, kf_ms)
+                except Exception:
+                    pass
+                self._pos_ms = None
+                from_s = kf_ms / 1000.0
+            else:
+                from_s = pos / 1000.0
+            # Bounded by the frames between the decoder position and the target, however long the GOP
+            limit = index.packets_between(from_s, target_s + self._half_frame_ms / 1000.0) + self.FORWARD_SLACK_FRAMES
+            grabbed = False
+            self._reached = False
+            for _ in range(limit):
+                if not cap.grab():
+                    break
+                grabbed = True
+                try:
+                    self._pos_ms = float(cap.get(cv2.CAP_PROP_POS_MSEC))
+                except Exception:
+                    self._pos_ms = None
+                    break
+                if self._pos_ms + self._half_frame_ms >= ms:
+                    self._reached = True
+                    break
+            if not grabbed:
+                self._pos_ms = None
+                return None
+            ok, frame = cap.retrieve()
+            if not ok or frame is None:
+                self._pos_ms = None
+                return None
+            self._last_frame = frame
+            return frame
+
         def _process(self) -> None:
             if self._working:
                 return
             self._working = True
+            last_ms: Optional[float] = None
             try:
                 while self._pending_ms is not None:
                     ms = float(self._pending_ms)
                     self._pending_ms = None
-                    if not self._ensure_cap():
-                        break
                     try:
-                        self._cap.set(cv2.CAP_PROP_POS_MSEC, ms)
-                    except Exception:
-                        pass
-                    ok, frame = self._cap.read()
-                    if not ok or frame is None:
-                        # Some codecs need an extra read after seek
-                        ok, frame = self._cap.read()
-                    if not ok or frame is None:
-                        self.error.emit("Preview unavailable")
-                        continue
-                    try:
-                        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        h, w, ch = rgb.shape
-                        bytes_per_line = ch * w
-                        qimg = QtGui.QImage(rgb.data, w, h, bytes_per_line, QtGui.QImage.Format_RGB888).copy()
-                        self.frame_ready.emit(qimg, ms)
+                        qimg = self._render(ms)
                     except Exception as e:
                         self.error.emit(f"Preview conversion failed: {e}")
                         continue
+                    if qimg is None:
+                        if self._cap is not None:
+                            self.error.emit("Preview unavailable")
+                        continue
+                    self.frame_ready.emit(qimg, ms)
+                    last_ms = ms
             finally:
                 self._working = False
+            if last_ms is not None:
+                self._schedule_prefetch(last_ms)
 
     def __init__(self):
         super().__init__()
@@ -935,6 +599,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self._thread: Optional[QtCore.QThread] = None
         self._worker: Optional[FrameExtractorWorker] = None
+        self._batch_worker: Optional[BatchWorker] = None
         self._last_out_dir: Optional[str] = None
         self._started_at: Optional[float] = None
         self._total_for_run: Optional[int] = None
@@ -942,12 +607,14 @@ class MainWindow(QtWidgets.QMainWindow):
         self._settings: QtCore.QSettings = QtCore.QSettings("ElfyDelphi", "Frame2Image")
 
         # Preview state
-        self._preview_cap: Optional[cv2.VideoCapture] = None
+        self._preview_cap: Optional["cv2.VideoCapture"] = None
         self._preview_duration_ms: Optional[float] = None
         self._preview_window_start_ms: float = 0.0
         self._preview_window_end_ms: Optional[float] = None
         self._last_preview_qimg: Optional[QtGui.QImage] = None
+        self._last_preview_ms: Optional[float] = None
         # Async preview decoding
+        self._filmstrip_cancel: Optional[threading.Event] = None
         self._preview_thread: Optional[QtCore.QThread] = None
         self._preview_worker: Optional['MainWindow._PreviewWorker'] = None
 
@@ -955,8 +622,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setAcceptDrops(True)
 
         self._build_ui()
+        startup_mark("main window built")
         self._wire_events()
         self._load_settings()
+        startup_mark("settings restored")
+        # Detect GPU capability off the GUI thread once the event loop runs; the badge shows "Detecting…" until then
+        QtCore.QTimer.singleShot(0, self._start_capability_probe)
 
     def _build_ui(self) -> None:
         central = QtWidgets.QWidget(self)
@@ -1056,6 +727,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.preview_label.setVisible(True)
         # Re-scale the last preview image when the label resizes
         self.preview_label.installEventFilter(self)
+        self._preview_resize_timer = QtCore.QTimer(self)
+        self._preview_resize_timer.setSingleShot(True)
+        self._preview_resize_timer.setInterval(150)
+        self._preview_resize_timer.timeout.connect(self._on_preview_label_resized)
         preview_layout.addWidget(self.preview_label, 1)
 
         preview_controls = QtWidgets.QHBoxLayout()
@@ -1065,9 +740,26 @@ class MainWindow(QtWidgets.QMainWindow):
         self.preview_slider.setEnabled(False)
         self.preview_time_label = QtWidgets.QLabel("--:-- / --:--")
         self.preview_time_label.setStyleSheet("color: #bbbbbb;")
+        self.preview_cache_spin = QtWidgets.QSpinBox()
+        self.preview_cache_spin.setRange(16, 4096)
+        self.preview_cache_spin.setSingleStep(64)
+        self.preview_cache_spin.setValue(256)
+        self.preview_cache_spin.setPrefix("Cache: ")
+        self.preview_cache_spin.setSuffix(" MB")
+        self.preview_cache_spin.setToolTip(
+            "Memory budget for decoded preview frames. Recently viewed and neighbouring positions\n"
+            "are kept so scrubbing back and forth does not decode again."
+        )
+        self.preview_cache_spin.valueChanged.connect(self.preview_cache_budget)
         preview_controls.addWidget(self.preview_slider, 1)
         preview_controls.addWidget(self.preview_time_label)
+        preview_controls.addWidget(self.preview_cache_spin)
         preview_layout.addLayout(preview_controls)
+        self.filmstrip = FilmstripWidget()
+        self.filmstrip.time_picked.connect(self._on_filmstrip_time_picked)
+        self.filmstrip.setVisible(False)
+        preview_layout.addWidget(self.filmstrip)
+        self.filmstrip_thumb_ready.connect(self._on_filmstrip_thumb_ready)
 
         layout.addWidget(preview_group)
 
@@ -1079,18 +771,36 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Output format
         opts_layout.addWidget(QtWidgets.QLabel("Output format"), 0, 0)
+        format_row = QtWidgets.QHBoxLayout()
         self.format_combo = QtWidgets.QComboBox()
-        self.format_combo.addItem("PNG (lossless)", userData="png")
-        self.format_combo.addItem("JPEG (lossy)", userData="jpeg")
-        self.format_combo.setToolTip("Choose image format for extracted frames")
-        opts_layout.addWidget(self.format_combo, 0, 1)
+        for image_format in registered_formats():
+            self.format_combo.addItem(image_format.label, userData=image_format.name)
+        self.format_combo.addItem("NumPy array (.npy)", userData="npy")
+        self.format_combo.addItem("Raw BGR (.raw)", userData="raw")
+        self.format_combo.setToolTip(
+            "Choose output format for extracted frames.\n"
+            "QOI is the fastest lossless format; AVIF is encoded by OpenCV and is slow.\n"
+            "NumPy/Raw write every frame into one memory-mappable file plus a JSON sidecar\n"
+            "(shape, dtype, per-frame timestamps) instead of individual images."
+        )
+        self.preset_combo = QtWidgets.QComboBox()
+        for preset in PRESETS:
+            self.preset_combo.addItem(preset.capitalize(), userData=preset)
+        self.preset_combo.setCurrentIndex(max(0, self.preset_combo.findData(DEFAULT_PRESET)))
+        self.preset_combo.setToolTip(
+            "Encoder speed/size trade-off: Fastest uses the least CPU per frame,\n"
+            "Smallest produces the smallest files (e.g. PNG level 1 / 3 / 9)."
+        )
+        format_row.addWidget(self.format_combo, 1)
+        format_row.addWidget(self.preset_combo)
+        opts_layout.addLayout(format_row, 0, 1)
 
         # JPEG quality
         self.quality_label = QtWidgets.QLabel("Quality: 90")
         self.quality_slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
         self.quality_slider.setRange(1, 100)
         self.quality_slider.setValue(90)
-        self.quality_slider.setToolTip("JPEG quality (higher = better quality and size)")
+        self.quality_slider.setToolTip("Quality for JPEG, lossy WebP and AVIF (higher = better quality and size)")
         opts_layout.addWidget(self.quality_label, 1, 0)
         opts_layout.addWidget(self.quality_slider, 1, 1)
 
@@ -1100,7 +810,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self.sample_n_spin.setRange(1, 1000000)
         self.sample_n_spin.setValue(1)
         self.sample_n_spin.setToolTip("Save one out of every N frames (1 = all frames)")
-        opts_layout.addWidget(self.sample_n_spin, 2, 1)
+        self.keyframes_check = QtWidgets.QCheckBox("Keyframes only")
+        self.keyframes_check.setToolTip(
+            "Decode only keyframes (much faster on long videos). Every Nth then counts keyframes,\n"
+            "and every T seconds saves the keyframe nearest each T-second point."
+        )
+        sample_row = QtWidgets.QHBoxLayout()
+        sample_row.addWidget(self.sample_n_spin, 1)
+        sample_row.addWidget(self.keyframes_check)
+        opts_layout.addLayout(sample_row, 2, 1)
 
         opts_layout.addWidget(QtWidgets.QLabel("Or every T seconds"), 3, 0)
         self.sample_t_spin = QtWidgets.QDoubleSpinBox()
@@ -1112,6 +830,105 @@ class MainWindow(QtWidgets.QMainWindow):
         self.sample_t_spin.setToolTip("Time-based sampling; if > 0, overrides Nth frame option")
         opts_layout.addWidget(self.sample_t_spin, 3, 1)
 
+        # Scene-change selection
+        opts_layout.addWidget(QtWidgets.QLabel("Scene changes"), 4, 0)
+        self.scene_spin = QtWidgets.QDoubleSpinBox()
+        self.scene_spin.setRange(0.0, 1.0)
+        self.scene_spin.setDecimals(2)
+        self.scene_spin.setSingleStep(0.05)
+        self.scene_spin.setValue(0.0)
+        self.scene_spin.setSpecialValueText("Off")
+        self.scene_spin.setPrefix("Score > ")
+        self.scene_spin.setToolTip(
+            "Save only frames that start a new scene: scene score (0-1) against the previous sampled frame above\n"
+            "this value (0.3 is a good start). Applied after the sampling options; the first frame is always saved."
+        )
+        opts_layout.addWidget(self.scene_spin, 4, 1)
+
+        # Near-duplicate suppression
+        opts_layout.addWidget(QtWidgets.QLabel("Skip near-duplicates"), 5, 0)
+        self.dedup_spin = QtWidgets.QSpinBox()
+        self.dedup_spin.setRange(-1, 64)
+        self.dedup_spin.setValue(-1)
+        self.dedup_spin.setSpecialValueText("Off")
+        self.dedup_spin.setPrefix("Within ")
+        self.dedup_spin.setSuffix(" bits")
+        self.dedup_spin.setToolTip(
+            "Skip frames whose perceptual hash (64-bit dHash) differs from the last saved frame in at most this many bits\n"
+            "(0 = visually identical, 4-6 = near-duplicates). Skipped ranges are listed in duplicates.csv."
+        )
+        opts_layout.addWidget(self.dedup_spin, 5, 1)
+
+        # Encoder threads (CPU path)
+        opts_layout.addWidget(QtWidgets.QLabel("Encoder threads"), 6, 0)
+        self.encoder_threads_spin = QtWidgets.QSpinBox()
+        self.encoder_threads_spin.setRange(0, 256)
+        self.encoder_threads_spin.setValue(0)
+        self.encoder_threads_spin.setSpecialValueText(f"Auto ({default_encoder_threads()})")
+        self.encoder_threads_spin.setToolTip("Threads encoding and writing images on the CPU path (Auto = one per core)")
+        opts_layout.addWidget(self.encoder_threads_spin, 6, 1)
+
+        # Segment-parallel decoding (FFmpeg)
+        opts_layout.addWidget(QtWidgets.QLabel("Parallel segments"), 7, 0)
+        self.segments_spin = QtWidgets.QSpinBox()
+        self.segments_spin.setRange(1, 64)
+        self.segments_spin.setValue(1)
+        self.segments_spin.setToolTip("Split the range at keyframes and decode each part in its own FFmpeg process (1 = off)")
+        opts_layout.addWidget(self.segments_spin, 7, 1)
+
+        # Decoder backend
+        opts_layout.addWidget(QtWidgets.QLabel("Decoder"), 8, 0)
+        self.backend_combo = QtWidgets.QComboBox()
+        self.backend_combo.addItem("Auto (fastest measured)", userData="auto")
+        for backend in registered_backends():
+            self.backend_combo.addItem(backend.label, userData=backend.name)
+        self.backend_combo.setToolTip(
+            "Decoder used for extraction. Auto times a short decode with every available backend\n"
+            "(cached per codec and resolution) and uses the fastest; failures fall back to the next one."
+        )
+        opts_layout.addWidget(self.backend_combo, 8, 1)
+
+        # Archive shards instead of loose image files
+        opts_layout.addWidget(QtWidgets.QLabel("Pack into"), 9, 0)
+        archive_row = QtWidgets.QHBoxLayout()
+        self.archive_combo = QtWidgets.QComboBox()
+        self.archive_combo.addItem("Loose files", userData="")
+        self.archive_combo.addItem("Tar shards (WebDataset)", userData="tar")
+        self.archive_combo.addItem("Zip shards", userData="zip")
+        self.archive_combo.setToolTip(
+            "Write encoded frames into sequential tar/zip shards plus an index.csv\n"
+            "(frame -> shard, byte offset, size) instead of one file per frame."
+        )
+        self.shard_size_spin = QtWidgets.QSpinBox()
+        self.shard_size_spin.setRange(1, 1024 * 1024)
+        self.shard_size_spin.setValue(DEFAULT_SHARD_MB)
+        self.shard_size_spin.setPrefix("Shard size: ")
+        self.shard_size_spin.setSuffix(" MB")
+        self.shard_size_spin.setToolTip("A new shard is started once the current one reaches this size")
+        archive_row.addWidget(self.archive_combo, 1)
+        archive_row.addWidget(self.shard_size_spin)
+        opts_layout.addLayout(archive_row, 9, 1)
+
+        # PNG compression level / row filter, with a quick measurement on the current video
+        opts_layout.addWidget(QtWidgets.QLabel("PNG compression"), 10, 0)
+        png_row = QtWidgets.QHBoxLayout()
+        self.png_level_spin = QtWidgets.QSpinBox()
+        self.png_level_spin.setRange(-1, 9)
+        self.png_level_spin.setValue(-1)
+        self.png_level_spin.setSpecialValueText("Preset")
+        self.png_level_spin.setPrefix("Level ")
+        self.png_level_spin.setToolTip("zlib level 0-9 (0 = fastest, largest; 9 = slowest, smallest). Preset follows the preset above.")
+        self.png_filter_combo = QtWidgets.QComboBox()
+        for name in PNG_FILTERS:
+            self.png_filter_combo.addItem("Filter: auto" if name == "auto" else f"Filter: {name}", userData=name)
+        self.png_filter_combo.setToolTip("PNG row filter; auto keeps the encoder default")
+        self.png_measure_btn = QtWidgets.QPushButton("Measure")
+        self.png_measure_btn.setToolTip("Encode sample frames of the current video at every level and report ms/frame and bytes/frame")
+        png_row.addWidget(self.png_level_spin)
+        png_row.addWidget(self.png_filter_combo, 1)
+        png_row.addWidget(self.png_measure_btn)
+        opts_layout.addLayout(png_row, 10, 1)
+
         layout.addWidget(opts_group)
 
         # Controls group (no visible title)
@@ -1130,6 +947,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self.auto_open_check = QtWidgets.QCheckBox("Open folder when done")
         self.auto_open_check.setToolTip("Automatically open the output folder after a successful extraction")
         self.auto_open_check.setChecked(False)
+        self.resume_check = QtWidgets.QCheckBox("Resume unfinished run")
+        self.resume_check.setToolTip(
+            "Continue the last interrupted extraction of this video (same options) in its folder instead of starting a new one"
+        )
+        self.incremental_check = QtWidgets.QCheckBox("Only redo missing frames")
+        self.incremental_check.setToolTip(
+            "Re-run into the last folder with the same options: verify existing frames (size and hash) and only "
+            "re-extract missing or corrupt ones"
+        )
 
         # GPU status badge
         self.gpu_badge = QtWidgets.QLabel("GPU: Detecting…")
@@ -1140,11 +966,47 @@ class MainWindow(QtWidgets.QMainWindow):
         ctl_layout.addWidget(self.cancel_btn)
         ctl_layout.addStretch(1)
         ctl_layout.addWidget(self.gpu_badge)
+        ctl_layout.addWidget(self.resume_check)
+        ctl_layout.addWidget(self.incremental_check)
         ctl_layout.addWidget(self.auto_open_check)
         ctl_layout.addWidget(self.open_out_btn)
 
         layout.addWidget(ctl_group)
 
+        # Batch queue group
+        queue_group = QtWidgets.QGroupBox("Queue")
+        queue_layout = QtWidgets.QVBoxLayout(queue_group)
+        queue_layout.setSpacing(8)
+        self.queue_list = QtWidgets.QListWidget()
+        self.queue_list.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.queue_list.setMaximumHeight(120)
+        self.queue_list.setToolTip("Videos to extract in a batch using the options above (whole videos; Start/End are ignored)")
+        queue_layout.addWidget(self.queue_list)
+        queue_controls = QtWidgets.QHBoxLayout()
+        queue_controls.setSpacing(8)
+        self.queue_add_btn = QtWidgets.QPushButton("Add videos…")
+        self.queue_add_current_btn = QtWidgets.QPushButton("Add current")
+        self.queue_add_current_btn.setToolTip("Add the selected input video to the queue")
+        self.queue_remove_btn = QtWidgets.QPushButton("Remove")
+        self.queue_clear_btn = QtWidgets.QPushButton("Clear")
+        self.queue_concurrency_spin = QtWidgets.QSpinBox()
+        self.queue_concurrency_spin.setRange(1, 64)
+        self.queue_concurrency_spin.setValue(2)
+        self.queue_concurrency_spin.setPrefix("Concurrent: ")
+        self.queue_concurrency_spin.setToolTip("Number of videos extracted at the same time")
+        self.queue_run_btn = QtWidgets.QPushButton("Run queue")
+        self.queue_run_btn.setToolTip("Extract all queued videos; longest/highest-resolution videos start first")
+        queue_controls.addWidget(self.queue_add_btn)
+        queue_controls.addWidget(self.queue_add_current_btn)
+        queue_controls.addWidget(self.queue_remove_btn)
+        queue_controls.addWidget(self.queue_clear_btn)
+        queue_controls.addStretch(1)
+        queue_controls.addWidget(self.queue_concurrency_spin)
+        queue_controls.addWidget(self.queue_run_btn)
+        queue_layout.addLayout(queue_controls)
+
+        layout.addWidget(queue_group)
+
         # Progress group (no visible title)
         prog_group = QtWidgets.QGroupBox()
         prog_layout = QtWidgets.QVBoxLayout(prog_group)
@@ -1167,19 +1029,93 @@ class MainWindow(QtWidgets.QMainWindow):
 
         layout.addStretch(1)
 
-        # Detect GPU capability once and set badge
-        try:
-            ff = _ffmpeg_path_global()
-            has_cuda = bool(ff and ffmpeg_supports_cuda(ff))
-        except Exception:
-            has_cuda = False
-        self._has_cuda = has_cuda
-        if has_cuda:
-            self.gpu_badge.setText("GPU: NVDEC")
+        self.ffmpeg_caps_ready.connect(self._on_ffmpeg_caps_ready)
+        self.png_measure_btn.clicked.connect(self._start_png_measure)
+        self.png_measure_ready.connect(self._on_png_measure_ready)
+        self.metadata_ready.connect(self._on_metadata_ready)
+
+    def _start_capability_probe(self) -> None:
+        """Resolve FFmpeg and its capabilities (cached on disk per binary) in a background thread."""
+        def probe() -> None:
+            caps = None
+            try:
+                ff = find_ffmpeg()
+                caps = ffmpeg_capabilities(ff) if ff else None
+            except Exception:
+                caps = None
+            try:
+                self.ffmpeg_caps_ready.emit(caps)
+            except RuntimeError:
+                # Window already destroyed
+                pass
+
+        threading.Thread(target=probe, name="f2i-ffmpeg-caps", daemon=True).start()
+
+    def _start_png_measure(self) -> None:
+        """Encode a few frames of the current range at every PNG level in a background thread."""
+        video = self.video_edit.text().strip()
+        if not video or not Path(video).exists():
+            QtWidgets.QMessageBox.warning(self, "Missing video", "Please select a video file to measure.")
+            return
+        start_s = parse_time_to_seconds(self.start_time_edit.text()) or 0.0
+        end_s = parse_time_to_seconds(self.end_time_edit.text())
+        png_filter = self.png_filter_combo.currentData() or "auto"
+        self.png_measure_btn.setEnabled(False)
+        self.png_measure_btn.setText("Measuring…")
+
+        def measure() -> None:
+            rows, error = None, None
+            try:
+                rows = measure_png_levels(video, png_filter=png_filter, start_s=start_s, end_s=end_s)
+            except Exception as e:
+                logger.warning("PNG measurement failed: %s", e)
+                error = str(e)
+            try:
+                self.png_measure_ready.emit(rows, error)
+            except RuntimeError:
+                # Window already destroyed
+                pass
+
+        threading.Thread(target=measure, name="f2i-png-measure", daemon=True).start()
+
+    @QtCore.Slot(object, object)
+    def _on_png_measure_ready(self, rows: Optional[list], error: Optional[str]) -> None:
+        self.png_measure_btn.setEnabled(True)
+        self.png_measure_btn.setText("Measure")
+        if error or not rows:
+            QtWidgets.QMessageBox.warning(self, "Measure failed", error or "No frames could be measured.")
+            return
+        lines = [f"{'Level':>5}  {'ms/frame':>9}  {'KB/frame':>9}"]
+        for row in rows:
+            lines.append(f"{row['level']:>5}  {row['ms_per_frame']:>9.1f}  {row['bytes_per_frame'] / 1024:>9.0f}")
+        box = QtWidgets.QMessageBox(self)
+        box.setWindowTitle("PNG compression levels")
+        box.setText("Single-thread encode time and size per frame on samples of this video:")
+        box.setInformativeText("<pre>" + "\n".join(lines) + "</pre>")
+        box.setIcon(QtWidgets.QMessageBox.Information)
+        box.open()
+        self._png_measure_box = box
+
+    @QtCore.Slot(object)
+    def _on_ffmpeg_caps_ready(self, caps: Optional[dict]) -> None:
+        startup_mark("FFmpeg capabilities ready")
+        accels = set((caps or {}).get("hwaccels") or [])
+        hw = [b for b in registered_backends() if b.hwaccel and b.hwaccel in accels]
+        self._has_cuda = any(b.name == "cuda" for b in hw)
+        if hw:
+            name = "NVDEC" if hw[0].name == "cuda" else hw[0].name.upper()
+            self.gpu_badge.setText(f"GPU: {name}")
             self.gpu_badge.setStyleSheet("border-radius: 10px; padding: 4px 8px; background: #2e7d32; color: white; font-weight: bold;")
         else:
             self.gpu_badge.setText("GPU: CPU")
             self.gpu_badge.setStyleSheet("border-radius: 10px; padding: 4px 8px; background: #555; color: white; font-weight: bold;")
+        if caps:
+            self.gpu_badge.setToolTip(
+                f"FFmpeg {caps.get('version') or '?'} ({caps.get('path')})\n"
+                f"Hardware decoders: {', '.join(sorted(accels)) or 'none'}"
+            )
+        else:
+            self.gpu_badge.setToolTip("FFmpeg not found; extraction uses OpenCV")
 
     def _wire_events(self) -> None:
         self.video_btn.clicked.connect(self.on_pick_video)
@@ -1189,18 +1125,33 @@ class MainWindow(QtWidgets.QMainWindow):
         self.open_out_btn.clicked.connect(self.on_open_out)
         self.open_in_btn.clicked.connect(self.on_open_in)
         self.video_edit.textChanged.connect(self._on_video_text_changed)
+        # Batch queue
+        self.queue_add_btn.clicked.connect(self.on_queue_add)
+        self.queue_add_current_btn.clicked.connect(self.on_queue_add_current)
+        self.queue_remove_btn.clicked.connect(self.on_queue_remove)
+        self.queue_clear_btn.clicked.connect(self.queue_list.clear)
+        self.queue_run_btn.clicked.connect(self.on_queue_run)
         # Preview interactions
         self.preview_slider.valueChanged.connect(self._on_preview_slider_changed)
+        self.keyframe_index_ready.connect(self._on_keyframe_index_ready)
         # Update preview window when time range changes
         self.start_time_edit.editingFinished.connect(self._on_time_range_changed)
         self.end_time_edit.editingFinished.connect(self._on_time_range_changed)
         # Format/quality
         def on_fmt_change():
             fmt = (self.format_combo.currentData() or "png").lower()
-            is_jpeg = fmt == "jpeg"
-            self.quality_slider.setEnabled(is_jpeg)
-            self.quality_label.setEnabled(is_jpeg)
+            image_format = get_format(fmt)
+            uses_quality = image_format is not None and image_format.uses_quality
+            self.quality_slider.setEnabled(uses_quality)
+            self.quality_label.setEnabled(uses_quality)
+            self.preset_combo.setEnabled(image_format is not None)
+            # Raw formats are a single file already
+            self.archive_combo.setEnabled(image_format is not None)
+            self.shard_size_spin.setEnabled(image_format is not None and bool(self.archive_combo.currentData()))
+            for widget in (self.png_level_spin, self.png_filter_combo):
+                widget.setEnabled(fmt == "png")
         self.format_combo.currentIndexChanged.connect(on_fmt_change)
+        self.archive_combo.currentIndexChanged.connect(on_fmt_change)
         self.quality_slider.valueChanged.connect(lambda v: self.quality_label.setText(f"Quality: {v}"))
         # Initialize enabled state
         QtCore.QTimer.singleShot(0, on_fmt_change)
@@ -1213,9 +1164,9 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.out_edit.setText(last_out)
             last_vid = self._settings.value("last_video_path", "", type=str) or ""
             if last_vid and Path(last_vid).exists():
-                # Set without overriding out_edit if already set
+                # Set without overriding out_edit if already set; probing waits until the window is shown
                 self.video_edit.setText(last_vid)
-                self.update_metadata_for_path(last_vid)
+                QtCore.QTimer.singleShot(0, lambda p=last_vid: self.update_metadata_for_path(p))
             st = self._settings.value("start_time", "", type=str) or ""
             et = self._settings.value("end_time", "", type=str) or ""
             if st:
@@ -1230,10 +1181,28 @@ class MainWindow(QtWidgets.QMainWindow):
             if isinstance(ao, str):
                 ao = ao.lower() in {"1", "true", "yes", "on"}
             self.auto_open_check.setChecked(bool(ao))
+            resume = self._settings.value("resume", False)
+            if isinstance(resume, str):
+                resume = resume.lower() in {"1", "true", "yes", "on"}
+            self.resume_check.setChecked(bool(resume))
+            incremental = self._settings.value("incremental", False)
+            if isinstance(incremental, str):
+                incremental = incremental.lower() in {"1", "true", "yes", "on"}
+            self.incremental_check.setChecked(bool(incremental))
             # Output format and quality
             fmt = self._settings.value("out_format", "png", type=str) or "png"
             idx = max(0, self.format_combo.findData(fmt))
             self.format_combo.setCurrentIndex(idx)
+            png_level = self._settings.value("png_level", -1)
+            try:
+                png_level = int(png_level)
+            except Exception:
+                png_level = -1
+            self.png_level_spin.setValue(max(-1, min(9, png_level)))
+            png_filter = self._settings.value("png_filter", "auto", type=str) or "auto"
+            self.png_filter_combo.setCurrentIndex(max(0, self.png_filter_combo.findData(png_filter)))
+            preset = self._settings.value("preset", DEFAULT_PRESET, type=str) or DEFAULT_PRESET
+            self.preset_combo.setCurrentIndex(max(0, self.preset_combo.findData(preset)))
             q = self._settings.value("jpeg_quality", 90)
             try:
                 q = int(q)
@@ -1254,6 +1223,62 @@ class MainWindow(QtWidgets.QMainWindow):
             except Exception:
                 t = 0.0
             self.sample_t_spin.setValue(max(0.0, t))
+            keyframes = self._settings.value("keyframes_only", False)
+            if isinstance(keyframes, str):
+                keyframes = keyframes.lower() in {"1", "true", "yes", "on"}
+            self.keyframes_check.setChecked(bool(keyframes))
+            scene = self._settings.value("scene_threshold", 0.0)
+            try:
+                scene = float(scene)
+            except Exception:
+                scene = 0.0
+            self.scene_spin.setValue(max(0.0, min(1.0, scene)))
+            dedup = self._settings.value("dedup_distance", -1)
+            try:
+                dedup = int(dedup)
+            except Exception:
+                dedup = -1
+            self.dedup_spin.setValue(max(-1, min(64, dedup)))
+            et_n = self._settings.value("encoder_threads", 0)
+            try:
+                et_n = int(et_n)
+            except Exception:
+                et_n = 0
+            self.encoder_threads_spin.setValue(max(0, et_n))
+            segs = self._settings.value("segments", 1)
+            try:
+                segs = int(segs)
+            except Exception:
+                segs = 1
+            self.segments_spin.setValue(max(1, segs))
+            backend = self._settings.value("backend", "auto", type=str) or "auto"
+            self.backend_combo.setCurrentIndex(max(0, self.backend_combo.findData(backend)))
+            archive = self._settings.value("archive", "", type=str) or ""
+            self.archive_combo.setCurrentIndex(max(0, self.archive_combo.findData(archive)))
+            shard_mb = self._settings.value("shard_size_mb", DEFAULT_SHARD_MB)
+            try:
+                shard_mb = int(shard_mb)
+            except Exception:
+                shard_mb = DEFAULT_SHARD_MB
+            self.shard_size_spin.setValue(max(1, shard_mb))
+            cache_mb = self._settings.value("preview_cache_mb", 256)
+            try:
+                cache_mb = int(cache_mb)
+            except Exception:
+                cache_mb = 256
+            self.preview_cache_spin.setValue(max(16, cache_mb))
+            # Batch queue
+            conc = self._settings.value("queue_concurrency", 2)
+            try:
+                conc = int(conc)
+            except Exception:
+                conc = 2
+            self.queue_concurrency_spin.setValue(max(1, conc))
+            queued = self._settings.value("queue_paths", [])
+            if isinstance(queued, str):
+                queued = [queued] if queued else []
+            for qp in queued or []:
+                self._queue_add_path(str(qp))
             # Restore window geometry (size/position)
             geom = self._settings.value("window_geometry", None, type=QtCore.QByteArray)
             if geom:
@@ -1272,11 +1297,27 @@ class MainWindow(QtWidgets.QMainWindow):
             self._settings.setValue("end_time", self.end_time_edit.text().strip())
             self._settings.setValue("precision", self.precision_check.isChecked())
             self._settings.setValue("auto_open", self.auto_open_check.isChecked())
+            self._settings.setValue("resume", self.resume_check.isChecked())
+            self._settings.setValue("incremental", self.incremental_check.isChecked())
             # New options
             self._settings.setValue("out_format", (self.format_combo.currentData() or "png"))
+            self._settings.setValue("preset", (self.preset_combo.currentData() or DEFAULT_PRESET))
+            self._settings.setValue("png_level", int(self.png_level_spin.value()))
+            self._settings.setValue("png_filter", (self.png_filter_combo.currentData() or "auto"))
             self._settings.setValue("jpeg_quality", int(self.quality_slider.value()))
             self._settings.setValue("sample_every_n", int(self.sample_n_spin.value()))
             self._settings.setValue("sample_every_t", float(self.sample_t_spin.value()))
+            self._settings.setValue("keyframes_only", self.keyframes_check.isChecked())
+            self._settings.setValue("scene_threshold", float(self.scene_spin.value()))
+            self._settings.setValue("dedup_distance", int(self.dedup_spin.value()))
+            self._settings.setValue("encoder_threads", int(self.encoder_threads_spin.value()))
+            self._settings.setValue("segments", int(self.segments_spin.value()))
+            self._settings.setValue("backend", (self.backend_combo.currentData() or "auto"))
+            self._settings.setValue("archive", (self.archive_combo.currentData() or ""))
+            self._settings.setValue("shard_size_mb", int(self.shard_size_spin.value()))
+            self._settings.setValue("preview_cache_mb", int(self.preview_cache_spin.value()))
+            self._settings.setValue("queue_concurrency", int(self.queue_concurrency_spin.value()))
+            self._settings.setValue("queue_paths", self._queue_paths())
             # Save window geometry (size/position)
             self._settings.setValue("window_geometry", self.saveGeometry())
         except Exception:
@@ -1294,8 +1335,52 @@ class MainWindow(QtWidgets.QMainWindow):
             self._settings.setValue("last_video_path", path)
         except Exception:
             pass
-        # Rich metadata via ffprobe
-        meta = probe_video_metadata_with_ffprobe(path)
+        # ffprobe (and OpenCV when ffprobe lacks a duration) run in the background
+        self._current_meta = None
+        self._close_preview_cap()
+        self.meta_label.setText("Reading metadata…")
+        self.meta_label.setVisible(True)
+        self.preview_label.setPixmap(QtGui.QPixmap())
+        self.preview_label.setText("Loading preview…")
+        self._start_metadata_probe(path)
+
+    def _start_metadata_probe(self, path: str) -> None:
+        def probe() -> None:
+            meta = probe_video_metadata_with_ffprobe(path)
+            dur_ms: Optional[float] = None
+            opened = False
+            try:
+                import cv2
+
+                startup_mark("cv2 imported (metadata probe)")
+                cap = cv2.VideoCapture(path)
+                try:
+                    opened = bool(cap.isOpened())
+                    d = meta.get("duration")
+                    if d is not None:
+                        dur_ms = float(d) * 1000.0
+                    elif opened:
+                        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+                        fps = cap.get(cv2.CAP_PROP_FPS)
+                        if frame_count and fps and fps > 0:
+                            dur_ms = float(frame_count) / float(fps) * 1000.0
+                finally:
+                    cap.release()
+            except Exception:
+                logger.debug("Preview probe failed for %s", path, exc_info=True)
+            try:
+                self.metadata_ready.emit(path, meta, dur_ms, opened)
+            except RuntimeError:
+                # Window already destroyed
+                pass
+
+        threading.Thread(target=probe, name="f2i-metadata", daemon=True).start()
+
+    @QtCore.Slot(str, object, object, bool)
+    def _on_metadata_ready(self, path: str, meta: dict, dur_ms: Optional[float], opened: bool) -> None:
+        if path != self.video_edit.text().strip():
+            return
+        startup_mark("metadata ready")
         self._current_meta = meta  # store for validation/use
         frames = int(meta.get("frames") or 0)
         frames_exact = bool(meta.get("frames_exact"))
@@ -1332,7 +1417,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.meta_label.setVisible(True)
 
         # Initialize preview for this video
-        self._init_preview_for_current_video()
+        self._init_preview_for_current_video(dur_ms, opened)
 
     # ------- Preview helpers (class methods) -------
     def _close_preview_cap(self) -> None:
@@ -1343,6 +1428,10 @@ class MainWindow(QtWidgets.QMainWindow):
                 cap.release()
             except Exception:
                 pass
+        # Stop a filmstrip build that is still decoding thumbnails
+        if self._filmstrip_cancel is not None:
+            self._filmstrip_cancel.set()
+            self._filmstrip_cancel = None
         # Also stop preview worker thread if running
         th = getattr(self, "_preview_thread", None)
         worker = getattr(self, "_preview_worker", None)
@@ -1361,50 +1450,39 @@ class MainWindow(QtWidgets.QMainWindow):
             self._preview_thread = None
         logger.debug("Preview resources closed")
 
-    def _init_preview_for_current_video(self) -> None:
+    def _init_preview_for_current_video(self, dur_ms: Optional[float] = None, opened: bool = True) -> None:
+        """Start the preview worker; `dur_ms`/`opened` come from the background metadata probe."""
         path = self.video_edit.text().strip()
         self._close_preview_cap()
         self._last_preview_qimg = None
+        self._last_preview_ms = None
         self.preview_label.setText("Loading preview…" if path else "No video selected")
         self.preview_label.setPixmap(QtGui.QPixmap())
         self.preview_slider.setEnabled(False)
         self.preview_time_label.setText("--:-- / --:--")
+        self.filmstrip.setVisible(False)
         if not path or not Path(path).exists():
             logger.info("Preview init skipped: missing path")
             return
-        tmp_cap = cv2.VideoCapture(path)
-        if not tmp_cap.isOpened():
+        if not opened:
             self.preview_label.setText("Preview unavailable (failed to open video)")
             logger.warning("Preview failed to open video: %s", path)
             return
-        # Determine duration (prefer metadata if available)
-        dur_ms: Optional[float] = None
-        try:
-            meta = getattr(self, "_current_meta", None) or {}
-            d = meta.get("duration") if isinstance(meta, dict) else None
-            if d is not None:
-                dur_ms = float(d) * 1000.0
-        except Exception:
-            dur_ms = None
-        if not dur_ms or dur_ms <= 0:
-            try:
-                frame_count = tmp_cap.get(cv2.CAP_PROP_FRAME_COUNT)
-                fps = tmp_cap.get(cv2.CAP_PROP_FPS)
-                if frame_count and fps and fps > 0:
-                    dur_ms = float(frame_count) / float(fps) * 1000.0
-            except Exception:
-                dur_ms = None
-        try:
-            tmp_cap.release()
-        except Exception:
-            pass
         self._preview_duration_ms = dur_ms if dur_ms and dur_ms > 0 else None
         # Start background preview worker
         try:
             th = QtCore.QThread(self)
-            worker = MainWindow._PreviewWorker(path)
+            worker = MainWindow._PreviewWorker(
+                path,
+                cache_mb=int(self.preview_cache_spin.value()),
+                target_size=self._preview_target_size(),
+            )
             worker.moveToThread(th)
             self.preview_request_ms.connect(worker.request_ms)
+            self.preview_keyframes.connect(worker.set_keyframe_index)
+            self.preview_prefetch_hint.connect(worker.set_prefetch_hint)
+            self.preview_cache_budget.connect(worker.set_cache_budget_mb)
+            self.preview_target_size.connect(worker.set_target_size)
             worker.frame_ready.connect(self._on_preview_frame_ready)
             worker.error.connect(self._on_preview_error)
             th.finished.connect(worker.deleteLater)
@@ -1416,9 +1494,74 @@ class MainWindow(QtWidgets.QMainWindow):
             self._preview_thread = None
             self._preview_worker = None
             logger.exception("Failed to start preview worker for %s", path)
+        self._start_keyframe_index_build(path)
+        self._start_filmstrip_build(path)
         # Update slider and show first frame
         self._refresh_preview_window_and_show(start_ratio=0.0)
 
+    def _start_keyframe_index_build(self, path: str) -> None:
+        """Index keyframes (ffprobe packets, cached on disk) off the GUI thread for fast preview seeks."""
+        def build() -> None:
+            try:
+                index = KeyframeIndex.for_video(path)
+            except Exception:
+                index = None
+            try:
+                self.keyframe_index_ready.emit(path, index)
+            except RuntimeError:
+                # Window already destroyed
+                pass
+
+        threading.Thread(target=build, name="f2i-keyframe-index", daemon=True).start()
+
+    def _start_filmstrip_build(self, path: str) -> None:
+        """Decode (or load from the disk cache) keyframe thumbnails for the filmstrip off the GUI thread."""
+        duration_s = (self._preview_duration_ms or 0.0) / 1000.0
+        self.filmstrip.reset(self.FILMSTRIP_COUNT, duration_s)
+        self.filmstrip.setVisible(duration_s > 0)
+        if duration_s <= 0:
+            return
+        cancel = threading.Event()
+        self._filmstrip_cancel = cancel
+
+        def on_thumb(index: int, _secs: float, data: bytes) -> None:
+            try:
+                self.filmstrip_thumb_ready.emit(path, index, data)
+            except RuntimeError:
+                # Window already destroyed
+                cancel.set()
+
+        def build() -> None:
+            try:
+                generate_thumbnails(path, duration_s, self.FILMSTRIP_COUNT, self.FILMSTRIP_HEIGHT,
+                                    on_thumb=on_thumb, should_cancel=cancel.is_set)
+            except Exception:
+                logger.debug("Filmstrip build failed for %s", path, exc_info=True)
+
+        threading.Thread(target=build, name="f2i-filmstrip", daemon=True).start()
+
+    @QtCore.Slot(str, int, object)
+    def _on_filmstrip_thumb_ready(self, path: str, index: int, data: bytes) -> None:
+        if path != self.video_edit.text().strip():
+            return
+        img = QtGui.QImage.fromData(data, "JPG")
+        self.filmstrip.set_thumbnail(index, img)
+
+    def _on_filmstrip_time_picked(self, secs: float, is_end: bool) -> None:
+        edit = self.end_time_edit if is_end else self.start_time_edit
+        edit.setText(f"{secs:.2f}")
+        self._on_time_range_changed()
+
+    @QtCore.Slot(str, object)
+    def _on_keyframe_index_ready(self, path: str, index: Optional[KeyframeIndex]) -> None:
+        if path != self.video_edit.text().strip() or self._preview_worker is None:
+            return
+        if index is None:
+            logger.info("Keyframe index unavailable for %s; preview uses plain seeking", path)
+            return
+        logger.info("Keyframe index ready for %s: %d keyframes", path, len(index.keyframe_times))
+        self.preview_keyframes.emit(index)
+
     def _get_time_window_ms(self) -> tuple[float, Optional[float]]:
         total_ms = self._preview_duration_ms or 0.0
         st = parse_time_to_seconds(self.start_time_edit.text()) if hasattr(self, 'start_time_edit') else None
@@ -1444,11 +1587,14 @@ class MainWindow(QtWidgets.QMainWindow):
         st_ms, end_ms = self._get_time_window_ms()
         self._preview_window_start_ms = st_ms
         self._preview_window_end_ms = end_ms
-        have_cap = self._preview_cap is not None
+        self.filmstrip.set_range(st_ms / 1000.0, end_ms / 1000.0 if end_ms is not None else None)
+        have_cap = self._preview_worker is not None
         have_dur = (self._preview_duration_ms is not None) and (self._preview_duration_ms > 0)
         can_seek = have_cap and end_ms is not None and end_ms > st_ms and have_dur
         self.preview_slider.setEnabled(bool(can_seek))
         if can_seek:
+            # One slider step spans 1/1000 of the window; the worker prefetches around it
+            self.preview_prefetch_hint.emit((end_ms - st_ms) / 1000.0, float(st_ms), float(end_ms))
             # Set slider to start and show frame
             v = int(max(0, min(1000, round(start_ratio * 1000.0))))
             # Block signals during programmatic update
@@ -1501,19 +1647,49 @@ class MainWindow(QtWidgets.QMainWindow):
         # Fallback UI message if worker is not available yet
         self.preview_label.setText("Loading preview…")
 
+    def _preview_target_size(self) -> tuple[int, int]:
+        # Label size in device pixels, so HiDPI screens still get a sharp preview
+        size = self.preview_label.size()
+        dpr = self.preview_label.devicePixelRatioF() or 1.0
+        return int(size.width() * dpr), int(size.height() * dpr)
+
+    def _on_preview_label_resized(self) -> None:
+        # Debounced: ask the worker for frames at the new size and redraw the current position
+        if self._preview_worker is None:
+            return
+        w, h = self._preview_target_size()
+        self.preview_target_size.emit(w, h)
+        if self._last_preview_ms is not None:
+            self._show_preview_at_ms(self._last_preview_ms)
+
     def _apply_qimage_to_preview_label(self, qimg: QtGui.QImage) -> None:
-        # Scale while keeping aspect ratio to fit label size
+        # Frames arrive already scaled to the label; only rescale here while a resize is pending
         target_size = self.preview_label.size()
+        dpr = self.preview_label.devicePixelRatioF() or 1.0
+        pix = QtGui.QPixmap.fromImage(qimg)
+        pix.setDevicePixelRatio(dpr)
         if target_size.width() < 2 or target_size.height() < 2:
-            pix = QtGui.QPixmap.fromImage(qimg)
             self.preview_label.setPixmap(pix)
             return
-        pix = QtGui.QPixmap.fromImage(qimg)
-        scaled = pix.scaled(target_size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        logical = pix.deviceIndependentSize()
+        fits = logical.width() <= target_size.width() + 1 and logical.height() <= target_size.height() + 1
+        fills = logical.width() >= target_size.width() - 1 or logical.height() >= target_size.height() - 1
+        if fits and fills:
+            self.preview_label.setPixmap(pix)
+            return
+        scaled = pix.scaled(
+            QtCore.QSize(int(target_size.width() * dpr), int(target_size.height() * dpr)),
+            QtCore.Qt.KeepAspectRatio,
+            QtCore.Qt.SmoothTransformation,
+        )
+        scaled.setDevicePixelRatio(dpr)
         self.preview_label.setPixmap(scaled)
 
     def _on_preview_frame_ready(self, qimg: QtGui.QImage, ms: float) -> None:
+        if self._last_preview_qimg is None:
+            startup_mark("first preview frame")
         self._last_preview_qimg = qimg
+        self._last_preview_ms = ms
         self._apply_qimage_to_preview_label(qimg)
         self._update_preview_time_label(ms)
 
@@ -1538,6 +1714,7 @@ class MainWindow(QtWidgets.QMainWindow):
             if obj is getattr(self, "preview_label", None) and event.type() == QtCore.QEvent.Resize:
                 if self._last_preview_qimg is not None:
                     self._apply_qimage_to_preview_label(self._last_preview_qimg)
+                self._preview_resize_timer.start()
         except Exception:
             pass
         return QtWidgets.QMainWindow.eventFilter(self, obj, event)
@@ -1721,6 +1898,110 @@ class MainWindow(QtWidgets.QMainWindow):
     def _on_video_text_changed(self, _text: str) -> None:
         self.open_in_btn.setEnabled(bool(self.video_edit.text().strip()))
 
+    # -------- Batch queue --------
+    def _queue_paths(self) -> list[str]:
+        paths = []
+        for i in range(self.queue_list.count()):
+            paths.append(str(self.queue_list.item(i).data(QtCore.Qt.UserRole)))
+        return paths
+
+    def _queue_add_path(self, path: str) -> None:
+        if not path or path in self._queue_paths():
+            return
+        item = QtWidgets.QListWidgetItem(Path(path).name)
+        item.setData(QtCore.Qt.UserRole, path)
+        item.setToolTip(path)
+        self.queue_list.addItem(item)
+
+    def on_queue_add(self) -> None:
+        filters = (
+            "Video Files (*.mp4 *.mov *.avi *.mkv *.webm *.m4v *.mpg *.mpeg *.wmv);;All Files (*)"
+        )
+        paths, _ = QtWidgets.QFileDialog.getOpenFileNames(self, "Add videos to queue", str(Path.home()), filters)
+        for p in paths:
+            self._queue_add_path(p)
+
+    def on_queue_add_current(self) -> None:
+        path = self.video_edit.text().strip()
+        if path and Path(path).exists():
+            self._queue_add_path(path)
+
+    def on_queue_remove(self) -> None:
+        for item in self.queue_list.selectedItems():
+            self.queue_list.takeItem(self.queue_list.row(item))
+
+    def on_queue_run(self) -> None:
+        paths = self._queue_paths()
+        if not paths:
+            QtWidgets.QMessageBox.information(self, "Empty queue", "Add videos to the queue first.")
+            return
+        out = self.out_edit.text().strip()
+        if not out:
+            QtWidgets.QMessageBox.warning(self, "Missing output", "Please choose an output folder.")
+            return
+        options = self._collect_engine_options()
+        jobs = [BatchJob(video=p, output=out, options=dict(options)) for p in paths]
+        for i, p in enumerate(paths):
+            self.queue_list.item(i).setText(f"{Path(p).name} — pending")
+
+        self._set_busy(True)
+        self.status.setText("Estimating job costs…")
+        self.status.setVisible(True)
+        self.progress.setRange(0, 0)
+        self.progress.setFormat("Batch…")
+        self._started_at = time.time()
+        self._save_settings()
+        logger.info("Start batch: %d videos, concurrency=%d out=%s", len(jobs), self.queue_concurrency_spin.value(), out)
+
+        self._thread = QtCore.QThread(self)
+        self._batch_worker = BatchWorker(jobs, int(self.queue_concurrency_spin.value()))
+        self._batch_worker.moveToThread(self._thread)
+        self._thread.started.connect(self._batch_worker.run)
+        self._batch_worker.job_updated.connect(self.on_queue_job_updated)
+        self._batch_worker.progress.connect(self.on_queue_progress)
+        self._batch_worker.finished.connect(self.on_queue_finished)
+        self._batch_worker.finished.connect(self._thread.quit)
+        self._batch_worker.finished.connect(self._batch_worker.deleteLater)
+        self._thread.finished.connect(self._thread.deleteLater)
+        self._thread.start()
+
+    @QtCore.Slot(int, str, int, int)
+    def on_queue_job_updated(self, index: int, status: str, current: int, total: int) -> None:
+        item = self.queue_list.item(index)
+        if item is None:
+            return
+        name = Path(str(item.data(QtCore.Qt.UserRole))).name
+        if status == "running":
+            detail = f"{current} / {total}" if total > 0 else f"{current}"
+            item.setText(f"{name} — running {detail}")
+        elif status == "done":
+            item.setText(f"{name} — done ({current} frames)")
+        else:
+            item.setText(f"{name} — {status}")
+
+    @QtCore.Slot(int, int, float)
+    def on_queue_progress(self, done: int, total: int, fps: float) -> None:
+        if total <= 0:
+            self.progress.setRange(0, 0)
+            self.progress.setFormat(f"{done} frames — {fps:.1f} fps (all jobs)")
+            return
+        if self.progress.maximum() != total:
+            self.progress.setRange(0, total)
+        self.progress.setValue(min(done, total))
+        self.progress.setFormat(f"{done} / {total} frames — {fps:.1f} fps (all jobs)")
+
+    @QtCore.Slot(str)
+    def on_queue_finished(self, summary: str) -> None:
+        self._set_busy(False)
+        self.cancel_btn.setEnabled(False)
+        self.status.setText(f"Batch finished: {summary}")
+        self.status.setVisible(True)
+        self._last_out_dir = self.out_edit.text().strip() or None
+        self.open_out_btn.setEnabled(bool(self._last_out_dir))
+        logger.info("Batch finished: %s", summary)
+        self._batch_worker = None
+        self._thread = None
+
     # -------- Extraction controls --------
     def _set_busy(self, busy: bool) -> None:
         self.start_btn.setEnabled(not busy)
@@ -1730,6 +2011,32 @@ class MainWindow(QtWidgets.QMainWindow):
         self.video_edit.setEnabled(not busy)
         self.out_edit.setEnabled(not busy)
         self.preview_slider.setEnabled(not busy and self.preview_slider.isEnabled())
+        for btn in (self.queue_add_btn, self.queue_add_current_btn, self.queue_remove_btn,
+                    self.queue_clear_btn, self.queue_run_btn):
+            btn.setEnabled(not busy)
+
+    def _collect_engine_options(self) -> dict:
+        """Output, sampling and performance options shared by single runs and the batch queue."""
+        return {
+            "precision_count": self.precision_check.isChecked(),
+            "out_format": (self.format_combo.currentData() or "png"),
+            "jpeg_quality": int(self.quality_slider.value()),
+            "preset": (self.preset_combo.currentData() or DEFAULT_PRESET),
+            "png_level": (int(self.png_level_spin.value()) if self.png_level_spin.value() >= 0 else None),
+            "png_filter": (self.png_filter_combo.currentData() or "auto"),
+            "sample_every_n": int(self.sample_n_spin.value()),
+            "sample_every_t": float(self.sample_t_spin.value()),
+            "keyframes_only": self.keyframes_check.isChecked(),
+            "scene_threshold": float(self.scene_spin.value()),
+            "dedup_distance": (int(self.dedup_spin.value()) if self.dedup_spin.value() >= 0 else None),
+            "encoder_threads": int(self.encoder_threads_spin.value()),
+            "segments": int(self.segments_spin.value()),
+            "backend": (self.backend_combo.currentData() or "auto"),
+            "archive": (self.archive_combo.currentData() or None),
+            "shard_size_mb": int(self.shard_size_spin.value()),
+            "resume": self.resume_check.isChecked(),
+            "incremental": self.incremental_check.isChecked(),
+        }
 
     def on_start(self) -> None:
         video = self.video_edit.text().strip()
@@ -1779,16 +2086,20 @@ class MainWindow(QtWidgets.QMainWindow):
         self._started_at = time.time()
         self._total_for_run = None
         logger.info(
-            "Start extraction: video=%s out=%s start=%s end=%s fmt=%s jpeg_q=%s every_n=%s every_t=%s precision=%s",
+            "Start extraction: video=%s out=%s start=%s end=%s fmt=%s preset=%s jpeg_q=%s every_n=%s every_t=%s precision=%s encoders=%s segments=%s backend=%s",
             video,
             out,
             start_s,
             end_s,
             (self.format_combo.currentData() or "png"),
+            (self.preset_combo.currentData() or DEFAULT_PRESET),
             int(self.quality_slider.value()),
             int(self.sample_n_spin.value()),
             float(self.sample_t_spin.value()),
             self.precision_check.isChecked(),
+            int(self.encoder_threads_spin.value()) or "auto",
+            int(self.segments_spin.value()),
+            (self.backend_combo.currentData() or "auto"),
         )
 
         # Persist current selections
@@ -1796,22 +2107,12 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Start worker thread
         self._thread = QtCore.QThread(self)
-        # Collect options
-        out_format = (self.format_combo.currentData() or "png")
-        jpeg_quality = int(self.quality_slider.value())
-        sample_every_n = int(self.sample_n_spin.value())
-        sample_every_t = float(self.sample_t_spin.value())
-
         self._worker = FrameExtractorWorker(
             video,
             out,
             start_time=start_s,
             end_time=end_s,
-            precision_count=self.precision_check.isChecked(),
-            out_format=out_format,
-            jpeg_quality=jpeg_quality,
-            sample_every_n=sample_every_n,
-            sample_every_t=sample_every_t,
+            **self._collect_engine_options(),
         )
         self._worker.moveToThread(self._thread)
 
@@ -1830,12 +2131,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self._thread.start()
 
     def on_cancel(self) -> None:
-        w = self._worker
-        if w is not None:
-            try:
-                w.cancel()
-            except Exception:
-                pass
+        for w in (self._worker, self._batch_worker):
+            if w is not None:
+                try:
+                    w.cancel()
+                except Exception:
+                    pass
         self.status.setText("Canceling…")
         self.status.setVisible(True)
         logger.info("Cancel requested by user")
@@ -1855,11 +2156,12 @@ class MainWindow(QtWidgets.QMainWindow):
         # Stop extraction worker/thread robustly
         w = self._worker
         th = self._thread
-        if w is not None:
-            try:
-                w.cancel()
-            except Exception:
-                pass
+        for worker in (w, self._batch_worker):
+            if worker is not None:
+                try:
+                    worker.cancel()
+                except Exception:
+                    pass
         if th is not None:
             try:
                 th.quit()
@@ -1870,17 +2172,27 @@ class MainWindow(QtWidgets.QMainWindow):
                 pass
         self._worker = None
         self._thread = None
+        self._batch_worker = None
         event.accept()
         logger.info("Cleanup finished; app closed")
 
 
  
 def main() -> int:
-    app = QtWidgets.QApplication(sys.argv)
+    global _profile_startup
+    argv = list(sys.argv)
+    if "--profile-startup" in argv:
+        argv.remove("--profile-startup")
+        _profile_startup = True
+        _report_import_marks()
+    app = QtWidgets.QApplication(argv)
     apply_dark_theme(app)
+    startup_mark("QApplication created")
 
     w = MainWindow()
     w.show()
+    startup_mark("window shown")
+    QtCore.QTimer.singleShot(0, lambda: startup_mark("event loop running"))
 
     return app.exec()
 
@@ -0,0 +1,7 @@
+"""Frame2Image: extract video frames to images.
+
+The GUI lives in `app.py`; the extraction engine and probing helpers in this
+package do not depend on Qt and are shared with the headless CLI
+(`python -m frame2image`).
+"""
+__version__ = "0.1.2"
@@ -0,0 +1,180 @@
+"""Sharded tar/zip output: encoded frames packed into a few large archives instead of loose files.
+
+Frames are encoded on a thread pool and appended, in order, to sequential shards
+(``frames-000000.tar``, ``frames-000001.tar``, …) that roll over once they reach the
+configured size. Members are named ``frame_<n>.<ext>``, so tar shards can be read
+directly as a WebDataset (key ``frame_<n>``). Nothing is written to disk twice:
+encoded bytes go straight into the open shard.
+
+``index.csv`` next to the shards maps every frame number to its shard, the byte
+offset of the member data inside that shard and its size, plus the source timestamp,
+so single frames can be read with one seek without opening the archive.
+"""
+import csv
+import io
+import logging
+import os
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("frame2image")
+
+ARCHIVE_FORMATS = ("tar", "zip")
+DEFAULT_SHARD_MB = 1024
+
+INDEX_NAME = "index.csv"
+
+
+class ShardedArchiveWriter:
+    """Append named members to rolling tar or zip shards and stream an index row per member."""
+
+    def __init__(self, out_dir: Path, fmt: str = "tar", shard_bytes: int = DEFAULT_SHARD_MB * 1024 * 1024,
+                 prefix: str = "frames"):
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {fmt}")
+        self.out_dir = Path(out_dir)
+        self.fmt = fmt
+        self.shard_bytes = max(1, int(shard_bytes))
+        self.prefix = prefix
+        self.shards: list[str] = []
+        self.members = 0
+        self._archive = None
+        self._fh = None
+        self._shard_size = 0
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._index_fh = open(self.out_dir / INDEX_NAME, "w", newline="", encoding="utf-8")
+        self._index = csv.writer(self._index_fh)
+        self._index.writerow(["frame", "name", "shard", "offset", "size", "time"])
+
+    def _open_shard(self) -> None:
+        name = f"{self.prefix}-{len(self.shards):06d}.{self.fmt}"
+        self.shards.append(name)
+        self._fh = open(self.out_dir / name, "wb")
+        if self.fmt == "tar":
+            # USTAR keeps every header at exactly 512 bytes, so data offsets are predictable
+            self._archive = tarfile.open(fileobj=self._fh, mode="w", format=tarfile.USTAR_FORMAT)
+        else:
+            # Images are already compressed; store them so members can be read in place
+            self._archive = zipfile.ZipFile(self._fh, mode="w", compression=zipfile.ZIP_STORED)
+        self._shard_size = 0
+        logger.debug("Opened archive shard %s", name)
+
+    def _close_shard(self) -> None:
+        if self._archive is None:
+            return
+        try:
+            self._archive.close()
+        finally:
+            self._fh.close()
+            self._archive = None
+            self._fh = None
+
+    def add(self, frame_no: int, name: str, data: bytes, t: Optional[float] = None) -> None:
+        """Append one member, starting a new shard first if this one would exceed the size limit."""
+        if self._archive is not None and self._shard_size > 0 and self._shard_size + len(data) > self.shard_bytes:
+            self._close_shard()
+        if self._archive is None:
+            self._open_shard()
+        if self.fmt == "tar":
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            offset = self._archive.offset + tarfile.BLOCKSIZE
+            self._archive.addfile(info, io.BytesIO(data))
+        else:
+            zinfo = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            zinfo.compress_type = zipfile.ZIP_STORED
+            self._archive.writestr(zinfo, data)
+            offset = zinfo.header_offset + 30 + len(zinfo.filename.encode("utf-8")) + len(zinfo.extra)
+        self._shard_size += len(data)
+        self.members += 1
+        self._index.writerow([frame_no, name, self.shards[-1], offset, len(data), "" if t is None else f"{t:.6f}"])
+
+    def close(self) -> int:
+        """Finish the open shard and the index. Returns the number of members written."""
+        try:
+            self._close_shard()
+        finally:
+            self._index_fh.close()
+        return self.members
+
+
+class ArchiveFrameSink:
+    """Frame sink that encodes BGR frames on a thread pool and writes them to ShardedArchiveWriter.
+
+    Encoding runs out of order on the pool; members are appended strictly in frame
+    order from the caller's thread, with at most a few frames per thread in flight.
+    """
+
+    def __init__(self, out_dir: Path, pad: int, ext: str, params: list[int], threads: int,
+                 fmt: str = "tar", shard_bytes: int = DEFAULT_SHARD_MB * 1024 * 1024,
+                 shape: Optional[tuple[int, int]] = None):
+        self.pad = pad
+        self.ext = ext
+        self.params = params
+        self.shape = shape
+        self.count = 0
+        self.writer = ShardedArchiveWriter(out_dir, fmt, shard_bytes)
+        self._max_pending = max(2, int(threads) * 2)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(threads)), thread_name_prefix="f2i-encode")
+        self._pending: deque = deque()
+
+    @property
+    def frames(self) -> int:
+        return self.writer.members
+
+    def _encode(self, frame) -> bytes:
+        import cv2
+
+        ok, buf = cv2.imencode(f".{self.ext}", frame, self.params)
+        if not ok:
+            raise RuntimeError(f"Failed to encode frame as {self.ext}")
+        return buf.tobytes()
+
+    def _drain(self, keep: int) -> None:
+        while len(self._pending) > keep or (self._pending and self._pending[0][2].done()):
+            frame_no, t, fut = self._pending.popleft()
+            self.writer.add(frame_no, f"frame_{frame_no:0{self.pad}d}.{self.ext}", fut.result(), t)
+
+    def write(self, frame, t: Optional[float] = None) -> None:
+        self.count += 1
+        self._pending.append((self.count, t, self._executor.submit(self._encode, frame)))
+        self._drain(self._max_pending)
+
+    def write_bytes(self, data: bytes, t: Optional[float] = None) -> None:
+        """Accept one packed BGR24 frame (as piped from FFmpeg); needs `shape`."""
+        import numpy as np
+
+        if self.shape is None:
+            raise RuntimeError("Frame size unknown for raw byte input")
+        self.write(np.frombuffer(data, dtype=np.uint8).reshape(self.shape[0], self.shape[1], 3), t)
+
+    def close(self, extra: Optional[dict] = None) -> int:
+        # Write everything already submitted, even on cancel, so the shards end on a whole frame
+        try:
+            self._drain(0)
+        finally:
+            self._executor.shutdown(wait=True)
+            self.writer.close()
+        return self.writer.members
+
+    def abort(self) -> None:
+        for _frame_no, _t, fut in self._pending:
+            fut.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=True)
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+        # Drop partial shards so a fallback decoder starts from a clean folder
+        for name in [*self.writer.shards, INDEX_NAME]:
+            try:
+                os.remove(self.writer.out_dir / name)
+            except Exception:
+                pass
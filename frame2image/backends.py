@@ -0,0 +1,201 @@
+"""Decoder backend registry and benchmark-based backend selection.
+
+A backend describes one way of decoding the input: an FFmpeg process (on the CPU
+or with a hardware accelerator such as CUDA, VAAPI or QSV), OpenCV, or PyAV when
+it is installed. `select_backends` times a short decode of the actual input with
+every available backend and returns them fastest first; backends that fail the
+calibration are dropped. The ranking is cached per codec, resolution and set of
+available backends, keyed to the FFmpeg binary so an upgrade re-calibrates.
+"""
+import importlib.util
+import logging
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .cache import default_cache
+from .probe import ffmpeg_hwaccels
+
+logger = logging.getLogger("frame2image")
+
+# Frames decoded per backend during calibration
+CALIBRATION_FRAMES = 90
+CALIBRATION_TIMEOUT = 20.0
+
+
+@dataclass(frozen=True)
+class DecoderBackend:
+    name: str
+    label: str
+    kind: str  # "ffmpeg", "opencv" or "pyav"
+    hwaccel: Optional[str] = None  # method name as listed by `ffmpeg -hwaccels`
+    hwaccel_args: tuple[str, ...] = ()
+
+    def available(self, ffmpeg_path: Optional[str]) -> bool:
+        if self.kind == "ffmpeg":
+            if not ffmpeg_path:
+                return False
+            return self.hwaccel is None or self.hwaccel in ffmpeg_hwaccels(ffmpeg_path)
+        if self.kind == "pyav":
+            return importlib.util.find_spec("av") is not None
+        return self.kind == "opencv"
+
+    def calibrate(self, video_path: str, ffmpeg_path: Optional[str], start_s: float = 0.0,
+                  frames: int = CALIBRATION_FRAMES, threads: int = 0) -> Optional[float]:
+        """Decode up to `frames` frames from `start_s` and return frames per second (None on failure)."""
+        try:
+            if self.kind == "ffmpeg":
+                return self._calibrate_ffmpeg(video_path, ffmpeg_path or "ffmpeg", start_s, frames, threads)
+            if self.kind == "pyav":
+                return self._calibrate_pyav(video_path, start_s, frames)
+            return self._calibrate_opencv(video_path, start_s, frames)
+        except Exception as e:
+            logger.debug("Calibration of %s failed: %s", self.name, e)
+            return None
+
+    def _calibrate_ffmpeg(self, video_path: str, ffmpeg_path: str, start_s: float, frames: int, threads: int) -> Optional[float]:
+        decode_args = list(self.hwaccel_args) if self.hwaccel else ["-threads", str(threads)]
+        cmd = [
+            ffmpeg_path, "-hide_banner", "-nostdin", "-loglevel", "error",
+            *decode_args,
+            *( ["-ss", f"{start_s:.3f}"] if start_s > 0 else [] ),
+            "-i", video_path,
+            "-an", "-sn", "-dn",
+            "-frames:v", str(frames),
+            "-f", "null", "-",
+            "-progress", "pipe:1", "-nostats",
+        ]
+        t0 = time.perf_counter()
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=CALIBRATION_TIMEOUT)
+        elapsed = time.perf_counter() - t0
+        if out.returncode != 0:
+            logger.debug("Calibration of %s failed: %s", self.name, out.stderr.strip()[-300:])
+            return None
+        decoded = 0
+        for line in out.stdout.splitlines():
+            if line.startswith("frame="):
+                try:
+                    decoded = int(line.split("=", 1)[1].strip())
+                except Exception:
+                    pass
+        return (decoded / elapsed) if decoded > 0 and elapsed > 0 else None
+
+    def _calibrate_opencv(self, video_path: str, start_s: float, frames: int) -> Optional[float]:
+        import cv2
+
+        t0 = time.perf_counter()
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                return None
+            if start_s > 0:
+                cap.set(cv2.CAP_PROP_POS_MSEC, start_s * 1000.0)
+            decoded = 0
+            while decoded < frames:
+                ret, _frame = cap.read()
+                if not ret:
+                    break
+                decoded += 1
+        finally:
+            cap.release()
+        elapsed = time.perf_counter() - t0
+        return (decoded / elapsed) if decoded > 0 and elapsed > 0 else None
+
+    def _calibrate_pyav(self, video_path: str, start_s: float, frames: int) -> Optional[float]:
+        import av
+
+        t0 = time.perf_counter()
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            if start_s > 0 and stream.time_base:
+                container.seek(int(start_s / float(stream.time_base)), stream=stream)
+            decoded = 0
+            for frame in container.decode(stream):
+                # Include the conversion extraction pays for as well
+                frame.to_ndarray(format="bgr24")
+                decoded += 1
+                if decoded >= frames:
+                    break
+        elapsed = time.perf_counter() - t0
+        return (decoded / elapsed) if decoded > 0 and elapsed > 0 else None
+
+
+# -------------------------
+# Registry
+# -------------------------
+_REGISTRY: dict[str, DecoderBackend] = {}
+
+
+def register_backend(backend: DecoderBackend) -> None:
+    """Add (or replace) a backend; registration order is the fallback priority."""
+    _REGISTRY[backend.name] = backend
+
+
+def get_backend(name: str) -> Optional[DecoderBackend]:
+    return _REGISTRY.get(name)
+
+
+def backend_names() -> list[str]:
+    return list(_REGISTRY)
+
+
+def registered_backends() -> list[DecoderBackend]:
+    return list(_REGISTRY.values())
+
+
+register_backend(DecoderBackend("cuda", "FFmpeg NVDEC (CUDA)", "ffmpeg", "cuda", ("-hwaccel", "cuda")))
+register_backend(DecoderBackend("vaapi", "FFmpeg VAAPI", "ffmpeg", "vaapi", ("-hwaccel", "vaapi")))
+register_backend(DecoderBackend("qsv", "FFmpeg Quick Sync (QSV)", "ffmpeg", "qsv", ("-hwaccel", "qsv")))
+register_backend(DecoderBackend("ffmpeg", "FFmpeg CPU (multithreaded)", "ffmpeg"))
+register_backend(DecoderBackend("pyav", "PyAV", "pyav"))
+register_backend(DecoderBackend("opencv", "OpenCV", "opencv"))
+
+
+# -------------------------
+# Selection
+# -------------------------
+_calibration_lock = threading.Lock()
+
+
+def select_backends(video_path: str, meta: dict, ffmpeg_path: Optional[str], start_s: float = 0.0,
+                    threads: int = 0, on_message: Optional[Callable[[str], None]] = None,
+                    use_cache: bool = True) -> list[DecoderBackend]:
+    """Return the available backends that decoded the input, fastest first.
+
+    Falls back to registration order when no backend could be calibrated.
+    """
+    available = [b for b in registered_backends() if b.available(ffmpeg_path)]
+    if len(available) <= 1:
+        return available
+    codec = meta.get("codec")
+    width, height = meta.get("width"), meta.get("height")
+    key = None
+    if codec and width and height:
+        key = f"backend_rank:{codec}:{width}x{height}:{','.join(b.name for b in available)}"
+    # Rankings are tied to the decoder binaries: FFmpeg when present, else this Python environment
+    anchor = ffmpeg_path or sys.executable
+    cache = default_cache() if (use_cache and key) else None
+    # Serialize calibration so concurrent batch jobs measure once and share the result
+    with _calibration_lock:
+        ranking = cache.get(anchor, key) if cache is not None else None
+        if not isinstance(ranking, list):
+            if on_message is not None:
+                on_message(f"Calibrating decoders for {codec or 'this video'} {width or '?'}x{height or '?'}…")
+            ranking = []
+            for backend in available:
+                fps = backend.calibrate(video_path, ffmpeg_path, start_s, threads=threads)
+                logger.info("Decoder calibration: %s -> %s", backend.name, f"{fps:.1f} fps" if fps else "failed")
+                if fps:
+                    ranking.append([backend.name, round(fps, 2)])
+            ranking.sort(key=lambda item: item[1], reverse=True)
+            if cache is not None and ranking:
+                cache.put(anchor, key, ranking)
+    ordered = [get_backend(name) for name, _fps in ranking if get_backend(name) in available]
+    if not ordered:
+        return available
+    logger.info("Decoder ranking: %s", ", ".join(f"{name} {fps:.0f} fps" for name, fps in ranking))
+    return ordered
@@ -0,0 +1,246 @@
+"""Batch queue: run extraction for many videos with a concurrency limit.
+
+Jobs are ordered by estimated decode cost (duration x resolution from ffprobe),
+largest first, so long videos start early and do not straggle at the end of a
+batch. Used by the CLI (`frame2image batch manifest.json`) and the GUI queue.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from .engine import ExtractionEngine
+from .probe import parse_time_to_seconds, probe_video_metadata_with_ffprobe
+
+logger = logging.getLogger("frame2image")
+
+# Manifest keys -> ExtractionEngine keyword arguments
+_MANIFEST_OPTIONS = {
+    "start": "start_time",
+    "end": "end_time",
+    "precision": "precision_count",
+    "format": "out_format",
+    "quality": "jpeg_quality",
+    "preset": "preset",
+    "png_level": "png_level",
+    "png_filter": "png_filter",
+    "every_n": "sample_every_n",
+    "every_t": "sample_every_t",
+    "encoder_threads": "encoder_threads",
+    "segments": "segments",
+    "backend": "backend",
+    "archive": "archive",
+    "shard_size": "shard_size_mb",
+    "resume": "resume",
+    "incremental": "incremental",
+    "keyframes": "keyframes_only",
+    "scene": "scene_threshold",
+    "dedup": "dedup_distance",
+}
+
+PENDING, RUNNING, DONE, CANCELED, FAILED = "pending", "running", "done", "canceled", "failed"
+
+
+@dataclass
+class BatchJob:
+    video: str
+    output: str
+    options: dict = field(default_factory=dict)
+    cost: float = 0.0
+    status: str = PENDING
+    current: int = 0
+    total: int = 0
+    frames_saved: int = 0
+    out_dir: Optional[str] = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    elapsed: float = 0.0
+
+
+def estimate_cost(video_path: str) -> float:
+    """Relative decode cost: duration x width x height (0 when ffprobe cannot tell)."""
+    meta = probe_video_metadata_with_ffprobe(video_path)
+    try:
+        dur = float(meta.get("duration") or 0.0)
+        w = int(meta.get("width") or 0)
+        h = int(meta.get("height") or 0)
+    except Exception:
+        return 0.0
+    return max(0.0, dur * w * h)
+
+
+def options_from_manifest(entry: dict) -> dict:
+    """Translate manifest keys (CLI-style names) into ExtractionEngine keyword arguments."""
+    opts: dict = {}
+    for key, value in entry.items():
+        name = _MANIFEST_OPTIONS.get(key.replace("-", "_"))
+        if name is None:
+            continue
+        if name in ("start_time", "end_time") and value is not None:
+            secs = parse_time_to_seconds(str(value))
+            if secs is None:
+                raise ValueError(f"invalid {key} time: {value!r}")
+            value = secs
+        opts[name] = value
+    return opts
+
+
+def load_manifest(path: str, default_output: Optional[str] = None, default_options: Optional[dict] = None) -> list[BatchJob]:
+    """Read a batch manifest.
+
+    JSON form: {"defaults": {...}, "jobs": [{"video": ..., "output": ..., ...}, ...]} or a plain
+    list of job objects/paths. Any other file is read as one video path per line
+    (blank lines and lines starting with '#' are ignored). Relative video paths are
+    resolved against the manifest's folder.
+    """
+    mpath = Path(path)
+    text = mpath.read_text(encoding="utf-8")
+    base = mpath.resolve().parent
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [ln.strip() for ln in text.splitlines() if ln.strip() and not ln.strip().startswith("#")]
+    defaults: dict = {}
+    if isinstance(data, dict):
+        defaults = dict(data.get("defaults") or {})
+        entries = data.get("jobs") or []
+    else:
+        entries = data
+    # Precedence: manifest defaults < caller defaults (CLI options) < per-job entries
+    shared = options_from_manifest(defaults)
+    shared.update(default_options or {})
+    jobs: list[BatchJob] = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"video": entry}
+        video = entry.get("video")
+        if not video:
+            raise ValueError(f"manifest entry without 'video': {entry!r}")
+        video_path = Path(os.path.expanduser(str(video)))
+        if not video_path.is_absolute():
+            video_path = base / video_path
+        output = entry.get("output") or default_output or defaults.get("output") or str(video_path.parent)
+        opts = dict(shared)
+        opts.update(options_from_manifest(entry))
+        jobs.append(BatchJob(video=str(video_path), output=str(os.path.expanduser(str(output))), options=opts))
+    return jobs
+
+
+class BatchScheduler:
+    """Run BatchJobs on a bounded number of concurrent extraction engines.
+
+    `on_job_update(index, job)` fires whenever a job changes state or reports progress
+    (from worker threads). `run` blocks until all jobs finished or were canceled and
+    returns the jobs in their original order.
+    """
+
+    def __init__(self, jobs: list[BatchJob], concurrency: int = 2,
+                 on_job_update: Optional[Callable[[int, BatchJob], None]] = None):
+        self.jobs = list(jobs)
+        self.concurrency = max(1, int(concurrency))
+        self._on_job_update = on_job_update
+        self._cancel = False
+        self._lock = threading.Lock()
+        self._engines: dict[int, ExtractionEngine] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def _notify(self, index: int) -> None:
+        if self._on_job_update is not None:
+            try:
+                self._on_job_update(index, self.jobs[index])
+            except Exception:
+                logger.debug("Batch job update callback failed", exc_info=True)
+
+    def plan(self) -> list[int]:
+        """Estimate each job's cost and return job indices in scheduling order (largest first)."""
+        for job in self.jobs:
+            if job.cost <= 0:
+                job.cost = estimate_cost(job.video)
+        return sorted(range(len(self.jobs)), key=lambda i: self.jobs[i].cost, reverse=True)
+
+    def _run_job(self, index: int) -> None:
+        job = self.jobs[index]
+        if self._cancel:
+            job.status = CANCELED
+            self._notify(index)
+            return
+
+        def on_progress(current: int, total: int) -> None:
+            job.current = current
+            job.total = total
+            self._notify(index)
+
+        opts = dict(job.options)
+        if not opts.get("encoder_threads"):
+            # Share the cores between concurrently running jobs instead of oversubscribing
+            opts["encoder_threads"] = max(1, (os.cpu_count() or 1) // self.concurrency)
+        engine = ExtractionEngine(job.video, job.output, on_progress=on_progress, **opts)
+        with self._lock:
+            self._engines[index] = engine
+            if self._cancel:
+                engine.cancel()
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._notify(index)
+        try:
+            if not Path(job.video).exists():
+                raise FileNotFoundError(f"Video not found: {job.video}")
+            Path(job.output).mkdir(parents=True, exist_ok=True)
+            result = engine.run()
+            job.frames_saved = result.frames_saved
+            job.out_dir = result.out_dir
+            job.status = DONE if result.success else CANCELED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger.warning("Batch job failed for %s: %s", job.video, e)
+        finally:
+            job.elapsed = time.time() - (job.started_at or time.time())
+            with self._lock:
+                self._engines.pop(index, None)
+            self._notify(index)
+
+    def run(self) -> list[BatchJob]:
+        self.started_at = time.time()
+        order = self.plan()
+        logger.info("Batch start: %d jobs, concurrency=%d", len(order), self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="f2i-batch") as ex:
+            for i in order:
+                ex.submit(self._run_job, i)
+        self.finished_at = time.time()
+        logger.info("Batch finished: %s", self.summary())
+        return self.jobs
+
+    def cancel(self) -> None:
+        """Cancel running jobs and skip the ones that have not started yet."""
+        with self._lock:
+            self._cancel = True
+            engines = list(self._engines.values())
+        for engine in engines:
+            engine.cancel()
+        logger.info("Batch cancel requested")
+
+    def aggregate(self) -> tuple[int, int, float]:
+        """Return (frames_done, frames_total, frames_per_second) across all jobs so far."""
+        done = 0
+        total = 0
+        for job in self.jobs:
+            done += job.frames_saved if job.status in (DONE, CANCELED, FAILED) else job.current
+            total += max(job.total, job.frames_saved)
+        end = self.finished_at or time.time()
+        elapsed = (end - self.started_at) if self.started_at else 0.0
+        fps = (done / elapsed) if elapsed > 0 else 0.0
+        return done, total, fps
+
+    def summary(self) -> str:
+        counts = {s: sum(1 for j in self.jobs if j.status == s) for s in (DONE, FAILED, CANCELED)}
+        done, _total, fps = self.aggregate()
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        return (f"{counts[DONE]} done, {counts[FAILED]} failed, {counts[CANCELED]} canceled; "
+                f"{done} frames in {elapsed:.1f}s ({fps:.1f} fps aggregate)")
@@ -0,0 +1,171 @@
+"""Persistent on-disk cache for probe results (ffprobe metadata, precise frame counts).
+
+Entries are keyed by the file's identity (resolved path, size, mtime, inode) plus a
+value name, so an edited or replaced file is probed again. The SQLite database lives
+under the user cache dir and is trimmed least-recently-used first once it grows past
+its size cap. Every failure is treated as a cache miss.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger("frame2image")
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_dir() -> Path:
+    """Cache folder: $FRAME2IMAGE_CACHE_DIR, else $XDG_CACHE_HOME/frame2image, else ~/.cache/frame2image."""
+    override = os.environ.get("FRAME2IMAGE_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "frame2image"
+
+
+def file_identity(path: str) -> Optional[tuple[str, int, int, int]]:
+    """Return (resolved_path, size, mtime_ns, inode) or None if the file cannot be stat'ed."""
+    try:
+        p = Path(path).resolve()
+        st = p.stat()
+        return str(p), int(st.st_size), int(st.st_mtime_ns), int(st.st_ino)
+    except Exception:
+        return None
+
+
+class MetadataCache:
+    """Small SQLite key/value store for per-file probe results with LRU eviction."""
+
+    def __init__(self, db_path: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db_path = Path(db_path) if db_path else cache_dir() / "metadata.sqlite3"
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+        if not self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " path TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL,"
+                " name TEXT NOT NULL, value TEXT NOT NULL, bytes INTEGER NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (path, name))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def get(self, path: str, name: str) -> Optional[Any]:
+        """Return the cached value for `name` if the file is unchanged since it was stored."""
+        ident = file_identity(path)
+        if ident is None:
+            return None
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    row = conn.execute(
+                        "SELECT size, mtime_ns, inode, value FROM entries WHERE path = ? AND name = ?",
+                        (ident[0], name),
+                    ).fetchone()
+                    if row is None or tuple(row[:3]) != ident[1:]:
+                        return None
+                    conn.execute(
+                        "UPDATE entries SET last_access = ? WHERE path = ? AND name = ?",
+                        (time.time(), ident[0], name),
+                    )
+                    conn.commit()
+                    return json.loads(row[3])
+                finally:
+                    conn.close()
+        except Exception as e:
+            logger.debug("Metadata cache read failed for %s/%s: %s", path, name, e)
+            return None
+
+    def put(self, path: str, name: str, value: Any) -> None:
+        """Store `value` (JSON-serializable) for the current identity of `path`."""
+        ident = file_identity(path)
+        if ident is None:
+            return
+        try:
+            payload = json.dumps(value, separators=(",", ":"))
+            with self._lock:
+                conn = self._connect()
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries (path, size, mtime_ns, inode, name, value, bytes, last_access)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (*ident, name, payload, len(payload), time.time()),
+                    )
+                    self._evict(conn)
+                    conn.commit()
+                finally:
+                    conn.close()
+        except Exception as e:
+            logger.debug("Metadata cache write failed for %s/%s: %s", path, name, e)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% of the cap so we do not evict on every insert
+        target = int(self.max_bytes * 0.9)
+        victims = []
+        for path, name, nbytes in conn.execute("SELECT path, name, bytes FROM entries ORDER BY last_access ASC"):
+            if total <= target:
+                break
+            victims.append((path, name))
+            total -= nbytes
+        conn.executemany("DELETE FROM entries WHERE path = ? AND name = ?", victims)
+        logger.debug("Metadata cache evicted %d entries", len(victims))
+
+    def stats(self) -> tuple[int, int]:
+        """Return (entries, payload_bytes)."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    row = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+                    return int(row[0]), int(row[1])
+                finally:
+                    conn.close()
+        except Exception:
+            return 0, 0
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM entries")
+                conn.commit()
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+
+
+_default_cache: Optional[MetadataCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Optional[MetadataCache]:
+    """Shared cache instance, or None when disabled with FRAME2IMAGE_NO_CACHE=1."""
+    global _default_cache
+    if os.environ.get("FRAME2IMAGE_NO_CACHE", "").lower() in {"1", "true", "yes", "on"}:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            max_mb = os.environ.get("FRAME2IMAGE_CACHE_MAX_MB")
+            try:
+                max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+            except Exception:
+                max_bytes = DEFAULT_MAX_BYTES
+            _default_cache = MetadataCache(max_bytes=max_bytes)
+        return _default_cache
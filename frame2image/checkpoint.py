@@ -0,0 +1,317 @@
+"""Checkpoint manifests for resumable extraction.
+
+Every image-file extraction keeps ``extraction.json`` in its output folder. It records
+the source file's identity, the options that determine which frames are written and
+how they are named, and a watermark: the highest frame number N such that frames
+1..N are all completely written, together with that frame's source timestamp. The
+file is rewritten atomically at most once a second while the run progresses.
+
+A resumed run looks for the newest ``<stem>_frames*`` folder whose manifest matches
+the source and options, checks that the frames up to the watermark still exist,
+seeks just past the watermark frame and continues numbering (or stops at once if
+the folder is already complete).
+
+``frames.csv`` next to it lists every written frame with its file size, a BLAKE2b
+digest of the file and its source timestamp. Incremental runs verify the files
+against it (size first, then digest) and only decode the missing or corrupt ranges.
+"""
+import csv
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from .cache import file_identity
+
+logger = logging.getLogger("frame2image")
+
+MANIFEST_NAME = "extraction.json"
+MANIFEST_VERSION = 1
+INDEX_NAME = "frames.csv"
+_INDEX_HEADER = ["frame", "name", "size", "blake2b", "time"]
+# Minimum seconds between manifest rewrites while extracting
+CHECKPOINT_INTERVAL = 1.0
+
+RUNNING, COMPLETE, CANCELED, FAILED = "running", "complete", "canceled", "failed"
+
+
+def source_fingerprint(video_path: str) -> Optional[dict]:
+    ident = file_identity(video_path)
+    if ident is None:
+        return None
+    return {"path": ident[0], "size": ident[1], "mtime_ns": ident[2]}
+
+
+def load_manifest(out_dir: Path) -> Optional[dict]:
+    try:
+        data = json.loads((Path(out_dir) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return None
+    return data
+
+
+def _frames_present(out_dir: Path, pad: int, ext: str, count: int) -> int:
+    """Number of leading frames 1..count that exist and are non-empty."""
+    for n in range(1, count + 1):
+        try:
+            if (out_dir / f"frame_{n:0{pad}d}.{ext}").stat().st_size <= 0:
+                return n - 1
+        except OSError:
+            return n - 1
+    return count
+
+
+def find_resumable(base_out: Path, video_path: str, params: dict) -> Optional[tuple[Path, dict]]:
+    """Newest output folder (``base_out`` or ``base_out_<n>``) for this source and options, with its manifest."""
+    fingerprint = source_fingerprint(video_path)
+    if fingerprint is None:
+        return None
+    candidates = [base_out] if base_out.is_dir() else []
+    idx = 1
+    while True:
+        d = base_out.parent / f"{base_out.name}_{idx}"
+        if not d.is_dir():
+            break
+        candidates.append(d)
+        idx += 1
+    for d in reversed(candidates):
+        manifest = load_manifest(d)
+        if manifest is None:
+            continue
+        if manifest.get("source") != fingerprint or manifest.get("params") != params:
+            logger.debug("Not resuming %s: source or options differ", d)
+            continue
+        return d, manifest
+    return None
+
+
+def check_watermark(out_dir: Path, manifest: dict) -> None:
+    """Lower the manifest's watermark to the frames actually found on disk.
+
+    A complete folder with missing frames is reported as running again.
+    """
+    done = int(manifest.get("frames_done") or 0)
+    present = _frames_present(out_dir, int(manifest.get("pad") or 6), str(manifest.get("ext") or "png"), done)
+    if present < done:
+        logger.info("Resume watermark lowered from %d to %d: frames missing in %s", done, present, out_dir)
+        manifest["frames_done"] = present
+        manifest["status"] = RUNNING
+        # The timestamp belonged to the old watermark; only the exact frame time is usable
+        times = manifest.get("frame_times") or {}
+        manifest["last_time"] = times.get(str(present))
+
+
+def next_start_time(last_time: float, params: dict, fps: Optional[float]) -> Optional[float]:
+    """Source time to seek to so the first decoded frame is the one after `last_time` in the sampling grid."""
+    period = float(params.get("sample_every_t") or 0.0)
+    origin = float(params.get("start_time") or 0.0)
+    if period > 0:
+        # Next point on the start + k*T grid strictly after the last written frame
+        k = math.floor((last_time - origin) / period + 1e-6) + 1
+        return origin + k * period
+    if not fps or fps <= 0:
+        return None
+    step = max(1, int(params.get("sample_every_n") or 1)) / float(fps)
+    # A quarter frame early: FFmpeg keeps frames at or after the seek point, OpenCV
+    # snaps to the nearest frame, and both land on the next sampled frame
+    return last_time + step - 0.25 / float(fps)
+
+
+class ExtractionCheckpoint:
+    """Writes extraction.json for one run; thread-safe, throttled, atomic."""
+
+    def __init__(self, out_dir: Path, video_path: str, params: dict, pad: int, ext: str,
+                 frames_done: int = 0, last_time: Optional[float] = None):
+        self.out_dir = Path(out_dir)
+        self.path = self.out_dir / MANIFEST_NAME
+        self.source = source_fingerprint(video_path)
+        self.params = params
+        self.pad = pad
+        self.ext = ext
+        self.frames_done = int(frames_done)
+        self.last_time = last_time
+        self.status = RUNNING
+        # Times of the few most recent frames, so a watermark lowered on resume can still seek exactly
+        self._recent_times: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._written_at = 0.0
+
+    def update(self, frames_done: int, last_time: Optional[float], force: bool = False) -> None:
+        with self._lock:
+            self.frames_done = int(frames_done)
+            self.last_time = last_time
+            if last_time is not None:
+                self._recent_times[str(self.frames_done)] = round(float(last_time), 6)
+                if len(self._recent_times) > 64:
+                    for key in sorted(self._recent_times, key=int)[:-64]:
+                        del self._recent_times[key]
+            now = time.monotonic()
+            if not force and now - self._written_at < CHECKPOINT_INTERVAL:
+                return
+            self._written_at = now
+            self._write()
+
+    def finish(self, status: str, frames_done: Optional[int] = None, last_time: Optional[float] = None) -> None:
+        with self._lock:
+            self.status = status
+            if frames_done is not None:
+                self.frames_done = int(frames_done)
+                self.last_time = last_time
+            self._write()
+
+    def _write(self) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "status": self.status,
+            "source": self.source,
+            "params": self.params,
+            "pad": self.pad,
+            "ext": self.ext,
+            "frames_done": self.frames_done,
+            "last_time": None if self.last_time is None else round(float(self.last_time), 6),
+            "frame_times": self._recent_times,
+            "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        tmp = self.path.with_suffix(".json.tmp")
+        try:
+            tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.debug("Checkpoint write failed for %s: %s", self.path, e)
+
+
+# -------------------------
+# Per-frame index
+# -------------------------
+def frame_digest(data) -> str:
+    """Short BLAKE2b hex digest of encoded frame bytes (any buffer)."""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def file_digest(path: Path) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return frame_digest(f.read())
+    except OSError:
+        return None
+
+
+class FrameIndex:
+    """Appends one ``frames.csv`` row per completely written frame; thread-safe.
+
+    Rows are flushed as they are written, so the index survives a killed run. A
+    frame written more than once (repairs, resumed runs) keeps its last row.
+    """
+
+    def __init__(self, out_dir: Path):
+        self.path = Path(out_dir) / INDEX_NAME
+        self._lock = threading.Lock()
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        self._fh = open(self.path, "a", newline="", encoding="utf-8", buffering=1)
+        self._writer = csv.writer(self._fh)
+        if new:
+            self._writer.writerow(_INDEX_HEADER)
+
+    def add(self, frame_no: int, name: str, size: int, digest: str, t: Optional[float]) -> None:
+        with self._lock:
+            self._writer.writerow([frame_no, name, size, digest, "" if t is None else f"{t:.6f}"])
+
+    def add_files(self, out_dir: Path, names: list[tuple[int, str, Optional[float]]], threads: int = 1) -> None:
+        """Index files written by someone else (FFmpeg's image muxer): (frame, name, time) each."""
+        def entry(item):
+            frame_no, name, t = item
+            path = Path(out_dir) / name
+            try:
+                size = path.stat().st_size
+            except OSError:
+                return None
+            digest = file_digest(path)
+            return None if digest is None else (frame_no, name, size, digest, t)
+
+        with ThreadPoolExecutor(max_workers=max(1, int(threads)), thread_name_prefix="f2i-index") as ex:
+            for row in ex.map(entry, names):
+                if row is not None:
+                    self.add(*row)
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+
+
+def load_frame_index(out_dir: Path) -> dict[int, dict]:
+    """Rows of ``frames.csv`` by frame number (last row wins); empty if there is none."""
+    rows: dict[int, dict] = {}
+    try:
+        with open(Path(out_dir) / INDEX_NAME, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    frame_no = int(row["frame"])
+                    rows[frame_no] = {
+                        "name": row["name"],
+                        "size": int(row["size"]),
+                        "blake2b": row["blake2b"],
+                        "time": float(row["time"]) if row.get("time") else None,
+                    }
+                except (KeyError, TypeError, ValueError):
+                    continue
+    except OSError:
+        pass
+    return rows
+
+
+def rewrite_frame_index(out_dir: Path, rows: dict[int, dict]) -> None:
+    """Replace ``frames.csv`` with one row per frame in `rows` (atomic)."""
+    path = Path(out_dir) / INDEX_NAME
+    tmp = path.with_suffix(".csv.tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(_INDEX_HEADER)
+        for frame_no in sorted(rows):
+            row = rows[frame_no]
+            writer.writerow([frame_no, row["name"], row["size"], row["blake2b"],
+                             "" if row["time"] is None else f"{row['time']:.6f}"])
+    os.replace(tmp, path)
+
+
+def verify_frames(out_dir: Path, rows: dict[int, dict], threads: int = 1,
+                  should_cancel: Optional[Callable[[], bool]] = None) -> set[int]:
+    """Frame numbers in `rows` whose file is missing, has another size or another digest."""
+    out_dir = Path(out_dir)
+
+    def bad(frame_no: int) -> bool:
+        if should_cancel is not None and should_cancel():
+            return False
+        row = rows[frame_no]
+        path = out_dir / row["name"]
+        try:
+            if path.stat().st_size != row["size"]:
+                return True
+        except OSError:
+            return True
+        return file_digest(path) != row["blake2b"]
+
+    numbers = sorted(rows)
+    with ThreadPoolExecutor(max_workers=max(1, int(threads)), thread_name_prefix="f2i-verify") as ex:
+        return {n for n, is_bad in zip(numbers, ex.map(bad, numbers)) if is_bad}
+
+
+def frame_ranges(numbers) -> list[tuple[int, int]]:
+    """Contiguous (first, count) runs of the given frame numbers."""
+    ranges: list[tuple[int, int]] = []
+    for n in sorted(numbers):
+        if ranges and ranges[-1][0] + ranges[-1][1] == n:
+            ranges[-1] = (ranges[-1][0], ranges[-1][1] + 1)
+        else:
+            ranges.append((n, 1))
+    return ranges
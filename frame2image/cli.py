@@ -0,0 +1,315 @@
+"""Headless command-line interface: `python -m frame2image extract video.mp4 -o out`.
+
+This module must not import PySide6 so it runs on machines without a display.
+"""
+import argparse
+import logging
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from . import __version__
+from .archive import ARCHIVE_FORMATS, DEFAULT_SHARD_MB
+from .cache import default_cache
+from .batch import CANCELED, DONE, FAILED, RUNNING, BatchJob, BatchScheduler, load_manifest
+from .encoders import DEFAULT_PRESET, PNG_FILTERS, PNG_LEVELS, PRESETS, format_names, measure_png_levels
+from .engine import BACKENDS, ExtractionEngine, default_encoder_threads
+from .probe import format_seconds, parse_time_to_seconds
+from .rawout import RAW_FORMATS
+from .thumbnails import clear_thumbnails
+
+logger = logging.getLogger("frame2image")
+
+
+def _time_arg(value: str) -> float:
+    secs = parse_time_to_seconds(value)
+    if secs is None or secs < 0:
+        raise argparse.ArgumentTypeError(f"invalid time '{value}' (use HH:MM:SS(.ms), MM:SS(.ms) or seconds)")
+    return secs
+
+
+class _ProgressPrinter:
+    """Render engine progress on stderr: one rewritten line on a TTY, periodic lines otherwise."""
+
+    def __init__(self, stream=None, interval: float = 0.5):
+        self.stream = stream or sys.stderr
+        self.interval = interval if self.stream.isatty() else 5.0
+        self._tty = self.stream.isatty()
+        self._started = time.time()
+        self._last = 0.0
+        self._last_value: Optional[tuple[int, int]] = None
+        self._dirty = False
+
+    def progress(self, current: int, total: int) -> None:
+        now = time.time()
+        if (current, total) == self._last_value:
+            return
+        if now - self._last < self.interval and not (total > 0 and current >= total):
+            return
+        self._last = now
+        self._last_value = (current, total)
+        elapsed = now - self._started
+        fps = (current / elapsed) if elapsed > 0 else 0.0
+        if total > 0:
+            eta_s = (total - current) / fps if fps > 0 else 0
+            text = f"{current} / {total} frames — {fps:.1f} fps — ETA {format_seconds(eta_s)}"
+        else:
+            text = f"{current} frames — {fps:.1f} fps"
+        if self._tty:
+            self.stream.write("\r\033[K" + text)
+            self._dirty = True
+        else:
+            self.stream.write(text + "\n")
+        self.stream.flush()
+
+    def message(self, text: str) -> None:
+        self.end_line()
+        self.stream.write(text + "\n")
+        self.stream.flush()
+
+    def end_line(self) -> None:
+        if self._dirty:
+            self.stream.write("\n")
+            self._dirty = False
+
+
+# CLI option dest -> ExtractionEngine keyword argument
+_ENGINE_OPTIONS = {
+    "start": "start_time",
+    "end": "end_time",
+    "precision": "precision_count",
+    "format": "out_format",
+    "quality": "jpeg_quality",
+    "preset": "preset",
+    "png_level": "png_level",
+    "png_filter": "png_filter",
+    "every_n": "sample_every_n",
+    "every_t": "sample_every_t",
+    "encoder_threads": "encoder_threads",
+    "segments": "segments",
+    "backend": "backend",
+    "stream": "stream_to",
+    "archive": "archive",
+    "shard_size": "shard_size_mb",
+    "resume": "resume",
+    "incremental": "incremental",
+    "keyframes": "keyframes_only",
+    "scene": "scene_threshold",
+    "dedup": "dedup_distance",
+}
+
+
+def _engine_options(args: argparse.Namespace) -> dict:
+    """Collect engine keyword arguments from parsed options (absent options are skipped)."""
+    return {kw: getattr(args, dest) for dest, kw in _ENGINE_OPTIONS.items() if hasattr(args, dest)}
+
+
+def _add_extract_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("video", help="Input video file")
+    p.add_argument("-o", "--output", required=True, help="Output folder (frames go into <video_name>_frames/)")
+    p.add_argument("--stream", metavar="PATH", default=None,
+                   help="Stream raw BGR24 frames to PATH (a named pipe) or - for stdout; the JSON sidecar still goes to the output folder")
+    _add_engine_args(p)
+
+
+def _add_batch_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("manifest", help="JSON manifest ({\"defaults\": {...}, \"jobs\": [...]}) or text file with one video per line")
+    p.add_argument("-o", "--output", help="Default output folder for jobs without one (default: next to each video)")
+    p.add_argument("-j", "--jobs", type=int, help="Videos extracted concurrently (default: 2)")
+    _add_engine_args(p)
+
+
+def _add_engine_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--start", type=_time_arg, default=None, help="Start time (HH:MM:SS(.ms), MM:SS(.ms) or seconds)")
+    p.add_argument("--end", type=_time_arg, default=None, help="End time (HH:MM:SS(.ms), MM:SS(.ms) or seconds)")
+    p.add_argument("--every-n", type=int, default=1, metavar="N", help="Save one out of every N frames (default: 1)")
+    p.add_argument("--every-t", type=float, default=0.0, metavar="SECONDS",
+                   help="Save one frame every T seconds; overrides --every-n when > 0")
+    p.add_argument("--keyframes", action="store_true",
+                   help="Decode and save keyframes only (much faster on long videos); --every-n then keeps every Nth keyframe "
+                        "and --every-t the keyframe nearest each T-second point")
+    p.add_argument("--scene", type=float, default=0.0, metavar="SCORE",
+                   help="Save only frames at scene changes: scene score (0-1, as FFmpeg's select filter) above SCORE, "
+                        "e.g. 0.3; applied after --every-n/--every-t (default: 0 = off)")
+    p.add_argument("--dedup", type=int, default=None, metavar="BITS",
+                   help="Skip frames whose perceptual hash (64-bit dHash) is within BITS bits of the last saved frame, "
+                        "e.g. 4; skipped ranges go to duplicates.csv (default: off)")
+    p.add_argument("--format", choices=[*format_names(), "jpg", *RAW_FORMATS], default="png",
+                   help="Output format: image files, or one memory-mappable .npy/.raw array with a JSON sidecar (default: png)")
+    p.add_argument("--preset", choices=list(PRESETS), default=DEFAULT_PRESET,
+                   help=f"Encoder speed/size trade-off for image formats (default: {DEFAULT_PRESET})")
+    p.add_argument("--archive", choices=list(ARCHIVE_FORMATS), default=None,
+                   help="Pack encoded frames into tar (WebDataset-style) or zip shards with an index.csv instead of loose files")
+    p.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_MB, metavar="MB",
+                   help=f"Start a new archive shard after this many megabytes (default: {DEFAULT_SHARD_MB})")
+    p.add_argument("--png-level", type=int, choices=list(PNG_LEVELS), default=None, metavar="0-9",
+                   help="PNG zlib compression level; overrides the preset (0 = fastest/largest, 9 = slowest/smallest)")
+    p.add_argument("--png-filter", choices=list(PNG_FILTERS), default="auto",
+                   help="PNG row filter (default: auto = encoder default)")
+    p.add_argument("--quality", type=int, default=90, help="Quality 1-100 for JPEG, lossy WebP and AVIF (default: 90)")
+    p.add_argument("--precision", action="store_true", help="Exact frame count via ffprobe -count_frames (slower)")
+    p.add_argument("--resume", action="store_true",
+                   help="Continue the newest unfinished extraction of this video with the same options instead of starting a new folder")
+    p.add_argument("--incremental", action="store_true",
+                   help="Re-run into the newest folder with the same options: verify frames against frames.csv and only "
+                        "re-extract missing or corrupt ones (and any unfinished tail)")
+    p.add_argument("--encoder-threads", type=int, default=0, metavar="N",
+                   help=f"Encoder threads on the CPU path (default: auto = {default_encoder_threads()})")
+    p.add_argument("--segments", type=int, default=1, metavar="N",
+                   help="Decode N keyframe-aligned segments in parallel FFmpeg processes (default: 1)")
+    p.add_argument("--backend", choices=list(BACKENDS), default="auto",
+                   help="Decoder backend; auto benchmarks the available ones on the input and uses the fastest (default: auto)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="frame2image", description="Extract video frames to images without the GUI.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="More log output (-v INFO, -vv DEBUG)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    _add_extract_args(sub.add_parser("extract", help="Extract frames from one video"))
+    # Batch options only override manifest defaults when given explicitly
+    _add_batch_args(sub.add_parser("batch", help="Extract frames from many videos listed in a manifest",
+                                   argument_default=argparse.SUPPRESS))
+    measure_p = sub.add_parser("measure", help="Encode sample frames at every PNG level and report ms/frame and bytes/frame")
+    measure_p.add_argument("video", help="Input video file")
+    measure_p.add_argument("--frames", type=int, default=8, metavar="N", help="Sample frames spread over the range (default: 8)")
+    measure_p.add_argument("--png-filter", choices=list(PNG_FILTERS), default="auto", help="PNG row filter (default: auto)")
+    measure_p.add_argument("--start", type=_time_arg, default=None, help="Start of the sampled range")
+    measure_p.add_argument("--end", type=_time_arg, default=None, help="End of the sampled range")
+    cache_p = sub.add_parser("cache", help="Show or clear the persistent metadata cache")
+    cache_p.add_argument("--clear", action="store_true", help="Delete all cached probe results and filmstrip thumbnails")
+    return parser
+
+
+def _cmd_extract(args: argparse.Namespace) -> int:
+    if args.start is not None and args.end is not None and args.end <= args.start:
+        print("error: --end must be greater than --start", file=sys.stderr)
+        return 2
+    printer = _ProgressPrinter()
+    engine = ExtractionEngine(
+        args.video,
+        args.output,
+        on_progress=printer.progress,
+        on_message=printer.message,
+        **_engine_options(args),
+    )
+
+    # First Ctrl-C cancels cleanly (queued frames are still written); a second one aborts
+    def on_sigint(_signum, _frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        printer.message("Canceling…")
+        engine.cancel()
+
+    previous = signal.signal(signal.SIGINT, on_sigint)
+    started = time.time()
+    try:
+        result = engine.run()
+    except Exception as e:
+        printer.end_line()
+        logger.debug("Extraction failed", exc_info=True)
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    printer.end_line()
+    elapsed = time.time() - started
+    print(f"{result.frames_saved} frames saved to {result.out_dir} in {elapsed:.1f}s", file=sys.stderr)
+    # stdout carries the frames themselves when streaming there
+    print(result.out_dir, file=sys.stderr if args.stream == "-" else sys.stdout)
+    return 130 if result.canceled else 0
+
+
+def _cmd_batch(args: argparse.Namespace) -> int:
+    try:
+        jobs = load_manifest(args.manifest, getattr(args, "output", None), _engine_options(args))
+    except Exception as e:
+        print(f"error: could not read manifest: {e}", file=sys.stderr)
+        return 2
+    if not jobs:
+        print("error: manifest lists no videos", file=sys.stderr)
+        return 2
+    printer = _ProgressPrinter()
+    scheduler: Optional[BatchScheduler] = None
+    announced: set[int] = set()
+
+    def on_job_update(index: int, job: BatchJob) -> None:
+        name = Path(job.video).name
+        if job.status == RUNNING and index not in announced:
+            announced.add(index)
+            printer.message(f"[{index + 1}/{len(jobs)}] start {name}")
+        elif job.status in (DONE, CANCELED, FAILED):
+            detail = job.error if job.status == FAILED else f"{job.frames_saved} frames in {job.elapsed:.1f}s"
+            printer.message(f"[{index + 1}/{len(jobs)}] {job.status} {name}: {detail}")
+        if scheduler is not None:
+            done, total, _fps = scheduler.aggregate()
+            printer.progress(done, total)
+
+    scheduler = BatchScheduler(jobs, getattr(args, "jobs", 2), on_job_update=on_job_update)
+
+    def on_sigint(_signum, _frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        printer.message("Canceling batch…")
+        scheduler.cancel()
+
+    previous = signal.signal(signal.SIGINT, on_sigint)
+    try:
+        scheduler.run()
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    printer.end_line()
+    print(scheduler.summary(), file=sys.stderr)
+    for job in jobs:
+        if job.out_dir:
+            print(job.out_dir)
+    if any(job.status == FAILED for job in jobs):
+        return 1
+    return 130 if any(job.status == CANCELED for job in jobs) else 0
+
+
+def _cmd_measure(args: argparse.Namespace) -> int:
+    print(f"{'level':>5}  {'ms/frame':>9}  {'bytes/frame':>12}  {'MB/1000 frames':>14}")
+
+    def on_result(row: dict) -> None:
+        mb = row["bytes_per_frame"] * 1000 / (1024 * 1024)
+        print(f"{row['level']:>5}  {row['ms_per_frame']:>9.1f}  {row['bytes_per_frame']:>12,}  {mb:>14.1f}", flush=True)
+
+    try:
+        measure_png_levels(args.video, png_filter=args.png_filter, sample_count=max(1, args.frames),
+                           start_s=args.start or 0.0, end_s=args.end, on_result=on_result)
+    except Exception as e:
+        logger.debug("Measurement failed", exc_info=True)
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _cmd_cache(args: argparse.Namespace) -> int:
+    cache = default_cache()
+    if cache is None:
+        print("Metadata cache is disabled (FRAME2IMAGE_NO_CACHE is set).", file=sys.stderr)
+        return 0
+    if args.clear:
+        cache.clear()
+        clear_thumbnails()
+    entries, size = cache.stats()
+    print(f"{cache.db_path}: {entries} entries, {size / (1024 * 1024):.1f} MB (cap {cache.max_bytes / (1024 * 1024):.0f} MB)")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    level = logging.WARNING if args.verbose <= 0 else (logging.INFO if args.verbose == 1 else logging.DEBUG)
+    logging.basicConfig(level=level, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s", stream=sys.stderr)
+    if args.command == "extract":
+        return _cmd_extract(args)
+    if args.command == "batch":
+        return _cmd_batch(args)
+    if args.command == "measure":
+        return _cmd_measure(args)
+    if args.command == "cache":
+        return _cmd_cache(args)
+    parser.error(f"unknown command {args.command}")
+    return 2
@@ -0,0 +1,241 @@
+"""Image output formats and speed/size presets.
+
+Each format knows how to encode with OpenCV (`cv2.imwrite`/`cv2.imencode` parameters)
+and with FFmpeg's image muxer (encoder name and options). Presets trade encode time
+for file size and map to per-format settings for both:
+
+- ``fastest``: lowest CPU per frame (e.g. PNG level 1, WebP method 0, TIFF PackBits)
+- ``balanced``: the previous defaults (PNG level 3)
+- ``smallest``: slowest, smallest files (PNG level 9, WebP method 6, TIFF Deflate)
+
+Not every build can encode every format: OpenCV may lack QOI or AVIF and FFmpeg may
+lack libwebp. `cv2_can_encode` and `ffmpeg_can_encode` probe that once per process;
+the engine then lets the other side do the encoding.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional
+
+from .probe import ffmpeg_capabilities
+
+logger = logging.getLogger("frame2image")
+
+PRESETS = ("fastest", "balanced", "smallest")
+DEFAULT_PRESET = "balanced"
+
+# PNG row filters understood by both FFmpeg (-pred) and OpenCV (IMWRITE_PNG_FILTER); auto = encoder default
+PNG_FILTERS = ("auto", "none", "sub", "up", "avg", "paeth", "mixed")
+PNG_LEVELS = tuple(range(10))
+
+
+@dataclass(frozen=True)
+class ImageFormat:
+    name: str
+    label: str
+    ext: str
+    lossless: bool
+    uses_quality: bool = False
+    ffmpeg_encoder: Optional[str] = None  # None: FFmpeg's image muxer cannot write it
+
+    def cv2_params(self, preset: str = DEFAULT_PRESET, quality: int = 90,
+                   png_level: Optional[int] = None, png_filter: str = "auto") -> list[int]:
+        """Parameters for cv2.imwrite/imencode. `png_level`/`png_filter` override the preset for PNG."""
+        import cv2
+
+        p = _preset_index(preset)
+        q = int(max(1, min(100, quality)))
+        if self.name == "png":
+            params = [cv2.IMWRITE_PNG_COMPRESSION, _png_level(png_level, p)]
+            if png_filter in PNG_FILTERS[1:] and hasattr(cv2, "IMWRITE_PNG_FILTER"):
+                value = cv2.IMWRITE_PNG_ALL_FILTERS if png_filter == "mixed" else getattr(cv2, f"IMWRITE_PNG_FILTER_{png_filter.upper()}")
+                params += [cv2.IMWRITE_PNG_FILTER, value]
+            return params
+        if self.name == "jpeg":
+            params = [cv2.IMWRITE_JPEG_QUALITY, q]
+            if p == 2:
+                params += [cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+            return params
+        if self.name == "webp":
+            return [cv2.IMWRITE_WEBP_QUALITY, q]
+        if self.name == "webp-lossless":
+            # Quality above 100 selects libwebp's lossless mode
+            return [cv2.IMWRITE_WEBP_QUALITY, 101]
+        if self.name == "tiff":
+            compression = (cv2.IMWRITE_TIFF_COMPRESSION_PACKBITS, cv2.IMWRITE_TIFF_COMPRESSION_LZW,
+                           cv2.IMWRITE_TIFF_COMPRESSION_ADOBE_DEFLATE)[p]
+            params = [cv2.IMWRITE_TIFF_COMPRESSION, compression]
+            if p > 0:
+                params += [cv2.IMWRITE_TIFF_PREDICTOR, cv2.IMWRITE_TIFF_PREDICTOR_HORIZONTAL]
+            return params
+        if self.name == "avif" and hasattr(cv2, "IMWRITE_AVIF_QUALITY"):
+            # Speed 0 (slowest) .. 10 (fastest)
+            return [cv2.IMWRITE_AVIF_QUALITY, q, cv2.IMWRITE_AVIF_SPEED, (10, 8, 6)[p]]
+        return []
+
+    def ffmpeg_args(self, preset: str = DEFAULT_PRESET, quality: int = 90,
+                    png_level: Optional[int] = None, png_filter: str = "auto") -> list[str]:
+        """Output options for FFmpeg's image muxer (encoder and its settings)."""
+        p = _preset_index(preset)
+        q = int(max(1, min(100, quality)))
+        args = ["-c:v", self.ffmpeg_encoder] if self.ffmpeg_encoder else []
+        if self.name == "png":
+            args += ["-compression_level", str(_png_level(png_level, p))]
+            if png_filter in PNG_FILTERS[1:]:
+                args += ["-pred", png_filter]
+            return args
+        if self.name == "jpeg":
+            # Map 1..100 -> qscale 31..2 (lower is better)
+            qscale = int(round(31 - (q / 100.0) * 29))
+            return args + ["-q:v", str(max(2, min(31, qscale)))]
+        if self.name == "webp":
+            return args + ["-quality", str(q), "-compression_level", str((0, 4, 6)[p])]
+        if self.name == "webp-lossless":
+            # In lossless mode quality is libwebp's effort; 100 is ~5x slower than 75 for ~3% smaller files
+            return args + ["-lossless", "1", "-quality", str((0, 50, 75)[p]), "-compression_level", str((0, 3, 6)[p])]
+        if self.name == "tiff":
+            return args + ["-compression_algo", ("packbits", "lzw", "deflate")[p]]
+        return args
+
+
+def _png_level(level: Optional[int], preset_index: int) -> int:
+    if level is None or int(level) < 0:
+        return (1, 3, 9)[preset_index]
+    return int(min(9, int(level)))
+
+
+def _preset_index(preset: str) -> int:
+    try:
+        return PRESETS.index((preset or DEFAULT_PRESET).strip().lower())
+    except ValueError:
+        return PRESETS.index(DEFAULT_PRESET)
+
+
+# -------------------------
+# Registry
+# -------------------------
+_FORMATS: dict[str, ImageFormat] = {}
+
+
+def register_format(fmt: ImageFormat) -> None:
+    _FORMATS[fmt.name] = fmt
+
+
+def get_format(name: str) -> Optional[ImageFormat]:
+    key = (name or "").strip().lower()
+    if key == "jpg":
+        key = "jpeg"
+    return _FORMATS.get(key)
+
+
+def format_names() -> list[str]:
+    return list(_FORMATS)
+
+
+def registered_formats() -> list[ImageFormat]:
+    return list(_FORMATS.values())
+
+
+register_format(ImageFormat("png", "PNG (lossless)", "png", True, ffmpeg_encoder="png"))
+register_format(ImageFormat("jpeg", "JPEG (lossy)", "jpg", False, True, ffmpeg_encoder="mjpeg"))
+register_format(ImageFormat("webp", "WebP (lossy)", "webp", False, True, ffmpeg_encoder="libwebp"))
+register_format(ImageFormat("webp-lossless", "WebP (lossless)", "webp", True, ffmpeg_encoder="libwebp"))
+register_format(ImageFormat("qoi", "QOI (fast lossless)", "qoi", True, ffmpeg_encoder="qoi"))
+register_format(ImageFormat("tiff", "TIFF (lossless)", "tiff", True, ffmpeg_encoder="tiff"))
+# FFmpeg's image2 muxer cannot write AVIF; it is encoded with OpenCV (libavif)
+register_format(ImageFormat("avif", "AVIF (lossy)", "avif", False, True))
+
+
+# -------------------------
+# Capability checks
+# -------------------------
+@lru_cache(maxsize=None)
+def cv2_can_encode(name: str) -> bool:
+    """True if this OpenCV build encodes `name` (tested on a tiny image)."""
+    fmt = get_format(name)
+    if fmt is None:
+        return False
+    try:
+        import cv2
+        import numpy as np
+
+        ok, _buf = cv2.imencode(f".{fmt.ext}", np.zeros((8, 8, 3), np.uint8), fmt.cv2_params())
+        return bool(ok)
+    except Exception as e:
+        logger.debug("OpenCV cannot encode %s: %s", name, e)
+        return False
+
+
+def ffmpeg_can_encode(name: str, ffmpeg_path: Optional[str]) -> bool:
+    fmt = get_format(name)
+    if fmt is None or not fmt.ffmpeg_encoder or not ffmpeg_path:
+        return False
+    return fmt.ffmpeg_encoder in (ffmpeg_capabilities(ffmpeg_path).get("encoders") or [])
+
+
+# -------------------------
+# PNG level measurement
+# -------------------------
+def sample_frames(video_path: str, count: int = 8, start_s: float = 0.0, end_s: Optional[float] = None) -> list:
+    """Decode `count` BGR frames spread evenly over [start_s, end_s] (whole video by default)."""
+    import cv2
+
+    cap = cv2.VideoCapture(str(video_path))
+    frames = []
+    try:
+        if not cap.isOpened():
+            raise RuntimeError(f"Failed to open video: {video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        total = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+        duration = (total / fps) if fps > 0 and total > 0 else 0.0
+        stop = min(end_s, duration) if (end_s is not None and duration > 0) else (end_s or duration)
+        span = max(0.0, (stop or 0.0) - start_s)
+        for i in range(max(1, int(count))):
+            if span > 0:
+                cap.set(cv2.CAP_PROP_POS_MSEC, (start_s + span * (i + 0.5) / count) * 1000.0)
+            ret, frame = cap.read()
+            if ret:
+                frames.append(frame)
+    finally:
+        cap.release()
+    return frames
+
+
+def measure_png_levels(video_path: str, levels=PNG_LEVELS, png_filter: str = "auto", sample_count: int = 8,
+                       start_s: float = 0.0, end_s: Optional[float] = None,
+                       on_result: Optional[Callable[[dict], None]] = None,
+                       should_cancel: Optional[Callable[[], bool]] = None) -> list[dict]:
+    """Encode sample frames of the video as PNG at each level and report cost and size.
+
+    Returns one ``{"level", "ms_per_frame", "bytes_per_frame"}`` dict per level (single
+    encoder thread, OpenCV/zlib; FFmpeg's PNG encoder uses zlib as well).
+    """
+    import cv2
+
+    frames = sample_frames(video_path, sample_count, start_s, end_s)
+    if not frames:
+        raise RuntimeError("Could not decode any frames to measure")
+    png = get_format("png")
+    results = []
+    for level in levels:
+        if should_cancel is not None and should_cancel():
+            break
+        params = png.cv2_params(png_level=level, png_filter=png_filter)
+        total_bytes = 0
+        t0 = time.perf_counter()
+        for frame in frames:
+            ok, buf = cv2.imencode(".png", frame, params)
+            if ok:
+                total_bytes += len(buf)
+        elapsed = time.perf_counter() - t0
+        row = {
+            "level": int(level),
+            "ms_per_frame": round(elapsed * 1000.0 / len(frames), 2),
+            "bytes_per_frame": int(total_bytes / len(frames)),
+        }
+        logger.info("PNG level %d: %.1f ms/frame, %d bytes/frame", row["level"], row["ms_per_frame"], row["bytes_per_frame"])
+        results.append(row)
+        if on_result is not None:
+            on_result(row)
+    return results
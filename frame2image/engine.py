@@ -0,0 +1,1698 @@
+"""Qt-free frame extraction engine shared by the GUI and the headless CLI."""
+import os
+import math
+import time
+import queue
+import shutil
+import logging
+import threading
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from .archive import ARCHIVE_FORMATS, DEFAULT_SHARD_MB, ArchiveFrameSink
+from .backends import DecoderBackend, backend_names, get_backend, select_backends
+from .checkpoint import (
+    COMPLETE,
+    CANCELED,
+    FAILED,
+    ExtractionCheckpoint,
+    FrameIndex,
+    check_watermark,
+    find_resumable,
+    frame_digest,
+    frame_ranges,
+    load_frame_index,
+    next_start_time,
+    rewrite_frame_index,
+    verify_frames,
+)
+from .encoders import DEFAULT_PRESET, PNG_FILTERS, PRESETS, cv2_can_encode, ffmpeg_can_encode, get_format
+from .rawout import RAW_FORMATS, RawFrameWriter
+from .probe import (
+    KeyframeIndex,
+    find_ffmpeg,
+    probe_total_frames_precise_ffprobe,
+    probe_video_metadata_with_ffprobe,
+)
+from .selection import DUPLICATES_NAME, DedupFrameSink, SceneDetector, gray_thumbnail, pyav_thumbnail
+
+logger = logging.getLogger("frame2image")
+
+
+# -------------------------
+# Parallel frame encoding
+# -------------------------
+def default_encoder_threads() -> int:
+    """Number of encoder threads used when the user leaves the setting on Auto."""
+    return max(1, os.cpu_count() or 1)
+
+
+class FrameEncoderPool:
+    """Bounded pool of threads that encode frames with cv2.imencode and write the files.
+
+    The decode loop stays on the calling thread and hands frames to `submit`;
+    OpenCV releases the GIL while compressing, so PNG/JPEG encoding scales with
+    the number of threads. At most `max_pending` frames are queued or in flight;
+    `submit` blocks once that limit is reached, which keeps memory bounded.
+    """
+
+    def __init__(self, threads: int, max_pending: Optional[int] = None):
+        self.threads = max(1, int(threads))
+        self.max_pending = max(1, int(max_pending or self.threads * 2))
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="f2i-encode")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self.written = 0
+        import cv2
+        self._imencode = cv2.imencode
+
+    def submit(self, filename: Path, frame, params: list[int]) -> Future:
+        """Queue a frame for writing, blocking while the pool is saturated.
+
+        The returned future resolves to (size, digest) once the file is completely
+        written, or None if it was skipped after an earlier error.
+        """
+        self._raise_pending_error()
+        self._slots.acquire()
+        try:
+            return self._executor.submit(self._write, str(filename), frame, params)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _write(self, filename: str, frame, params: list[int]) -> Optional[tuple[int, str]]:
+        try:
+            if self._error is not None:
+                return None
+            ok, buf = self._imencode(os.path.splitext(filename)[1], frame, params)
+            if not ok:
+                raise RuntimeError(f"Failed to write frame to {filename}")
+            with open(filename, "wb") as f:
+                f.write(buf)
+            with self._lock:
+                self.written += 1
+            return len(buf), frame_digest(buf)
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            return None
+        finally:
+            self._slots.release()
+
+    def _raise_pending_error(self) -> None:
+        err = self._error
+        if err is not None:
+            raise err
+
+    def close(self) -> None:
+        """Wait for queued frames to be written; re-raise the first write error."""
+        self._executor.shutdown(wait=True)
+        self._raise_pending_error()
+
+
+class ImageFrameSink:
+    """Numbered image files (`frame_%0Nd.ext`) written through a FrameEncoderPool.
+
+    Same `write`/`close`/`abort` interface as rawout.RawFrameWriter, so decode loops do
+    not care whether frames end up as images or in one array file. Numbering starts at
+    `start_number`; `durable` is the highest frame number up to which every file has
+    been completely written (files finish out of order on the pool), with its source
+    time in `durable_time`. Written files are recorded in `index` when given.
+    """
+
+    def __init__(self, out_dir: Path, pad: int, ext: str, params: list[int], threads: int,
+                 shape: Optional[tuple[int, int]] = None, start_number: int = 1,
+                 index: Optional[FrameIndex] = None):
+        self.out_dir = out_dir
+        self.pad = pad
+        self.ext = ext
+        self.params = params
+        self.shape = shape
+        self.start_number = start_number
+        self.count = start_number - 1
+        self.durable = start_number - 1
+        self.durable_time: Optional[float] = None
+        self.index = index
+        self._done: set[int] = set()
+        self._times: dict[int, Optional[float]] = {}
+        self._lock = threading.Lock()
+        self.pool = FrameEncoderPool(threads)
+
+    @property
+    def frames(self) -> int:
+        return self.count - self.start_number + 1
+
+    def write(self, frame, t: Optional[float] = None) -> None:
+        self.count += 1
+        number = self.count
+        with self._lock:
+            self._times[number] = t
+        future = self.pool.submit(self.out_dir / f"frame_{number:0{self.pad}d}.{self.ext}", frame, self.params)
+        future.add_done_callback(lambda f, n=number: self._written(n, f))
+
+    def _written(self, number: int, future: Future) -> None:
+        if future.cancelled() or future.exception() is not None or not future.result():
+            return
+        with self._lock:
+            t = self._times.get(number)
+            self._done.add(number)
+            while self.durable + 1 in self._done:
+                self.durable += 1
+                self._done.discard(self.durable)
+                self.durable_time = self._times.pop(self.durable, None)
+        if self.index is not None:
+            size, digest = future.result()
+            self.index.add(number, f"frame_{number:0{self.pad}d}.{self.ext}", size, digest, t)
+
+    def write_bytes(self, data: bytes, t: Optional[float] = None) -> None:
+        """Accept one packed BGR24 frame (as piped from FFmpeg); needs `shape`."""
+        import numpy as np
+
+        if self.shape is None:
+            raise RuntimeError("Frame size unknown for raw byte input")
+        self.write(np.frombuffer(data, dtype=np.uint8).reshape(self.shape[0], self.shape[1], 3), t)
+
+    def close(self, extra: Optional[dict] = None) -> int:
+        # Drain queued writes even on cancel so no half-written files remain
+        self.pool.close()
+        return self.pool.written
+
+    def abort(self) -> None:
+        try:
+            self.pool.close()
+        except Exception:
+            pass
+
+
+# -------------------------
+# Sampling
+# -------------------------
+class FrameSampler:
+    """Decides per decoded frame whether it is saved, from its presentation timestamp.
+
+    With `every_t` the grid is start + k*T: the first frame at or after each grid point
+    is kept, and after a gap (variable frame rate) sampling continues at the next grid
+    point after that frame instead of catching up with a burst of frames. Otherwise
+    every `every_n`-th frame counted from the window start is kept. Frames without a
+    timestamp get one from their index and `fps` when that is known.
+    """
+
+    def __init__(self, start_s: float = 0.0, every_n: int = 1, every_t: float = 0.0, fps: Optional[float] = None):
+        self.start_s = float(start_s or 0.0)
+        self.every_n = max(1, int(every_n or 1))
+        self.period = float(every_t) if every_t and every_t > 0 else 0.0
+        self.fps = float(fps) if fps and fps > 0 else None
+        self.index = 0
+        self._next_t = self.start_s
+
+    def frame_time(self, t: Optional[float]) -> Optional[float]:
+        """Timestamp of the frame being counted, estimated from the index when `t` is None."""
+        if t is None and self.fps:
+            return self.start_s + (self.index - 1) / self.fps
+        return t
+
+    def want(self, t: Optional[float]) -> bool:
+        """Count one decoded frame with timestamp `t` (seconds) and return True to save it."""
+        self.index += 1
+        if not self.period:
+            return (self.index - 1) % self.every_n == 0
+        t = self.frame_time(t)
+        if t is None or t + 1e-6 < self._next_t:
+            return False
+        steps = math.floor((t - self.start_s) / self.period + 1e-6) + 1
+        self._next_t = self.start_s + steps * self.period
+        return True
+
+
+class KeyframeSampler:
+    """Decides which keyframes are saved in keyframe-only runs.
+
+    Keyframes arrive in order with their timestamps. Every `every_n`-th one is kept,
+    or with `every_t` the keyframe nearest each grid point start + k*T inside the
+    window (the earlier one on a tie; a keyframe nearest several points is kept once).
+    "Nearest" depends on the following keyframe, so in that mode each keyframe is held
+    back until the next one arrives or `flush` is called at the end of the window.
+    """
+
+    def __init__(self, start_s: float = 0.0, end_s: Optional[float] = None, every_n: int = 1, every_t: float = 0.0):
+        self.start_s = float(start_s or 0.0)
+        self.end_s = float(end_s) if end_s is not None else None
+        self.every_n = max(1, int(every_n or 1))
+        self.period = float(every_t) if every_t and every_t > 0 else 0.0
+        self.index = 0
+        self._grid = 0  # next grid point not yet given a keyframe
+        self._held: Optional[tuple[float, object]] = None
+
+    def _grid_time(self) -> float:
+        return self.start_s + self._grid * self.period
+
+    def _in_window(self, t: float) -> bool:
+        return self.end_s is None or t < self.end_s - 1e-9
+
+    def push(self, t: Optional[float], item=None) -> list[tuple[float, object]]:
+        """Count one keyframe and return the (time, item) pairs that are now due to be saved."""
+        self.index += 1
+        if not self.period:
+            return [(t, item)] if (self.index - 1) % self.every_n == 0 else []
+        if t is None:
+            return []
+        out = []
+        if self._held is not None:
+            mid = (self._held[0] + t) / 2.0
+            keep = False
+            while self._in_window(self._grid_time()) and self._grid_time() <= mid + 1e-9:
+                keep = True
+                self._grid += 1
+            if keep:
+                out.append(self._held)
+        self._held = (t, item)
+        return out
+
+    def flush(self) -> list[tuple[float, object]]:
+        """The held keyframe, if a remaining grid point is nearest to it."""
+        held, self._held = self._held, None
+        if held is None:
+            return []
+        g = self._grid_time()
+        # Without a known end, points after the last keyframe may lie past the end of the video
+        if self._in_window(g) and (self.end_s is not None or g <= held[0] + 1e-6):
+            return [held]
+        return []
+
+
+def select_keyframes(keyframe_times: list[float], start_s: float, end_s: Optional[float],
+                     every_n: int = 1, every_t: float = 0.0) -> list[float]:
+    """Times of the keyframes a keyframe-only run over [start_s, end_s) saves."""
+    sampler = KeyframeSampler(start_s, end_s, every_n, every_t)
+    picked: list[float] = []
+    for k in keyframe_times:
+        if k < start_s - 1e-6:
+            continue
+        if end_s is not None and k >= end_s:
+            break
+        picked += [t for t, _item in sampler.push(k)]
+    picked += [t for t, _item in sampler.flush()]
+    return picked
+
+
+# -------------------------
+# Segment planning
+# -------------------------
+def plan_keyframe_segments(keyframes: list[float], start_s: float, end_s: float, count: int) -> list[tuple[float, float]]:
+    """Split [start_s, end_s) into up to `count` segments whose inner boundaries are keyframes.
+
+    Boundaries are snapped to the keyframe nearest each equal split point; segments that
+    would collapse onto the same keyframe are merged, so fewer segments may be returned.
+    """
+    if count <= 1 or end_s <= start_s:
+        return [(start_s, end_s)]
+    inner = [k for k in keyframes if start_s < k < end_s]
+    bounds = [start_s]
+    if inner:
+        step = (end_s - start_s) / count
+        for i in range(1, count):
+            target = start_s + i * step
+            k = min(inner, key=lambda kt: abs(kt - target))
+            if k > bounds[-1]:
+                bounds.append(k)
+    bounds.append(end_s)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+# -------------------------
+# Extraction engine
+# -------------------------
+# Decoder backends: "auto" benchmarks the registered backends on the input and uses the fastest
+BACKENDS = ("auto", *backend_names())
+
+
+@dataclass
+class ExtractionResult:
+    success: bool
+    canceled: bool
+    out_dir: str
+    frames_saved: int
+
+
+class ExtractionEngine:
+    """Extract frames from one video; the shared engine behind the GUI and the CLI.
+
+    Progress and status text are reported through the optional `on_progress(current, total)`
+    and `on_message(text)` callbacks (total may be 0 if unknown). `run` returns an
+    ExtractionResult and raises on errors; `cancel` may be called from any thread.
+    """
+
+    def __init__(self, video_path: str, output_folder: str, start_time: Optional[float] = None, end_time: Optional[float] = None, precision_count: bool = False,
+                 out_format: str = "png", jpeg_quality: int = 90, preset: str = DEFAULT_PRESET,
+                 png_level: Optional[int] = None, png_filter: str = "auto", sample_every_n: int = 1, sample_every_t: float = 0.0,
+                 encoder_threads: int = 0, segments: int = 1, backend: str = "auto", stream_to: Optional[str] = None,
+                 archive: Optional[str] = None, shard_size_mb: int = DEFAULT_SHARD_MB, resume: bool = False,
+                 incremental: bool = False, keyframes_only: bool = False, scene_threshold: float = 0.0,
+                 dedup_distance: Optional[int] = None,
+                 on_progress: Optional[Callable[[int, int], None]] = None, on_message: Optional[Callable[[str], None]] = None):
+        self._on_progress = on_progress
+        self._on_message = on_message
+        self.video_path = Path(video_path)
+        self.output_folder = Path(output_folder)
+        self._cancel = False
+        self._sink = None
+        # Resumable runs: checkpoint manifest, first frame number of this run, watermark source
+        self.resume = bool(resume)
+        self.incremental = bool(incremental)
+        self._checkpoint: Optional[ExtractionCheckpoint] = None
+        self._checkpoint_paused = False
+        self._frame_index: Optional[FrameIndex] = None
+        self._first_number = 1
+        # Stop after this many saved frames (incremental repairs of one range)
+        self._frame_limit: Optional[int] = None
+        self._watermark: Optional[Callable[[int], tuple[int, Optional[float]]]] = None
+        self._fps: Optional[float] = None
+        # Progress reported to callers: base + current of total_override (or base + total)
+        self._progress_base = 0
+        self._progress_total: Optional[int] = None
+        self.start_time = start_time
+        self.end_time = end_time
+        self.precision_count = precision_count
+        # Output options
+        of = (out_format or "png").strip().lower()
+        if of not in RAW_FORMATS:
+            of = (get_format(of) or get_format("png")).name
+        # Streaming to stdout/a pipe cannot patch a .npy header, so it is always headerless raw
+        self.stream_to = stream_to or None
+        if self.stream_to:
+            of = "raw"
+        self.out_format = of  # an encoders.py format name, "npy" or "raw"
+        self.image_format = get_format(of) if of not in RAW_FORMATS else None
+        # Quality for lossy formats (JPEG, WebP, AVIF)
+        self.jpeg_quality = int(max(1, min(100, jpeg_quality)))
+        ps = (preset or DEFAULT_PRESET).strip().lower()
+        self.preset = ps if ps in PRESETS else DEFAULT_PRESET
+        # Explicit PNG zlib level (0-9) and row filter; None/auto follow the preset
+        self.png_level = int(max(0, min(9, png_level))) if png_level is not None and png_level >= 0 else None
+        pf = (png_filter or "auto").strip().lower()
+        self.png_filter = pf if pf in PNG_FILTERS else "auto"
+        # Sampling options
+        self.sample_every_n = int(max(1, sample_every_n))
+        self.sample_every_t = float(max(0.0, sample_every_t))
+        # Decode keyframes only; the sampling options then pick among keyframes
+        self.keyframes_only = bool(keyframes_only)
+        # End of the window for nearest-keyframe sampling when no end time is set (video duration)
+        self._keyframe_end: Optional[float] = None
+        # Packet index of the input, loaded on first use in a run (see _packet_index)
+        self._index: Optional[KeyframeIndex] = None
+        self._index_loaded = False
+        # Keep only frames whose scene-change score (0-1, as FFmpeg's select filter) exceeds this; 0 = off
+        self.scene_threshold = float(min(1.0, max(0.0, scene_threshold or 0.0)))
+        # Skip frames within this many dHash bits (0-64) of the last saved frame; None = off
+        self.dedup_distance = int(min(64, dedup_distance)) if dedup_distance is not None and dedup_distance >= 0 else None
+        # Encoder threads for the OpenCV path (0 = one per CPU core)
+        self.encoder_threads = int(encoder_threads) if encoder_threads and encoder_threads > 0 else default_encoder_threads()
+        # Segment-parallel decoding (1 = single decoder)
+        self.segments = int(max(1, segments))
+        be = (backend or "auto").strip().lower()
+        self.backend = be if be in BACKENDS else "auto"
+        # Tar/zip shards for encoded images (raw output is already a single file)
+        ar = (archive or "").strip().lower()
+        self.archive = ar if ar in ARCHIVE_FORMATS and self.out_format not in RAW_FORMATS else None
+        self.shard_size_mb = int(max(1, shard_size_mb))
+        logger.debug(
+            "Engine init: video=%s, out=%s, range=(%s,%s), precision=%s, format=%s, preset=%s, png=(%s,%s), jpeg_q=%s, every_n=%s, every_t=%s, encoders=%s, segments=%s, backend=%s, stream=%s, archive=%s, resume=%s, incremental=%s, keyframes=%s, scene=%s, dedup=%s",
+            self.video_path,
+            self.output_folder,
+            self.start_time,
+            self.end_time,
+            self.precision_count,
+            self.out_format,
+            self.preset,
+            self.png_level,
+            self.png_filter,
+            self.jpeg_quality,
+            self.sample_every_n,
+            self.sample_every_t,
+            self.encoder_threads,
+            self.segments,
+            self.backend,
+            self.stream_to,
+            self.archive,
+            self.resume,
+            self.incremental,
+            self.keyframes_only,
+            self.scene_threshold,
+            self.dedup_distance,
+        )
+
+    # --------- Callbacks ---------
+    def _progress(self, current: int, total: int) -> None:
+        # Resumed and incremental runs count on from the frames already done
+        base = self._progress_base
+        if self._on_progress is not None:
+            if self._progress_total is not None:
+                self._on_progress(base + current, self._progress_total)
+            else:
+                self._on_progress(base + current, (total + base) if total > 0 else 0)
+        if self._checkpoint is not None and self._watermark is not None and not self._checkpoint_paused:
+            self._checkpoint.update(*self._watermark(current))
+
+    # --------- Checkpoints ---------
+    def _checkpoint_params(self) -> dict:
+        """Options that decide which frames are written and how they are named."""
+        return {
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "out_format": self.out_format,
+            "preset": self.preset,
+            "jpeg_quality": self.jpeg_quality,
+            "png_level": self.png_level,
+            "png_filter": self.png_filter,
+            "sample_every_n": self.sample_every_n,
+            "sample_every_t": self.sample_every_t,
+        }
+
+    def _grid_time(self, start_s: float, count: int) -> Optional[float]:
+        """Source time of the `count`-th frame written by FFmpeg from `start_s`, assuming a constant frame rate."""
+        if count <= 0:
+            return None
+        if self.sample_every_t and self.sample_every_t > 0:
+            return start_s + (count - 1) * self.sample_every_t
+        if not self._fps:
+            return None
+        fps = float(self._fps)
+        # The first frame kept is the first one at or after start_s
+        first = math.ceil(start_s * fps - 1e-6) / fps
+        return first + (count - 1) * self.sample_every_n / fps
+
+    def _packet_index(self) -> Optional[KeyframeIndex]:
+        """The input's KeyframeIndex, built once per run and shared by every path; None without ffprobe."""
+        if not self._index_loaded:
+            self._index = KeyframeIndex.for_video(str(self.video_path))
+            self._index_loaded = True
+        return self._index
+
+    def _message(self, text: str) -> None:
+        if self._on_message is not None:
+            self._on_message(text)
+
+    # --------- FFmpeg helpers ---------
+    def _ffmpeg_quality_args(self) -> list[str]:
+        return self.image_format.ffmpeg_args(self.preset, self.jpeg_quality, self.png_level, self.png_filter)
+
+    def _every_t_select(self, off: float) -> str:
+        """`select` filter applying FrameSampler's every-T rule to FFmpeg's timestamps.
+
+        `off` is the first grid point relative to the decoded t=0. The first frame at or
+        after it is kept, then the first frame at or after the next grid point past the
+        last kept frame, so FFmpeg keeps the same frames as the OpenCV and PyAV decoders.
+        """
+        period = float(self.sample_every_t)
+        slot = "floor(({}" + f"{-off:+.6f}+0.000001)/{period:.6f})"
+        return (f"select=gte(t\\,{off - 1e-6:.6f})"
+                f"*(isnan(prev_selected_t)+gt({slot.format('t')}\\,{slot.format('prev_selected_t')}))")
+
+    def _ffmpeg_sampling_filters(self, start_s: float = 0.0) -> list[str]:
+        """Video filters implementing time-based or every-Nth sampling for a single FFmpeg run seeking to `start_s`."""
+        vf_filters: list[str] = []
+        if self.keyframes_only and self.sample_every_t and self.sample_every_t > 0:
+            # Nearest keyframe to each grid point is picked from the piped frames (KeyframeSampler),
+            # followed by SceneDetector
+            return vf_filters
+        if self.sample_every_t and self.sample_every_t > 0:
+            # The grid starts at start_s; -ss is passed rounded to the millisecond
+            vf_filters.append(self._every_t_select(start_s - float(f"{start_s:.3f}") if start_s > 0 else 0.0))
+        elif self.sample_every_n and self.sample_every_n > 1:
+            # select every Nth decoded frame (every Nth keyframe with -skip_frame nokey)
+            vf_filters.append(f"select=not(mod(n\\,{self.sample_every_n}))")
+        if self.scene_threshold > 0:
+            # Scores each sampled frame against the previous sampled one; the first one is kept
+            vf_filters.append(f"select=eq(n\\,0)+gt(scene\\,{self.scene_threshold:.6f})")
+        return vf_filters
+
+    def _ffmpeg_skip_args(self) -> list[str]:
+        """Decoder input options: keyframe-only runs never decode the frames in between."""
+        return ["-skip_frame", "nokey"] if self.keyframes_only else []
+
+    def _scene_detector(self) -> Optional[SceneDetector]:
+        return SceneDetector(self.scene_threshold) if self.scene_threshold > 0 else None
+
+    def _keyframe_sampler(self, start_s: float, end_s: Optional[float]) -> KeyframeSampler:
+        return KeyframeSampler(start_s, end_s if end_s is not None else self._keyframe_end,
+                               self.sample_every_n, self.sample_every_t)
+
+    def _open_sink(self, out_dir: Path, pad: int, shape: Optional[tuple[int, int]] = None):
+        """Frame sink for the output format: ImageFrameSink, ArchiveFrameSink or RawFrameWriter."""
+        if self.out_format in RAW_FORMATS:
+            self._sink = RawFrameWriter(out_dir / f"frames.{self.out_format}", self.out_format, self.stream_to, shape)
+        elif self.archive:
+            params, ext = self._cv2_write_params()
+            self._sink = ArchiveFrameSink(out_dir, pad, ext, params, self.encoder_threads, self.archive,
+                                          self.shard_size_mb * 1024 * 1024, shape)
+        else:
+            params, ext = self._cv2_write_params()
+            sink = ImageFrameSink(out_dir, pad, ext, params, self.encoder_threads, shape, self._first_number,
+                                  self._frame_index)
+            self._sink = sink
+            self._watermark = lambda _current: (sink.durable, sink.durable_time)
+        if self.dedup_distance is not None:
+            # Near-duplicates are dropped before they reach the encoder
+            self._sink = DedupFrameSink(self._sink, self.dedup_distance, out_dir / DUPLICATES_NAME, shape,
+                                        self._first_number)
+        return self._sink
+
+    def _raw_sidecar_extra(self, backend: str, start_s: float, end_s: Optional[float]) -> dict:
+        return {
+            "source": str(self.video_path),
+            "backend": backend,
+            "start": start_s,
+            "end": end_s,
+            "sample_every_n": self.sample_every_n,
+            "sample_every_t": self.sample_every_t,
+            "keyframes_only": self.keyframes_only,
+            "scene_threshold": self.scene_threshold,
+            "dedup_distance": self.dedup_distance,
+        }
+
+    def _opencv_frame_size(self) -> Optional[tuple[int, int]]:
+        """(width, height) from OpenCV when ffprobe did not report them."""
+        import cv2
+
+        cap = cv2.VideoCapture(str(self.video_path))
+        try:
+            if not cap.isOpened():
+                return None
+            return int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        finally:
+            cap.release()
+
+    def _opencv_fps(self) -> Optional[float]:
+        """Frame rate from OpenCV when ffprobe did not report it."""
+        import cv2
+
+        cap = cv2.VideoCapture(str(self.video_path))
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) if cap.isOpened() else 0.0
+            return float(fps) if fps and fps > 0 else None
+        finally:
+            cap.release()
+
+    def _count_files(self, out_dir: Path, pad: int, ext: str) -> int:
+        """Consecutive frame files present from this run's first frame number."""
+        count = 0
+        while not self._frame_limit or count < self._frame_limit:
+            if not (out_dir / f"frame_{self._first_number + count:0{pad}d}.{ext}").exists():
+                break
+            count += 1
+        return count
+
+    def _index_files(self, out_dir: Path, pad: int, ext: str, count: int, start_s: float, done: int = 0) -> int:
+        """Record frames `done`+1..`count` of this run, written by FFmpeg, in the per-frame index.
+
+        Times come from the sampling grid. Returns the new number of indexed frames.
+        """
+        if self._frame_index is None or count <= done:
+            return done
+        first = self._first_number
+        names = [(first + k, f"frame_{first + k:0{pad}d}.{ext}", self._grid_time(start_s, k + 1)) for k in range(done, count)]
+        self._frame_index.add_files(out_dir, names, self.encoder_threads)
+        return count
+
+    def _cv2_write_params(self) -> tuple[list[int], str]:
+        """cv2.imwrite parameters and file extension for the chosen output format."""
+        return self.image_format.cv2_params(self.preset, self.jpeg_quality, self.png_level, self.png_filter), self.image_format.ext
+
+    def _run_ffmpeg(self, ffmpeg_path: str, out_dir: Path, pad: int, total_frames: int, start_s: Optional[float], end_s: Optional[float],
+                    backend: DecoderBackend) -> int:
+        """Run one FFmpeg process to dump frames respecting output format and sampling. Returns frames_saved.
+
+        Hardware backends pass their `-hwaccel` arguments; the CPU backend decodes with
+        frame/slice threading and encodes with the same thread count. Emits progress and
+        respects cancellation.
+        """
+        label = backend.label
+        offset = self._first_number - 1
+        # FFmpeg's image muxer has finished a file once it reports the frame
+        self._watermark = lambda current: (offset + current, self._grid_time(start_s or 0.0, current))
+        # Ensure output dir exists
+        out_dir.mkdir(parents=True, exist_ok=True)
+        # Pattern and quality/filters
+        ext = self.image_format.ext
+        pattern = str(out_dir / f"frame_%0{pad}d.{ext}")
+        # Build seek args
+        seek_args = []
+        dur_args = []
+        if start_s is not None and start_s > 0:
+            seek_args += ["-ss", f"{start_s:.3f}"]
+        if end_s is not None and (start_s is not None) and (end_s > start_s):
+            dur = max(0.0, end_s - start_s)
+            dur_args += ["-t", f"{dur:.3f}"]
+        # Build sampling filter
+        vf_filters = self._ffmpeg_sampling_filters(start_s or 0.0)
+        vsync_args = ["-vsync", "vfr"] if vf_filters else ["-vsync", "0"]
+        # Quality/format args
+        quality_args = self._ffmpeg_quality_args()
+        # CPU decode: frame+slice threaded decoder; the same count drives the image encoder
+        if backend.hwaccel:
+            decode_args, encode_args = list(backend.hwaccel_args), []
+        else:
+            decode_args = ["-threads", str(self.encoder_threads), "-thread_type", "frame+slice"]
+            encode_args = ["-threads", str(self.encoder_threads)]
+        cmd = [
+            ffmpeg_path,
+            "-hide_banner",
+            "-y",
+            *decode_args,
+            *self._ffmpeg_skip_args(),
+            *seek_args,
+            "-i", str(self.video_path),
+            *dur_args,
+            *( ["-vf", ",".join(vf_filters)] if vf_filters else [] ),
+            *vsync_args,
+            *( ["-frames:v", str(self._frame_limit)] if self._frame_limit else [] ),
+            *encode_args,
+            "-start_number", str(self._first_number),
+            *quality_args,
+            pattern,
+            "-progress", "pipe:1",
+            "-nostats",
+            "-loglevel", "error",
+        ]
+
+        if backend.hwaccel:
+            self._message(f"Using {label} for hardware-accelerated decoding…")
+        else:
+            self._message(f"Using FFmpeg (CPU, {self.encoder_threads} threads)…")
+        logger.info("%s path engaged: %s", label, ffmpeg_path)
+        logger.debug("FFmpeg command: %s", " ".join(cmd))
+        if total_frames > 0:
+            self._progress(0, total_frames)
+        else:
+            self._progress(0, 0)
+
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            universal_newlines=True,
+        )
+
+        saved = 0
+        indexed = 0
+        try:
+            assert proc.stdout is not None
+            for line in proc.stdout:
+                if self._cancel:
+                    try:
+                        proc.terminate()
+                    except Exception:
+                        pass
+                    break
+                line = line.strip()
+                if line.startswith("frame="):
+                    try:
+                        saved = int(line.split("=", 1)[1].strip())
+                    except Exception:
+                        continue
+                    if total_frames > 0:
+                        self._progress(min(saved, total_frames), total_frames)
+                    else:
+                        self._progress(saved, 0)
+                    indexed = self._index_files(out_dir, pad, ext, saved, start_s or 0.0, indexed)
+                elif line.startswith("progress=") and line.endswith("end"):
+                    # FFmpeg reports completion
+                    pass
+
+            proc.wait()
+            if self._cancel:
+                # Determine how many files actually exist in case last frame count wasn't read
+                try:
+                    saved = self._count_files(out_dir, pad, ext)
+                except Exception:
+                    pass
+                logger.info("%s canceled by user; saved=%d", label, saved)
+                self._index_files(out_dir, pad, ext, saved, start_s or 0.0, indexed)
+                return saved
+
+            if proc.returncode != 0:
+                err = ""
+                try:
+                    if proc.stderr is not None:
+                        err = proc.stderr.read()
+                except Exception:
+                    pass
+                logger.error("%s failed with code %s", label, proc.returncode)
+                raise RuntimeError(f"FFmpeg failed (exit {proc.returncode}).\n{err}")
+
+            if saved == 0:
+                # Fallback to counting files if 'frame=' wasn't seen
+                try:
+                    saved = self._count_files(out_dir, pad, ext)
+                except Exception:
+                    saved = 0
+            self._index_files(out_dir, pad, ext, saved, start_s or 0.0, indexed)
+            return saved
+        finally:
+            try:
+                if proc.stdout is not None:
+                    proc.stdout.close()
+            except Exception:
+                pass
+            try:
+                if proc.stderr is not None:
+                    proc.stderr.close()
+            except Exception:
+                pass
+
+    def _run_ffmpeg_pipe(self, ffmpeg_path: str, out_dir: Path, pad: int, total_frames: int, start_s: float, end_s: Optional[float],
+                        backend: DecoderBackend, frame_size: Optional[tuple[int, int]]) -> int:
+        """Pipe packed BGR24 frames from FFmpeg into the raw or archive sink. Returns frames_saved.
+
+        `showinfo` on stderr supplies each frame's timestamp; stdout is read one frame at a time.
+        """
+        if not frame_size or frame_size[0] <= 0 or frame_size[1] <= 0:
+            raise RuntimeError("Frame size unknown; piping frames from FFmpeg needs width and height")
+        width, height = frame_size
+        frame_bytes = width * height * 3
+        seek_args = ["-ss", f"{start_s:.3f}"] if start_s > 0 else []
+        dur_args = ["-t", f"{end_s - start_s:.3f}"] if end_s is not None and end_s > start_s else []
+        vf_filters = self._ffmpeg_sampling_filters(start_s) + ["showinfo"]
+        decode_args = list(backend.hwaccel_args) if backend.hwaccel else ["-threads", str(self.encoder_threads), "-thread_type", "frame+slice"]
+        cmd = [
+            ffmpeg_path, "-hide_banner", "-nostdin",
+            *decode_args,
+            *self._ffmpeg_skip_args(),
+            *seek_args,
+            "-i", str(self.video_path),
+            *dur_args,
+            "-an", "-sn", "-dn",
+            "-vf", ",".join(vf_filters),
+            "-vsync", "vfr",
+            *( ["-frames:v", str(self._frame_limit)] if self._frame_limit else [] ),
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1",
+            "-loglevel", "info",
+        ]
+        if self.out_format in RAW_FORMATS:
+            what = "raw BGR output"
+        elif self.archive:
+            what = f"{self.archive} shard output"
+        else:
+            what = f"{self.image_format.label} encoded by OpenCV"
+        self._message(f"Using {backend.label} ({what})…")
+        logger.info("%s pipe path engaged: %s", backend.label, ffmpeg_path)
+        logger.debug("FFmpeg command: %s", " ".join(cmd))
+        self._progress(0, total_frames if total_frames > 0 else 0)
+
+        timestamps: "queue.Queue[Optional[float]]" = queue.Queue()
+        err_tail: list[str] = []
+
+        def read_stderr(stream) -> None:
+            for raw in iter(stream.readline, b""):
+                line = raw.decode("utf-8", "ignore")
+                if "pts_time:" in line:
+                    try:
+                        timestamps.put(start_s + float(line.split("pts_time:", 1)[1].split()[0]))
+                    except Exception:
+                        timestamps.put(None)
+                else:
+                    err_tail.append(line.rstrip())
+                    del err_tail[:-20]
+
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=frame_bytes)
+        assert proc.stdout is not None and proc.stderr is not None
+        err_thread = threading.Thread(target=read_stderr, args=(proc.stderr,), name="f2i-ffmpeg-stderr", daemon=True)
+        err_thread.start()
+        writer = self._open_sink(out_dir, pad, (height, width))
+        # Every-Nth keyframe is selected by FFmpeg; nearest keyframes need the timestamps here
+        picker = self._keyframe_sampler(start_s, end_s) if (self.keyframes_only and self.sample_every_t > 0) else None
+        scene = self._scene_detector() if picker is not None else None
+
+        def emit(data: bytes, t: Optional[float]) -> None:
+            if scene is not None:
+                import numpy as np
+
+                if not scene.is_cut(gray_thumbnail(np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3))):
+                    return
+            writer.write_bytes(data, t)
+
+        try:
+            while not self._cancel:
+                data = proc.stdout.read(frame_bytes)
+                if not data:
+                    break
+                if len(data) < frame_bytes:
+                    logger.warning("Dropping truncated trailing frame (%d of %d bytes)", len(data), frame_bytes)
+                    break
+                try:
+                    t = timestamps.get(timeout=5.0)
+                except queue.Empty:
+                    t = None
+                for kt, kdata in (picker.push(t, data) if picker is not None else [(t, data)]):
+                    emit(kdata, kt)
+                if writer.frames % 10 == 0 or writer.frames == total_frames:
+                    self._progress(writer.frames, total_frames if total_frames > 0 else 0)
+            if picker is not None and not self._cancel:
+                for kt, kdata in picker.flush():
+                    emit(kdata, kt)
+            if self._cancel:
+                try:
+                    proc.terminate()
+                except Exception:
+                    pass
+            proc.wait()
+            err_thread.join(timeout=2.0)
+            if not self._cancel and proc.returncode != 0:
+                raise RuntimeError(f"FFmpeg failed (exit {proc.returncode}).\n" + "\n".join(err_tail))
+        except Exception:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+            writer.abort()
+            raise
+        finally:
+            try:
+                proc.stdout.close()
+            except Exception:
+                pass
+        return writer.close(self._raw_sidecar_extra(backend.name, start_s, end_s))
+
+    def _run_ffmpeg_segments(self, ffmpeg_path: str, out_dir: Path, pad: int, total_frames: int,
+                             start_s: float, end_s: Optional[float], fps: Optional[float], backend: DecoderBackend) -> int:
+        """Decode keyframe-aligned segments of the window in parallel FFmpeg processes.
+
+        Each segment writes into its own hidden subfolder; once all segments succeed the
+        files are renamed in order into `out_dir` so numbering is globally contiguous.
+        On cancel the contiguous part is kept: finished segments in order plus the frames
+        the first unfinished one had completed. Returns frames_saved. Raises RuntimeError
+        when segmentation is not possible or a segment fails, leaving `out_dir` without
+        partial output.
+        """
+        index = self._packet_index()
+        if index is None:
+            raise RuntimeError("Could not index packets for segment-parallel extraction")
+        frame_dur = (1.0 / fps) if fps and fps > 0 else None
+        if end_s is None:
+            end_s = index.duration() + (frame_dur or 0.001)
+        segments = plan_keyframe_segments(index.keyframe_times, start_s, end_s, self.segments)
+        if len(segments) < 2:
+            raise RuntimeError("Not enough keyframes in range to split into segments")
+
+        ext = self.image_format.ext
+        quality_args = self._ffmpeg_quality_args()
+        threads_per_proc = max(1, (os.cpu_count() or 1) // len(segments))
+        # Stop each segment just short of the next keyframe so boundary frames are not duplicated
+        guard = (frame_dur / 2.0) if frame_dur else 0.0005
+        seg_dirs: list[Path] = []
+        procs: list[subprocess.Popen] = []
+        counts = [0] * len(segments)
+        err_tails: list[list[str]] = [[] for _ in segments]
+        readers: list[threading.Thread] = []
+
+        def stitch(limits: list[Optional[int]]) -> int:
+            # Rename segment outputs in order into globally numbered files; None = the whole segment
+            saved = 0
+            for seg_dir, limit in zip(seg_dirs, limits):
+                files = sorted(seg_dir.glob(f"frame_*.{ext}"))
+                for src in files if limit is None else files[:limit]:
+                    saved += 1
+                    src.replace(out_dir / f"frame_{saved:0{pad}d}.{ext}")
+            # Frames are complete and numbered from the window start, like a single FFmpeg run's
+            self._watermark = lambda current: (current, self._grid_time(start_s, current))
+            self._index_files(out_dir, pad, ext, saved, start_s)
+            return saved
+
+        def read_progress(i: int, proc: subprocess.Popen) -> None:
+            assert proc.stdout is not None
+            for line in proc.stdout:
+                line = line.strip()
+                if line.startswith("frame="):
+                    try:
+                        counts[i] = int(line.split("=", 1)[1].strip())
+                    except Exception:
+                        pass
+
+        def read_stderr(i: int, proc: subprocess.Popen) -> None:
+            # Drained while FFmpeg runs so a flood of decode errors cannot fill the pipe and stall it
+            assert proc.stderr is not None
+            for line in proc.stderr:
+                err_tails[i].append(line.rstrip())
+                del err_tails[i][:-20]
+
+        self._message(f"Using {len(segments)} parallel FFmpeg decoders…")
+        logger.info("FFmpeg segment-parallel path engaged: %d segments, backend=%s", len(segments), backend.name)
+        self._progress(0, total_frames if total_frames > 0 else 0)
+        ok = False
+        try:
+            for i, (seg_start, seg_end) in enumerate(segments):
+                seg_dir = out_dir / f".segment_{i:03d}"
+                seg_dir.mkdir(parents=True, exist_ok=True)
+                seg_dirs.append(seg_dir)
+                vf_filters: list[str] = []
+                if self.sample_every_t and self.sample_every_t > 0:
+                    # The global grid start + k*T continues at the first point after the previous
+                    # segment's last frame, which is where a single decoder would be waiting
+                    period = float(self.sample_every_t)
+                    first = start_s
+                    last_before = index.packet_before(seg_start - guard)
+                    if last_before is not None and last_before >= start_s:
+                        first += (math.floor((last_before - start_s) / period + 1e-6) + 1) * period
+                    vf_filters.append(self._every_t_select(first - seg_start))
+                elif self.sample_every_n and self.sample_every_n > 1:
+                    # Offset the frame counter by the frames that precede this segment in the window
+                    before = index.packets_between(start_s, seg_start - guard)
+                    vf_filters.append(f"select=not(mod(n+{before}\\,{self.sample_every_n}))")
+                cmd = [
+                    ffmpeg_path,
+                    "-hide_banner",
+                    "-y",
+                    *backend.hwaccel_args,
+                    "-threads", str(threads_per_proc),
+                    *( ["-ss", f"{seg_start:.6f}"] if seg_start > 0 else [] ),
+                    "-i", str(self.video_path),
+                    "-t", f"{max(0.0, seg_end - seg_start - guard):.6f}",
+                    *( ["-vf", ",".join(vf_filters)] if vf_filters else [] ),
+                    "-vsync", "vfr" if vf_filters else "0",
+                    "-start_number", "1",
+                    *quality_args,
+                    str(seg_dir / f"frame_%08d.{ext}"),
+                    "-progress", "pipe:1",
+                    "-nostats",
+                    "-loglevel", "error",
+                ]
+                logger.debug("FFmpeg segment %d command: %s", i, " ".join(cmd))
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+                procs.append(proc)
+                for target in (read_progress, read_stderr):
+                    th = threading.Thread(target=target, args=(i, proc), daemon=True)
+                    th.start()
+                    readers.append(th)
+
+            while any(p.poll() is None for p in procs):
+                if self._cancel:
+                    for p in procs:
+                        try:
+                            p.terminate()
+                        except Exception:
+                            pass
+                    break
+                done = sum(counts)
+                if total_frames > 0:
+                    self._progress(min(done, total_frames), total_frames)
+                else:
+                    self._progress(done, 0)
+                time.sleep(0.2)
+            for p in procs:
+                p.wait()
+            for th in readers:
+                th.join(timeout=1.0)
+            if self._cancel:
+                # Keep finished segments up to the first unfinished one, and the frames FFmpeg
+                # reported as written there (a file it was writing when stopped may be partial)
+                limits: list[Optional[int]] = []
+                for i, p in enumerate(procs):
+                    if p.returncode == 0:
+                        limits.append(None)
+                        continue
+                    limits.append(counts[i])
+                    break
+                saved = stitch(limits)
+                ok = True
+                logger.info("FFmpeg segment-parallel canceled by user; kept %d contiguous frames", saved)
+                return saved
+
+            for i, p in enumerate(procs):
+                if p.returncode != 0:
+                    raise RuntimeError(f"FFmpeg segment {i + 1}/{len(procs)} failed (exit {p.returncode}).\n"
+                                       + "\n".join(err_tails[i]))
+
+            saved = stitch([None] * len(seg_dirs))
+            ok = True
+            logger.info("FFmpeg segment-parallel finished; saved=%d", saved)
+            return saved
+        finally:
+            for p in procs:
+                for stream in (p.stdout, p.stderr):
+                    try:
+                        if stream is not None:
+                            stream.close()
+                    except Exception:
+                        pass
+            # Segment folders are empty after a successful stitch; on failure (or past the kept part on cancel)
+            # they hold partial output
+            for seg_dir in seg_dirs:
+                shutil.rmtree(seg_dir, ignore_errors=True)
+            if not ok:
+                logger.debug("Removed partial segment output in %s", out_dir)
+
+    def _run_pyav(self, out_dir: Path, pad: int, total_frames: int, start_s: float, end_s: Optional[float]) -> int:
+        """Decode with PyAV (threaded libavcodec in-process) and write through the encoder pool.
+
+        Timestamps come from frame PTS relative to the stream start, so range limits and
+        time-based sampling follow the same grid as the FFmpeg paths. Returns frames_saved.
+        """
+        import av  # optional dependency
+
+        self._message(f"Using PyAV ({self.encoder_threads} encoder threads)…")
+        logger.info("PyAV path engaged")
+        self._progress(0, total_frames if total_frames > 0 else 0)
+        with av.open(str(self.video_path)) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            tb = float(stream.time_base) if stream.time_base else 0.0
+            origin = float(stream.start_time * stream.time_base) if (stream.start_time is not None and tb) else 0.0
+            if start_s > 0 and tb:
+                container.seek(int((start_s + origin) / tb), stream=stream)
+            sampler = FrameSampler(start_s, self.sample_every_n, self.sample_every_t,
+                                   float(stream.average_rate) if stream.average_rate else None)
+            picker = None
+            if self.keyframes_only:
+                # libavcodec drops non-key frames before decoding them
+                stream.codec_context.skip_frame = "NONKEY"
+                picker = self._keyframe_sampler(start_s, end_s)
+            scene = self._scene_detector()
+            saved = 0
+            sink = self._open_sink(out_dir, pad)
+            try:
+                for frame in container.decode(stream):
+                    if self._cancel:
+                        break
+                    t = (float(frame.time) - origin) if frame.time is not None else None
+                    if t is not None and t < start_s - 1e-6:
+                        continue
+                    if t is not None and end_s is not None and t >= end_s:
+                        break
+                    if picker is not None:
+                        due = picker.push(t, frame)
+                    elif sampler.want(t):
+                        due = [(sampler.frame_time(t), frame)]
+                    else:
+                        continue
+                    for kt, kframe in due:
+                        if scene is not None and not scene.is_cut(pyav_thumbnail(kframe)):
+                            continue
+                        saved += 1
+                        sink.write(kframe.to_ndarray(format="bgr24"), kt)
+                    if due and (saved % 10 == 0 or saved == total_frames):
+                        self._progress(saved, total_frames if total_frames > 0 else 0)
+                    if self._frame_limit and saved >= self._frame_limit:
+                        break
+                if picker is not None and not self._cancel:
+                    for kt, kframe in picker.flush():
+                        if scene is not None and not scene.is_cut(pyav_thumbnail(kframe)):
+                            continue
+                        saved += 1
+                        sink.write(kframe.to_ndarray(format="bgr24"), kt)
+            except Exception:
+                sink.abort()
+                raise
+        return sink.close(self._raw_sidecar_extra("pyav", start_s, end_s))
+
+    def _decode_window(self, order: list[DecoderBackend], ffmpeg_path: Optional[str], out_dir: Path, pad: int,
+                       frames_planned: int, start_s: float, end_s: Optional[float], fps_val: Optional[float],
+                       pipe_mode: bool, frame_size: Optional[tuple[int, int]], cv2_encodes: bool) -> int:
+        """Extract [start_s, end_s) with the first decoder in `order` that works, OpenCV last. Returns frames_saved."""
+        import cv2
+
+        for i, backend in enumerate(order):
+            if backend.kind == "opencv":
+                break
+            try:
+                if backend.kind == "ffmpeg" and pipe_mode:
+                    saved = self._run_ffmpeg_pipe(ffmpeg_path, out_dir, pad, frames_planned or 0, start_s, end_s, backend, frame_size)
+                elif backend.kind == "ffmpeg":
+                    saved = self._run_ffmpeg(ffmpeg_path, out_dir, pad, frames_planned or 0, start_s, end_s, backend)
+                else:
+                    saved = self._run_pyav(out_dir, pad, frames_planned or 0, start_s, end_s)
+                logger.info("Engine completed via %s: canceled=%s saved=%d", backend.name, self._cancel, saved)
+                return saved
+            except Exception as e_be:
+                if self.stream_to and getattr(self._sink, "frames", 0) > 0:
+                    # Frames already went down the stream; a second decoder would duplicate them
+                    raise
+                # Inform user and continue with the next decoder
+                nxt = order[i + 1].label if i + 1 < len(order) else "OpenCV"
+                self._message(f"{backend.label} failed, falling back to {nxt}…\n{e_be}")
+                logger.warning("%s path failed; falling back to %s: %s", backend.name, nxt, e_be)
+
+        if not cv2_encodes:
+            raise RuntimeError(f"FFmpeg could not write {self.image_format.label} output and OpenCV cannot encode it")
+
+        # ---------- OpenCV CPU fallback ----------
+        logger.info("Starting OpenCV CPU fallback for extraction (encoder threads=%d)", self.encoder_threads)
+        cap = cv2.VideoCapture(str(self.video_path))
+        if not cap.isOpened():
+            raise RuntimeError("Failed to open video. Try installing codecs/FFmpeg or a different file.")
+        if self.keyframes_only:
+            return self._opencv_keyframes(cap, out_dir, pad, frames_planned, start_s, end_s)
+
+        # Seek to the first frame at or after the start time; it stays grabbed for the loop
+        pending = self._opencv_seek(cap, start_s)
+
+        self._message("Starting extraction…")
+        self._progress(0, frames_planned if frames_planned and frames_planned > 0 else 0)
+
+        saved = 0
+        throttle = 10  # emit progress every N frames to reduce signal overhead
+        fps_eff = None
+        if not fps_val or fps_val <= 0:
+            try:
+                fps_eff = cap.get(cv2.CAP_PROP_FPS)
+                if not fps_eff or fps_eff <= 0:
+                    fps_eff = None
+            except Exception:
+                fps_eff = None
+        else:
+            fps_eff = fps_val
+        # Only used when the backend reports no timestamps
+        end_limit_frames = None
+        if end_s is not None and end_s > start_s and fps_eff:
+            end_limit_frames = int(round((end_s - start_s) * fps_eff))
+        sampler = FrameSampler(start_s, self.sample_every_n, self.sample_every_t, fps_eff)
+        scene = self._scene_detector()
+
+        # Every frame is grabbed (demuxed and decoded) but only kept frames are retrieved,
+        # which is where OpenCV converts to BGR and copies; skipped frames never pay for it.
+        # Decoding stays on this thread; encoding/writing fans out to the pool. Retrieved
+        # frames are fresh arrays, so they can be queued as-is.
+        sink = self._open_sink(out_dir, pad)
+        try:
+            while not self._cancel:
+                if pending:
+                    pending = False
+                elif not cap.grab():
+                    break
+                # One timestamp query per frame: the presentation time of the grabbed frame
+                try:
+                    pos_ms = float(cap.get(cv2.CAP_PROP_POS_MSEC))
+                except Exception:
+                    pos_ms = -1.0
+                t = pos_ms / 1000.0 if pos_ms >= 0 else None
+                do_save = sampler.want(t)
+                t = sampler.frame_time(t)
+
+                # Stop at end time if defined; like FFmpeg's -t the window is [start, end)
+                if end_s is not None and t is not None and t + 1e-5 >= end_s:
+                    break
+                if t is None and end_limit_frames is not None and sampler.index > end_limit_frames:
+                    break
+                if not do_save:
+                    continue
+
+                ret, frame = cap.retrieve()
+                if not ret or frame is None:
+                    break
+                if scene is not None and not scene.is_cut(gray_thumbnail(frame)):
+                    continue
+                sink.write(frame, t)
+                saved += 1
+
+                if frames_planned and frames_planned > 0:
+                    if saved % throttle == 0 or saved == frames_planned:
+                        self._progress(saved, frames_planned)
+                else:
+                    if saved % throttle == 0:
+                        self._progress(saved, 0)
+                if self._frame_limit and saved >= self._frame_limit:
+                    break
+        except Exception:
+            sink.abort()
+            raise
+        finally:
+            cap.release()
+        saved = sink.close(self._raw_sidecar_extra("opencv", start_s, end_s))
+
+        logger.info("Engine finished (OpenCV path): canceled=%s saved=%d", self._cancel, saved)
+        return saved
+
+    def _opencv_keyframes(self, cap, out_dir: Path, pad: int, frames_planned: int, start_s: float,
+                          end_s: Optional[float]) -> int:
+        """Keyframe-only extraction with OpenCV: seek straight to each chosen keyframe of the packet index.
+
+        OpenCV cannot skip non-key frames while decoding, so the keyframes are looked up
+        with ffprobe and each one costs a seek and a single decode. Returns frames_saved.
+        """
+        import cv2
+
+        index = self._packet_index()
+        if index is None:
+            cap.release()
+            raise RuntimeError("Keyframe-only extraction with OpenCV needs the packet index (ffprobe); install FFmpeg")
+        times = select_keyframes(index.keyframe_times, start_s, end_s if end_s is not None else self._keyframe_end,
+                                 self.sample_every_n, self.sample_every_t)
+        logger.info("Starting OpenCV keyframe extraction: %d keyframes", len(times))
+        self._message("Starting extraction…")
+        total = frames_planned if frames_planned and frames_planned > 0 else len(times)
+        self._progress(0, total)
+        saved = 0
+        scene = self._scene_detector()
+        sink = self._open_sink(out_dir, pad)
+        try:
+            for kt in times:
+                if self._cancel:
+                    break
+                if kt > 0:
+                    pending = self._opencv_seek(cap, kt, index)
+                else:
+                    cap.set(cv2.CAP_PROP_POS_MSEC, 0.0)
+                    pending = cap.grab()
+                if not pending:
+                    logger.warning("OpenCV could not seek to the keyframe at %.3fs", kt)
+                    continue
+                ret, frame = cap.retrieve()
+                if not ret or frame is None:
+                    continue
+                if scene is not None and not scene.is_cut(gray_thumbnail(frame)):
+                    continue
+                try:
+                    pos_ms = float(cap.get(cv2.CAP_PROP_POS_MSEC))
+                except Exception:
+                    pos_ms = -1.0
+                sink.write(frame, pos_ms / 1000.0 if pos_ms >= 0 else kt)
+                saved += 1
+                if saved % 10 == 0 or saved == total:
+                    self._progress(saved, total)
+        except Exception:
+            sink.abort()
+            raise
+        finally:
+            cap.release()
+        saved = sink.close(self._raw_sidecar_extra("opencv", start_s, end_s))
+        logger.info("Engine finished (OpenCV keyframes): canceled=%s saved=%d", self._cancel, saved)
+        return saved
+
+    def _opencv_seek(self, cap, start_s: float, index: Optional[KeyframeIndex] = None) -> bool:
+        """Position `cap` on the first frame at or after `start_s`.
+
+        Seeks to the preceding keyframe from the packet index (cheap and exact for the
+        demuxer) and grabs forward, discarding frames by timestamp, so every run starts
+        on the same frame however long the GOP. Without an index OpenCV seeks on its
+        own (by frame number, which overshoots on variable frame rate video); if it
+        lands past `start_s` the seek backs off until it lands before. Returns True
+        when the start frame has been grabbed and still needs `cap.retrieve()`.
+        """
+        import cv2
+
+        if start_s <= 0:
+            return False
+        target_ms = start_s * 1000.0
+        if index is None:
+            index = self._packet_index()
+        seek_ms = index.keyframe_at_or_before(start_s) * 1000.0 if index is not None else target_ms
+        backoff_ms = 1000.0
+        while True:
+            try:
+                cap.set(cv2.CAP_PROP_POS_MSEC, seek_ms)
+                if not cap.grab():
+                    return False
+                pos_ms = float(cap.get(cv2.CAP_PROP_POS_MSEC))
+            except Exception:
+                return False
+            if pos_ms <= target_ms + 0.01 or seek_ms <= 0:
+                break
+            # Landed after the start: an earlier frame may be the first one in range
+            seek_ms = max(0.0, seek_ms - backoff_ms)
+            backoff_ms *= 2.0
+        skipped = 0
+        while not self._cancel:
+            if pos_ms + 0.01 >= target_ms:
+                logger.debug("OpenCV seek: to %.3fs, %d frames discarded, start frame at %.3fs",
+                             seek_ms / 1000.0, skipped, pos_ms / 1000.0)
+                return True
+            skipped += 1
+            if not cap.grab():
+                return False
+            try:
+                pos_ms = float(cap.get(cv2.CAP_PROP_POS_MSEC))
+            except Exception:
+                return True
+        return False
+
+    def _repair(self, repairs: list[tuple[int, int, float]], order: list[DecoderBackend], ffmpeg_path: Optional[str],
+                out_dir: Path, pad: int, end_s: Optional[float], fps_val: Optional[float], pipe_mode: bool,
+                frame_size: Optional[tuple[int, int]], cv2_encodes: bool, tail_planned: int) -> None:
+        """Re-extract the (first frame, count, seek time) ranges of an incremental run in place."""
+        todo = sum(count for _first, count, _seek in repairs)
+        resume_number = self._first_number
+        # Progress covers the repaired frames and then the frames after the last one kept
+        self._progress_total = todo + (tail_planned or 0)
+        self._checkpoint_paused = True
+        repaired = 0
+        try:
+            for first, count, seek in repairs:
+                if self._cancel:
+                    break
+                self._first_number, self._frame_limit, self._progress_base = first, count, repaired
+                self._message(f"Re-extracting frames {first}–{first + count - 1}…")
+                logger.info("Re-extracting frames %d-%d from t=%.3f", first, first + count - 1, seek)
+                got = self._decode_window(order, ffmpeg_path, out_dir, pad, count, seek, end_s, fps_val,
+                                          pipe_mode, frame_size, cv2_encodes)
+                if got < count and not self._cancel:
+                    raise RuntimeError(f"Re-extracted only {got} of {count} frames starting at frame {first}")
+                repaired += got
+        finally:
+            self._first_number, self._frame_limit, self._progress_base = resume_number, None, repaired
+            self._checkpoint_paused = False
+            self._watermark = None
+
+    def run(self) -> ExtractionResult:
+        # OpenCV is imported on first use so callers that only parse options stay light
+        import cv2
+
+        try:
+            logger.info("Engine run start: %s", self.video_path)
+            if not self.video_path.exists():
+                raise FileNotFoundError(f"Video not found: {self.video_path}")
+            self._index, self._index_loaded = None, False
+
+            # Probe metadata
+            meta = probe_video_metadata_with_ffprobe(str(self.video_path))
+            fps_val = meta.get("fps")
+            # Total frames for whole video (prefer precision if requested)
+            total_full = 0
+            if self.precision_count:
+                total_full = probe_total_frames_precise_ffprobe(str(self.video_path))
+            if total_full <= 0:
+                total_full = int(meta.get("frames") or 0)
+            # Apply time range window to compute frames_in_range (approx if needed)
+            start_s = self.start_time or 0.0
+            end_s = self.end_time if (self.end_time is not None and (self.end_time > start_s)) else None
+            frames_in_range = total_full
+            if (start_s > 0 or end_s is not None) and fps_val:
+                try:
+                    sf = int(max(0, round(start_s * fps_val)))
+                    ef = int(round((end_s * fps_val))) if end_s is not None else total_full
+                    if total_full > 0:
+                        ef = min(ef, total_full)
+                    frames_in_range = max(0, ef - sf)
+                except Exception:
+                    frames_in_range = 0
+            # Fallback to OpenCV count if still unknown
+            if frames_in_range is None or frames_in_range <= 0:
+                cap_count = cv2.VideoCapture(str(self.video_path))
+                if cap_count.isOpened():
+                    try:
+                        total_frames_cv = int(cap_count.get(cv2.CAP_PROP_FRAME_COUNT))
+                        if total_frames_cv > 0:
+                            if (start_s > 0 or end_s is not None) and fps_val:
+                                try:
+                                    sf = int(max(0, round(start_s * fps_val)))
+                                    ef = int(round((end_s * fps_val))) if end_s is not None else total_frames_cv
+                                    frames_in_range = max(0, min(total_frames_cv, ef) - sf)
+                                except Exception:
+                                    frames_in_range = total_frames_cv
+                            else:
+                                frames_in_range = total_frames_cv
+                        else:
+                            frames_in_range = 0
+                    finally:
+                        cap_count.release()
+                else:
+                    frames_in_range = 0
+
+            # Adjust expected total for sampling
+            frames_planned = frames_in_range
+            if self.sample_every_t and self.sample_every_t > 0:
+                # Estimate by duration window / T
+                window_dur = None
+                try:
+                    if end_s is not None:
+                        window_dur = max(0.0, end_s - start_s)
+                    else:
+                        d = meta.get("duration")
+                        if d is not None:
+                            window_dur = max(0.0, float(d) - start_s)
+                except Exception:
+                    window_dur = None
+                if window_dur is not None and window_dur > 0:
+                    try:
+                        frames_planned = max(1, int(math.floor(window_dur / self.sample_every_t)) + 1)
+                    except Exception:
+                        frames_planned = 0
+                else:
+                    # Unknown
+                    frames_planned = 0
+            elif self.sample_every_n and self.sample_every_n > 1 and frames_in_range and frames_in_range > 0:
+                try:
+                    frames_planned = int(math.ceil(frames_in_range / self.sample_every_n))
+                except Exception:
+                    frames_planned = frames_in_range
+
+            if self.keyframes_only:
+                # Only keyframes are decoded; the packet index tells how many will be saved
+                duration = meta.get("duration")
+                self._keyframe_end = float(duration) if duration else None
+                index = self._packet_index()
+                frames_planned = 0
+                if index is not None:
+                    if self._keyframe_end is None:
+                        self._keyframe_end = index.duration() + 1e-3
+                    frames_planned = len(select_keyframes(index.keyframe_times, start_s,
+                                                          end_s if end_s is not None else self._keyframe_end,
+                                                          self.sample_every_n, self.sample_every_t))
+
+            if self.scene_threshold or self.dedup_distance is not None:
+                # How many frames start a new scene or are not duplicates is only known afterwards
+                frames_planned = 0
+
+            # Which side can encode the output: FFmpeg's image muxer, OpenCV, or both
+            ffmpeg_path = find_ffmpeg()
+            cv2_encodes = self.image_format is None or cv2_can_encode(self.out_format)
+            ffmpeg_encodes = self.image_format is not None and ffmpeg_can_encode(self.out_format, ffmpeg_path)
+            if not cv2_encodes and (self.archive or not ffmpeg_encodes):
+                raise RuntimeError(f"{self.image_format.label} output is not supported by this OpenCV build"
+                                   f"{'' if self.archive else ' or FFmpeg'}; choose another format")
+
+            # Build output directory: <chosen_out>/<video_stem>_frames or unique suffix
+            base_out = self.output_folder / f"{self.video_path.stem}_frames"
+            # Only loose image files are checkpointed; raw and archive output always start fresh
+            checkpointed = (self.image_format is not None and not self.archive and not self.keyframes_only
+                            and not self.scene_threshold and self.dedup_distance is None)
+            resumed = None
+            if checkpointed:
+                self._fps = fps_val or self._opencv_fps()
+            repairs: list[tuple[int, int, float]] = []
+            tail = True
+            if (self.resume or self.incremental) and checkpointed:
+                resumed = self._find_resume_point(base_out, start_s, end_s)
+                if resumed is None:
+                    self._message("No earlier extraction to continue; starting fresh.")
+            elif (self.resume or self.incremental) and (self.keyframes_only or self.scene_threshold
+                                                        or self.dedup_distance is not None):
+                logger.warning("Keyframe-only, scene-change and duplicate-skipping runs are not checkpointed; starting fresh")
+            elif self.resume or self.incremental:
+                logger.warning("Resume and incremental runs apply to image file output only; starting fresh")
+            if self._cancel:
+                self._message("Canceled by user.")
+                return ExtractionResult(False, True, str(resumed[0] if resumed else base_out), 0)
+            if resumed is not None:
+                out_dir, manifest, resume_at, repairs = resumed
+                done = int(manifest.get("frames_done") or 0)
+                tail = resume_at is not None
+                if not tail and not repairs:
+                    self._message(f"Extraction in {out_dir} is already complete ({done} frames).")
+                    ExtractionCheckpoint(out_dir, str(self.video_path), self._checkpoint_params(),
+                                         int(manifest.get("pad") or 6), str(manifest.get("ext")),
+                                         done, manifest.get("last_time")).finish(COMPLETE)
+                    return ExtractionResult(True, False, str(out_dir), done)
+                pad = int(manifest.get("pad") or 6)
+                self._first_number = done + 1
+                self._progress_base = done
+                frames_planned = max(0, frames_planned - done) if (frames_planned and tail) else 0
+                if tail:
+                    start_s = resume_at
+                    self._message(f"Resuming at frame {self._first_number} ({start_s:.3f}s) in {out_dir}…")
+                    logger.info("Resuming %s at frame %d, t=%.3f", out_dir, self._first_number, start_s)
+            else:
+                out_dir = base_out
+                idx_suffix = 1
+                while True:
+                    # Claim a new folder atomically; if it exists (an earlier run, or a concurrent
+                    # batch job for a video with the same name) try the next suffix
+                    try:
+                        out_dir.mkdir(parents=True, exist_ok=False)
+                        break
+                    except FileExistsError:
+                        out_dir = base_out.parent / f"{base_out.name}_{idx_suffix}"
+                        idx_suffix += 1
+
+                # Filename padding
+                pad = len(str(frames_planned)) if frames_planned and frames_planned > 0 else 6
+            if checkpointed:
+                self._checkpoint = ExtractionCheckpoint(out_dir, str(self.video_path), self._checkpoint_params(), pad,
+                                                        self.image_format.ext, self._first_number - 1,
+                                                        manifest.get("last_time") if resumed else None)
+                self._checkpoint.update(self._first_number - 1, self._checkpoint.last_time, force=True)
+                self._frame_index = FrameIndex(out_dir)
+
+            # Decoder order: benchmarked fastest first on Auto, else the chosen backend; OpenCV is the last resort
+            if self.backend == "auto":
+                order = select_backends(str(self.video_path), meta, ffmpeg_path, start_s, self.encoder_threads, self._message)
+            else:
+                chosen = get_backend(self.backend)
+                order = [chosen] if chosen is not None and chosen.available(ffmpeg_path) else []
+                if not order:
+                    logger.warning("Decoder backend %r is unavailable; using OpenCV", self.backend)
+            opencv_backend = get_backend("opencv")
+            if opencv_backend is not None and opencv_backend not in order:
+                order.append(opencv_backend)
+            if not cv2_encodes:
+                # Only FFmpeg can write this format
+                order = [b for b in order if b.kind == "ffmpeg"]
+                if not order:
+                    order = [get_backend("ffmpeg")]
+            logger.info("Decoder order: %s", ", ".join(b.name for b in order))
+
+            # Raw, archive and formats FFmpeg cannot encode take decoded frames through a pipe instead of FFmpeg's image muxer
+            pipe_mode = self.out_format in RAW_FORMATS or bool(self.archive) or not ffmpeg_encodes
+            if (self.keyframes_only and self.sample_every_t > 0) or self.dedup_distance is not None:
+                # Nearest keyframes and near-duplicates are picked from FFmpeg's piped frames
+                if not cv2_encodes:
+                    raise RuntimeError(f"Nearest-keyframe sampling and duplicate skipping encode with OpenCV, which "
+                                       f"cannot write {self.image_format.label}; choose another format")
+                pipe_mode = True
+            frame_size = None
+            if pipe_mode:
+                frame_size = (int(meta.get("width") or 0), int(meta.get("height") or 0))
+                if not all(frame_size):
+                    frame_size = self._opencv_frame_size()
+
+            # Segment-parallel decoding: one FFmpeg process per keyframe-aligned slice of the window
+            seg_backend = next((b for b in order if b.kind == "ffmpeg"), None)
+            if (self._first_number > 1 or repairs) and self.segments > 1:
+                logger.warning("Segment-parallel extraction does not resume; using a single decoder")
+            elif (self.keyframes_only or self.scene_threshold) and self.segments > 1:
+                logger.warning("Keyframe-only and scene-change extraction use a single decoder; Parallel segments is ignored")
+            elif pipe_mode and self.segments > 1:
+                logger.warning("Segment-parallel extraction needs FFmpeg-encoded image files; using a single decoder")
+            elif ffmpeg_path and seg_backend is not None and self.segments > 1:
+                try:
+                    self._watermark = None
+                    saved = self._run_ffmpeg_segments(ffmpeg_path, out_dir, pad, frames_planned or 0, start_s, end_s,
+                                                       fps_val, seg_backend)
+                    logger.info("Engine completed via FFmpeg segments: canceled=%s saved=%d", self._cancel, saved)
+                    return self._finish(out_dir, saved, frames_planned)
+                except Exception as e_seg:
+                    self._message(f"Segment-parallel extraction unavailable, using a single decoder…\n{e_seg}")
+                    logger.warning("FFmpeg segment-parallel path failed; using single decoder: %s", e_seg)
+            elif self.segments > 1:
+                logger.warning("Segment-parallel extraction needs FFmpeg; using a single decoder")
+
+            if repairs:
+                self._repair(repairs, order, ffmpeg_path, out_dir, pad, end_s, fps_val, pipe_mode, frame_size,
+                             cv2_encodes, frames_planned)
+            saved = 0
+            if tail and not self._cancel:
+                saved = self._decode_window(order, ffmpeg_path, out_dir, pad, frames_planned, start_s, end_s, fps_val,
+                                            pipe_mode, frame_size, cv2_encodes)
+            return self._finish(out_dir, saved, frames_planned)
+        except Exception:
+            if self._frame_index is not None:
+                self._frame_index.close()
+            if self._checkpoint is not None:
+                self._checkpoint_update(force=True)
+                self._checkpoint.finish(FAILED)
+            # Best-effort cleanup of any OpenCV handles
+            cap_count = locals().get('cap_count', None)
+            if cap_count is not None:
+                try:
+                    cap_count.release()
+                except Exception:
+                    pass
+            raise
+
+    def _finish(self, out_dir: Path, saved: int, frames_planned: int) -> ExtractionResult:
+        # Final progress update
+        if not self._cancel and frames_planned and frames_planned > 0:
+            self._progress(min(saved, frames_planned), frames_planned)
+        if self._frame_index is not None:
+            self._frame_index.close()
+        if self._checkpoint is not None:
+            self._checkpoint_update(saved, force=True)
+            self._checkpoint.finish(CANCELED if self._cancel else COMPLETE)
+        # Totals include frames written by the run being resumed
+        saved += self._first_number - 1
+        if self._cancel:
+            self._message("Canceled by user.")
+            return ExtractionResult(False, True, str(out_dir), saved)
+        self._message("Done.")
+        return ExtractionResult(True, False, str(out_dir), saved)
+
+    def _checkpoint_update(self, current: Optional[int] = None, force: bool = False) -> None:
+        if self._watermark is None:
+            if current is not None:
+                # Segments finish all at once and a finished repair has no decoder; keep the known time
+                frames_done = self._first_number - 1 + current
+                last_time = self._checkpoint.last_time if frames_done == self._checkpoint.frames_done else None
+                self._checkpoint.update(frames_done, last_time, force)
+            return
+        if current is None:
+            current = self._checkpoint.frames_done - self._first_number + 1
+        self._checkpoint.update(*self._watermark(current), force=force)
+
+    def _seek_after(self, frame_no: int, frame_time: Optional[float], start_s: float) -> Optional[float]:
+        """Time to seek to so the first frame kept is the one after `frame_no` (None if it cannot be located)."""
+        if frame_no <= 0:
+            return start_s
+        if frame_time is None:
+            # Only throttled checkpoints and the frame index carry exact times; fall back to the sampling grid
+            frame_time = self._grid_time(start_s, frame_no)
+        if frame_time is None:
+            return None
+        nxt = next_start_time(float(frame_time), self._checkpoint_params(), self._fps)
+        return None if nxt is None else max(start_s, nxt)
+
+    def _find_resume_point(self, base_out: Path, start_s: float, end_s: Optional[float]
+                           ) -> Optional[tuple[Path, dict, Optional[float], list[tuple[int, int, float]]]]:
+        """Earlier output folder to continue and what is left to do there.
+
+        Returns the folder, its manifest (``frames_done`` = last frame kept), the time to
+        seek to for the frames after it (None when the run was complete) and, for
+        incremental runs, the (first frame, count, seek time) ranges to re-extract.
+        """
+        found = find_resumable(base_out, str(self.video_path), self._checkpoint_params())
+        if found is None:
+            return None
+        out_dir, manifest = found
+        rows = load_frame_index(out_dir) if self.incremental else {}
+        repairs: list[tuple[int, int, float]] = []
+        if rows:
+            last = max(rows)
+            if manifest.get("status") == COMPLETE:
+                last = max(last, int(manifest.get("frames_done") or 0))
+            self._message(f"Verifying {len(rows)} frames in {out_dir}…")
+            bad = verify_frames(out_dir, rows, self.encoder_threads, lambda: self._cancel)
+            # Frames never indexed (lost rows, unfinished writes) are redone as well
+            bad |= {n for n in range(1, last + 1) if n not in rows}
+            for first, count in frame_ranges(bad):
+                seek = self._seek_after(first - 1, rows.get(first - 1, {}).get("time"), start_s)
+                if seek is None:
+                    raise RuntimeError(f"Cannot locate frame {first} in the source to re-extract it: frame rate unknown")
+                repairs.append((first, count, seek))
+            if bad:
+                rewrite_frame_index(out_dir, {n: row for n, row in rows.items() if n not in bad})
+            self._message(f"{len(bad)} of {last} frames missing or corrupt"
+                          + (f" in {len(repairs)} ranges." if repairs else "."))
+            manifest["frames_done"] = last
+            manifest["last_time"] = rows.get(last, {}).get("time")
+        else:
+            if self.incremental:
+                logger.info("No frame index in %s; continuing from its checkpoint", out_dir)
+            check_watermark(out_dir, manifest)
+        done = int(manifest.get("frames_done") or 0)
+        if manifest.get("status") == COMPLETE:
+            return out_dir, manifest, None, repairs
+        nxt = self._seek_after(done, manifest.get("last_time"), start_s)
+        if nxt is None:
+            logger.info("Cannot resume %s: no timestamp for frame %d", out_dir, done)
+            return None
+        if end_s is not None and nxt >= end_s:
+            nxt = None
+        return out_dir, manifest, nxt, repairs
+
+    def cancel(self) -> None:
+        self._cancel = True
+        logger.info("Engine cancel requested")
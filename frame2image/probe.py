@@ -0,0 +1,498 @@
+"""ffprobe/ffmpeg discovery, metadata probing and time helpers.
+
+Nothing in this module imports Qt or OpenCV, so it is safe to use from the
+headless CLI as well as the GUI.
+"""
+import os
+import re
+import sys
+import shutil
+import subprocess
+import json
+import bisect
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from .cache import default_cache, file_identity
+
+
+# -------------------------
+# Probe helpers (ffprobe)
+# -------------------------
+@lru_cache(maxsize=None)
+def _find_binary(name: str) -> Optional[str]:
+    """Locate an FFmpeg tool, preferring bundled copies over system PATH.
+
+    The lookup is memoized for the life of the process; call `_find_binary.cache_clear()`
+    after installing FFmpeg to search again.
+    """
+    exe = f"{name}.exe" if os.name == "nt" else name
+    # 1) PyInstaller onefile extraction dir
+    try:
+        meipass = getattr(sys, "_MEIPASS", None)
+        if meipass:
+            cand = Path(meipass) / exe
+            if cand.exists():
+                return str(cand)
+    except Exception:
+        pass
+    # 2) Next to the executable (onedir builds)
+    try:
+        exe_dir = Path(sys.executable).parent
+        cand = exe_dir / exe
+        if cand.exists():
+            return str(cand)
+    except Exception:
+        pass
+    # 3) Next to the app script (dev mode; the repository root)
+    try:
+        script_dir = Path(__file__).resolve().parent.parent
+        cand = script_dir / exe
+        if cand.exists():
+            return str(cand)
+    except Exception:
+        pass
+    # 4) System PATH
+    return shutil.which(name)
+
+
+def _ffprobe_path() -> Optional[str]:
+    """Locate ffprobe, preferring bundled copies over system PATH."""
+    return _find_binary("ffprobe")
+
+
+def _parse_fraction(frac: str) -> Optional[float]:
+    try:
+        if not frac or frac.upper() == "N/A":
+            return None
+        if "/" in frac:
+            n, d = frac.split("/", 1)
+            n = float(n)
+            d = float(d)
+            if d == 0:
+                return None
+            return n / d
+        # plain number
+        return float(frac)
+    except Exception:
+        return None
+
+
+def probe_total_frames_with_ffprobe(video_path: str) -> tuple[int, bool]:
+    """Return (frames, exact) using ffprobe when available.
+    exact=True when coming from nb_frames; otherwise an approximation via duration*fps.
+    """
+    fp = _ffprobe_path()
+    if not fp:
+        return 0, False
+    try:
+        cmd = [
+            fp,
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=nb_frames,avg_frame_rate,r_frame_rate:format=duration",
+            "-of", "json",
+            video_path,
+        ]
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        data = json.loads(out.stdout or "{}")
+        streams = data.get("streams", [])
+        fmt = data.get("format", {})
+        nb_frames_val = None
+        if streams:
+            nb_frames_val = streams[0].get("nb_frames")
+            avg_fr = _parse_fraction(streams[0].get("avg_frame_rate"))
+            r_fr = _parse_fraction(streams[0].get("r_frame_rate"))
+        else:
+            avg_fr = None
+            r_fr = None
+        # Prefer exact nb_frames when numeric
+        try:
+            if nb_frames_val not in (None, "N/A"):
+                frames = int(nb_frames_val)
+                if frames > 0:
+                    return frames, True
+        except Exception:
+            pass
+        # Approximate via duration * fps
+        dur_s = None
+        try:
+            d = fmt.get("duration")
+            if d and d != "N/A":
+                dur_s = float(d)
+        except Exception:
+            dur_s = None
+        fps = avg_fr or r_fr
+        if dur_s and fps and fps > 0:
+            frames = int(round(dur_s * fps))
+            if frames > 0:
+                return frames, False
+    except Exception:
+        pass
+    return 0, False
+
+
+# -------------------------
+# Additional probe helpers and time parsing
+# -------------------------
+def probe_video_metadata_with_ffprobe(video_path: str, use_cache: bool = True) -> dict:
+    """Return metadata dict using ffprobe when available.
+    Keys: frames, frames_exact, duration, fps, width, height, codec
+    Missing values will be None/0. Results are served from the persistent
+    metadata cache while the file is unchanged.
+    """
+    cache = default_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(video_path, "metadata")
+        if isinstance(cached, dict):
+            return cached
+    meta = {
+        "frames": 0,
+        "frames_exact": False,
+        "duration": None,
+        "fps": None,
+        "width": None,
+        "height": None,
+        "codec": None,
+    }
+    fp = _ffprobe_path()
+    if not fp:
+        return meta
+    try:
+        cmd = [
+            fp,
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries",
+            "stream=nb_frames,avg_frame_rate,r_frame_rate,width,height,codec_name:format=duration",
+            "-of", "json",
+            video_path,
+        ]
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        data = json.loads(out.stdout or "{}")
+        streams = data.get("streams", [])
+        fmt = data.get("format", {})
+        probed = bool(streams)
+
+        if streams:
+            s0 = streams[0]
+            # Frames
+            nb_frames_val = s0.get("nb_frames")
+            try:
+                if nb_frames_val not in (None, "N/A"):
+                    meta["frames"] = int(nb_frames_val)
+                    if meta["frames"] > 0:
+                        meta["frames_exact"] = True
+            except Exception:
+                pass
+            # FPS
+            avg_fr = _parse_fraction(s0.get("avg_frame_rate"))
+            r_fr = _parse_fraction(s0.get("r_frame_rate"))
+            meta["fps"] = avg_fr or r_fr
+            # Geometry
+            try:
+                meta["width"] = int(s0.get("width")) if s0.get("width") else None
+            except Exception:
+                meta["width"] = None
+            try:
+                meta["height"] = int(s0.get("height")) if s0.get("height") else None
+            except Exception:
+                meta["height"] = None
+            meta["codec"] = s0.get("codec_name")
+
+        # Duration
+        try:
+            d = fmt.get("duration")
+            if d and d != "N/A":
+                meta["duration"] = float(d)
+        except Exception:
+            meta["duration"] = None
+
+        # If frames unknown, approximate
+        if not meta["frames"] and meta["duration"] and meta["fps"]:
+            try:
+                est = int(round(meta["duration"] * meta["fps"]))
+                if est > 0:
+                    meta["frames"] = est
+                    meta["frames_exact"] = False
+            except Exception:
+                pass
+        if cache is not None and probed:
+            cache.put(video_path, "metadata", meta)
+    except Exception:
+        pass
+    return meta
+
+
+def probe_total_frames_precise_ffprobe(video_path: str, use_cache: bool = True) -> int:
+    """Use ffprobe -count_frames to get precise frame count when possible (can be slow).
+    Counts are cached persistently, so re-opening an unchanged file is instant.
+    """
+    cache = default_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(video_path, "precise_frames")
+        if isinstance(cached, int) and cached > 0:
+            return cached
+    fp = _ffprobe_path()
+    if not fp:
+        return 0
+    try:
+        cmd = [
+            fp,
+            "-v", "error",
+            "-count_frames",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=nb_read_frames",
+            "-of", "json",
+            video_path,
+        ]
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        data = json.loads(out.stdout or "{}")
+        streams = data.get("streams", [])
+        if streams:
+            val = streams[0].get("nb_read_frames")
+            try:
+                frames = int(val)
+                if frames > 0 and cache is not None:
+                    cache.put(video_path, "precise_frames", frames)
+                return frames if frames > 0 else 0
+            except Exception:
+                return 0
+    except Exception:
+        return 0
+    return 0
+
+
+def probe_packet_index(video_path: str, use_cache: bool = True) -> tuple[list[float], list[float]]:
+    """Return (packet_times, keyframe_times) for the first video stream, both sorted.
+
+    Uses ffprobe -show_packets, which only demuxes (no decoding), so it is fast even
+    on long files. Returns two empty lists when ffprobe is missing or fails. Results
+    are kept in the persistent metadata cache.
+    """
+    cache = default_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(video_path, "packet_index")
+        if isinstance(cached, dict) and cached.get("times"):
+            return list(cached["times"]), list(cached.get("keys") or [])
+    fp = _ffprobe_path()
+    if not fp:
+        return [], []
+    try:
+        cmd = [
+            fp,
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0",
+            video_path,
+        ]
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        times: list[float] = []
+        keys: list[float] = []
+        for line in (out.stdout or "").splitlines():
+            parts = line.strip().split(",")
+            if len(parts) < 2 or parts[0] in ("", "N/A"):
+                continue
+            try:
+                t = float(parts[0])
+            except Exception:
+                continue
+            times.append(t)
+            if "K" in parts[1]:
+                keys.append(t)
+        times.sort()
+        keys.sort()
+        if cache is not None and times:
+            cache.put(video_path, "packet_index", {"times": times, "keys": keys})
+        return times, keys
+    except Exception:
+        return [], []
+
+
+# Indexes of recently used files, keyed by file identity; each holds every packet time, so few are kept
+_INDEX_MEMO_SIZE = 4
+_index_memo: dict[tuple, "KeyframeIndex"] = {}
+_index_lock = threading.Lock()
+
+
+class KeyframeIndex:
+    """Packet and keyframe timestamps of the first video stream, in seconds from its first frame.
+
+    Times are shifted so the earliest packet is 0, matching what `ffmpeg -ss` and
+    OpenCV's CAP_PROP_POS_MSEC use for files whose stream does not start at 0.
+    """
+
+    def __init__(self, packet_times: list[float], keyframe_times: list[float]):
+        self.origin = packet_times[0] if packet_times else 0.0
+        self.packet_times = [t - self.origin for t in packet_times]
+        self.keyframe_times = [t - self.origin for t in keyframe_times]
+
+    @classmethod
+    def for_video(cls, video_path: str) -> Optional["KeyframeIndex"]:
+        """Build (or load from cache) the index; None when ffprobe is unavailable or finds no keyframes.
+
+        Indexes are also memoized in-process by the file's path, size, mtime and inode, so
+        repeated lookups during a run do not parse the cached packet list again.
+        """
+        ident = file_identity(video_path)
+        if ident is not None:
+            with _index_lock:
+                memo = _index_memo.get(ident)
+            if memo is not None:
+                return memo
+        times, keys = probe_packet_index(video_path)
+        if not times or not keys:
+            return None
+        index = cls(times, keys)
+        if ident is not None:
+            with _index_lock:
+                _index_memo.pop(ident, None)
+                _index_memo[ident] = index
+                while len(_index_memo) > _INDEX_MEMO_SIZE:
+                    del _index_memo[next(iter(_index_memo))]
+        return index
+
+    def keyframe_at_or_before(self, t: float) -> float:
+        i = bisect.bisect_right(self.keyframe_times, t + 1e-6) - 1
+        return self.keyframe_times[i] if i >= 0 else 0.0
+
+    def has_keyframe_between(self, a: float, b: float) -> bool:
+        """True when a keyframe lies in (a, b]."""
+        i = bisect.bisect_right(self.keyframe_times, a + 1e-6)
+        return i < len(self.keyframe_times) and self.keyframe_times[i] <= b + 1e-6
+
+    def packets_between(self, a: float, b: float) -> int:
+        """Number of packets (frames) with a <= t < b."""
+        return bisect.bisect_left(self.packet_times, b) - bisect.bisect_left(self.packet_times, a)
+
+    def packet_before(self, t: float) -> Optional[float]:
+        """Time of the last packet before `t`, or None."""
+        i = bisect.bisect_left(self.packet_times, t) - 1
+        return self.packet_times[i] if i >= 0 else None
+
+    def duration(self) -> float:
+        return self.packet_times[-1] if self.packet_times else 0.0
+
+
+def parse_time_to_seconds(s: Optional[str]) -> Optional[float]:
+    """Parse 'HH:MM:SS(.ms)' or 'MM:SS(.ms)' or 'SS(.ms)' into seconds."""
+    if not s:
+        return None
+    s = s.strip()
+    if not s:
+        return None
+    try:
+        parts = s.split(":")
+        parts = [p.strip() for p in parts]
+        if len(parts) == 1:
+            return float(parts[0])
+        if len(parts) == 2:
+            m = float(parts[0])
+            sec = float(parts[1])
+            return m * 60 + sec
+        if len(parts) == 3:
+            h = float(parts[0])
+            m = float(parts[1])
+            sec = float(parts[2])
+            return h * 3600 + m * 60 + sec
+    except Exception:
+        return None
+    return None
+
+
+def format_seconds(secs: float) -> str:
+    try:
+        secs = max(0, int(round(secs)))
+        h = secs // 3600
+        m = (secs % 3600) // 60
+        s = secs % 60
+        if h > 0:
+            return f"{h:d}:{m:02d}:{s:02d}"
+        return f"{m:d}:{s:02d}"
+    except Exception:
+        return "--:--"
+
+
+def find_ffmpeg() -> Optional[str]:
+    """Locate ffmpeg, preferring bundled copies over system PATH."""
+    return _find_binary("ffmpeg")
+
+
+# -------------------------
+# FFmpeg capabilities (cached)
+# -------------------------
+_caps_memo: dict[tuple, dict] = {}
+_caps_lock = threading.Lock()
+
+
+def _ffmpeg_listing(ffmpeg_path: str, flag: str) -> list[str]:
+    """Names from `ffmpeg -encoders` / `-filters` style tables (the column after the flags)."""
+    try:
+        out = subprocess.run([ffmpeg_path, "-hide_banner", flag], capture_output=True, text=True, timeout=15)
+    except Exception:
+        return []
+    names = []
+    for line in out.stdout.splitlines():
+        parts = line.split()
+        # Rows look like " V....D png  PNG ..." or " TSC scale  V->V ...", legend lines have "=" second
+        if len(parts) >= 3 and parts[1] != "=" and re.fullmatch(r"[A-Z.|]{3,6}", parts[0]):
+            names.append(parts[1])
+    return names
+
+
+def _probe_ffmpeg_capabilities(ffmpeg_path: str) -> dict:
+    caps: dict = {"path": ffmpeg_path, "version": None, "hwaccels": [], "encoders": [], "filters": []}
+    try:
+        out = subprocess.run([ffmpeg_path, "-version"], capture_output=True, text=True, timeout=15)
+        first = (out.stdout.splitlines() or [""])[0]
+        if first.startswith("ffmpeg version "):
+            caps["version"] = first.split()[2]
+    except Exception:
+        pass
+    try:
+        out = subprocess.run([ffmpeg_path, "-hide_banner", "-hwaccels"], capture_output=True, text=True, timeout=15)
+        for line in out.stdout.splitlines():
+            line = line.strip().lower()
+            if line and not line.endswith(":"):
+                caps["hwaccels"].append(line)
+    except Exception:
+        pass
+    caps["encoders"] = _ffmpeg_listing(ffmpeg_path, "-encoders")
+    caps["filters"] = _ffmpeg_listing(ffmpeg_path, "-filters")
+    return caps
+
+
+def ffmpeg_capabilities(ffmpeg_path: str, use_cache: bool = True) -> dict:
+    """Version, hwaccels, encoders and filters of an FFmpeg binary.
+
+    Keys: path, version, hwaccels, encoders, filters. Results are memoized in-process
+    and persisted in the metadata cache keyed by the binary's path, size and mtime,
+    so replacing or upgrading FFmpeg triggers a fresh probe.
+    """
+    ident = file_identity(ffmpeg_path)
+    memo_key = ident or (ffmpeg_path,)
+    with _caps_lock:
+        if use_cache and memo_key in _caps_memo:
+            return _caps_memo[memo_key]
+    cache = default_cache() if (use_cache and ident) else None
+    caps = cache.get(ffmpeg_path, "ffmpeg_capabilities") if cache is not None else None
+    if not isinstance(caps, dict):
+        caps = _probe_ffmpeg_capabilities(ffmpeg_path)
+        if cache is not None and caps.get("version"):
+            cache.put(ffmpeg_path, "ffmpeg_capabilities", caps)
+    with _caps_lock:
+        _caps_memo[memo_key] = caps
+    return caps
+
+
+def ffmpeg_hwaccels(ffmpeg_path: str) -> list[str]:
+    """Hardware acceleration methods listed by `ffmpeg -hwaccels` (empty on error)."""
+    return list(ffmpeg_capabilities(ffmpeg_path).get("hwaccels") or [])
+
+
+def ffmpeg_supports_cuda(ffmpeg_path: str) -> bool:
+    accels = ffmpeg_hwaccels(ffmpeg_path)
+    return ("cuda" in accels) or ("nvdec" in accels)
@@ -0,0 +1,131 @@
+"""Raw frame output: one memory-mappable array file (or a byte stream) instead of images.
+
+Frames are appended as packed BGR uint8 (height x width x 3) to a single file:
+
+- ``npy``: a NumPy ``.npy`` file whose header is rewritten with the final frame count
+  on close, so ``np.load(path, mmap_mode="r")`` returns an (N, H, W, 3) array.
+- ``raw``: the same bytes without a header, or streamed to stdout (``-``) / a named pipe.
+
+A JSON sidecar next to the output records shape, dtype, pixel format and the source
+timestamp (seconds) of every frame, so consumers can ``np.memmap`` raw output too.
+"""
+import json
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Optional
+
+RAW_FORMATS = ("npy", "raw")
+
+# Fixed .npy header size so the frame count can be patched in place on close
+_NPY_HEADER_BYTES = 128
+
+
+def _npy_header(shape: tuple[int, ...]) -> bytes:
+    """NPY v1.0 header for a C-ordered uint8 array, padded to _NPY_HEADER_BYTES."""
+    body = "{'descr': '|u1', 'fortran_order': False, 'shape': (%s), }" % ", ".join(str(int(d)) for d in shape)
+    prefix = b"\x93NUMPY\x01\x00"
+    room = _NPY_HEADER_BYTES - len(prefix) - 2
+    if len(body) + 1 > room:
+        raise ValueError(f"shape {shape} does not fit the reserved .npy header")
+    text = body.ljust(room - 1) + "\n"
+    return prefix + struct.pack("<H", room) + text.encode("latin1")
+
+
+class RawFrameWriter:
+    """Append BGR uint8 frames to one file or stream and describe them in a JSON sidecar.
+
+    `path` is the data file (``frames.npy``/``frames.raw``); with `stream_to` the bytes go
+    to stdout (``"-"``) or that path (e.g. a FIFO) instead and `path` only names the sidecar.
+    """
+
+    def __init__(self, path: Path, fmt: str = "npy", stream_to: Optional[str] = None,
+                 shape: Optional[tuple[int, int]] = None):
+        self.path = Path(path)
+        self.fmt = "raw" if stream_to else fmt
+        self.stream_to = stream_to
+        self.frames = 0
+        self.timestamps: list[Optional[float]] = []
+        self._frame_shape: Optional[tuple[int, int, int]] = (int(shape[0]), int(shape[1]), 3) if shape else None
+        self._frame_bytes = 0
+        self._own_handle = True
+        if stream_to == "-":
+            self._fh = sys.stdout.buffer
+            self._own_handle = False
+        elif stream_to:
+            self._fh = open(stream_to, "wb")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "wb")
+            if self.fmt == "npy":
+                self._fh.write(_npy_header((0, 0, 0, 3)))
+
+    @property
+    def sidecar_path(self) -> Path:
+        return self.path.with_suffix(".json")
+
+    def _check_shape(self, shape: tuple[int, int, int]) -> None:
+        if self._frame_shape is None:
+            self._frame_shape = shape
+        elif shape != self._frame_shape:
+            raise RuntimeError(f"Frame size changed from {self._frame_shape} to {shape}; raw output needs a fixed size")
+        self._frame_bytes = shape[0] * shape[1] * shape[2]
+
+    def write(self, frame, t: Optional[float] = None) -> None:
+        """Append one BGR uint8 ndarray (H x W x 3)."""
+        if frame.ndim != 3 or frame.shape[2] != 3 or frame.dtype.itemsize != 1:
+            raise RuntimeError(f"Unsupported frame layout for raw output: shape={frame.shape} dtype={frame.dtype}")
+        self._check_shape(tuple(int(d) for d in frame.shape))
+        self._fh.write(memoryview(frame if frame.flags["C_CONTIGUOUS"] else frame.copy()).cast("B"))
+        self.frames += 1
+        self.timestamps.append(t)
+
+    def write_bytes(self, data: bytes, t: Optional[float] = None) -> None:
+        """Append one frame already packed as BGR24 bytes (shape must be known)."""
+        if self._frame_shape is None:
+            raise RuntimeError("Frame size unknown for raw byte input")
+        self._check_shape(self._frame_shape)
+        if len(data) != self._frame_bytes:
+            raise RuntimeError(f"Short frame: {len(data)} of {self._frame_bytes} bytes")
+        self._fh.write(data)
+        self.frames += 1
+        self.timestamps.append(t)
+
+    def close(self, extra: Optional[dict] = None) -> int:
+        """Finalize the header (npy) and write the sidecar. Returns the number of frames."""
+        h, w, c = self._frame_shape or (0, 0, 3)
+        try:
+            if self.fmt == "npy" and not self.stream_to:
+                self._fh.seek(0)
+                self._fh.write(_npy_header((self.frames, h, w, c)))
+            self._fh.flush()
+        finally:
+            if self._own_handle:
+                self._fh.close()
+        info = {
+            "format": self.fmt,
+            "file": self.stream_to if self.stream_to else self.path.name,
+            "dtype": "uint8",
+            "pixel_format": "bgr24",
+            "shape": [self.frames, h, w, c],
+            "header_bytes": _NPY_HEADER_BYTES if (self.fmt == "npy" and not self.stream_to) else 0,
+            "frame_bytes": h * w * c,
+            "timestamps": [round(t, 6) if t is not None else None for t in self.timestamps],
+        }
+        info.update(extra or {})
+        self.sidecar_path.write_text(json.dumps(info, indent=1), encoding="utf-8")
+        return self.frames
+
+    def abort(self) -> None:
+        """Drop partial output (used before falling back to another decoder)."""
+        try:
+            if self._own_handle:
+                self._fh.close()
+        except Exception:
+            pass
+        if not self.stream_to:
+            try:
+                os.remove(self.path)
+            except Exception:
+                pass
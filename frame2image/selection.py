@@ -0,0 +1,164 @@
+"""Content-based frame selection on small grayscale thumbnails.
+
+`SceneDetector` keeps frames at scene changes. It scores each frame against the
+previous one the way FFmpeg's ``select`` filter computes ``scene``: the mean absolute
+pixel difference (0-255 scale), limited by how much that difference changed since
+the previous frame so steady motion or noise does not read as a cut, divided by 100
+and clipped to 0..1. FFmpeg backends use the filter itself; the OpenCV and PyAV
+decoders compute the score here on a `THUMB_WIDTH`-pixel-wide luma thumbnail, which
+costs a fraction of a millisecond per frame.
+
+`DedupFrameSink` drops near-duplicates on the way into any frame sink: each frame's
+64-bit difference hash (dHash of a 9x8 grayscale thumbnail) is compared with the
+last kept frame's, and frames within `max_distance` differing bits are skipped.
+The skipped runs are listed in ``duplicates.csv`` next to the output.
+"""
+import csv
+from pathlib import Path
+from typing import Optional
+
+# Width of the grayscale thumbnails the detectors compare
+THUMB_WIDTH = 64
+DUPLICATES_NAME = "duplicates.csv"
+
+
+def thumb_size(width: int, height: int, thumb_width: int = THUMB_WIDTH) -> tuple[int, int]:
+    """(width, height) of the thumbnail for a `width` x `height` frame, keeping the aspect ratio."""
+    w = max(1, min(int(thumb_width), int(width)))
+    h = max(1, int(round(int(height) * w / max(1, int(width)))))
+    return w, h
+
+
+def gray_thumbnail(frame, thumb_width: int = THUMB_WIDTH):
+    """Small uint8 grayscale copy of a BGR (or already gray) frame."""
+    import cv2
+
+    small = cv2.resize(frame, thumb_size(frame.shape[1], frame.shape[0], thumb_width), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small
+
+
+def pyav_thumbnail(frame, thumb_width: int = THUMB_WIDTH):
+    """Grayscale thumbnail of a PyAV VideoFrame, scaled by libswscale without a full-size BGR copy."""
+    w, h = thumb_size(frame.width, frame.height, thumb_width)
+    return frame.reformat(width=w, height=h, format="gray").to_ndarray()
+
+
+class SceneDetector:
+    """Decides per frame whether it starts a new scene (score above `threshold`).
+
+    The first frame is always kept so every shot, including the opening one, is
+    represented. Feed frames in order; each is compared with the frame fed before it.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = float(threshold)
+        self._prev = None
+        self._prev_mafd: Optional[float] = None
+        self.last_score = 0.0
+
+    def score(self, thumb) -> float:
+        """Scene score of this thumbnail against the previous one (0 for the first)."""
+        import numpy as np
+
+        prev, self._prev = self._prev, thumb
+        if prev is None or prev.shape != thumb.shape:
+            self._prev_mafd = None
+            return 0.0
+        mafd = float(np.abs(thumb.astype(np.int16) - prev).mean())
+        diff = abs(mafd - self._prev_mafd) if self._prev_mafd is not None else mafd
+        self._prev_mafd = mafd
+        return min(1.0, max(0.0, min(mafd, diff) / 100.0))
+
+    def is_cut(self, thumb) -> bool:
+        first = self._prev is None
+        self.last_score = self.score(thumb)
+        return first or self.last_score > self.threshold
+
+
+# -------------------------
+# Near-duplicate suppression
+# -------------------------
+def dhash(frame) -> int:
+    """64-bit difference hash: whether each pixel of a 9x8 grayscale thumbnail is brighter than its right neighbour."""
+    import cv2
+    import numpy as np
+
+    small = cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class DedupFrameSink:
+    """Wraps a frame sink and skips frames within `max_distance` dHash bits of the last kept frame.
+
+    Skipped runs are recorded as (kept frame, first/last skipped timestamp, count) rows
+    in `sidecar`, written on close. Frame numbers count kept frames from `start_number`.
+    """
+
+    def __init__(self, sink, max_distance: int, sidecar: Path, shape: Optional[tuple[int, int]] = None,
+                 start_number: int = 1):
+        self.sink = sink
+        self.max_distance = int(max_distance)
+        self.sidecar = Path(sidecar)
+        self.shape = shape
+        self.start_number = start_number
+        self.kept = 0
+        self.skipped = 0
+        self._last_hash: Optional[int] = None
+        self._runs: list[list] = []  # [kept frame, first time, last time, count]
+        self._in_run = False
+
+    @property
+    def frames(self) -> int:
+        return self.sink.frames
+
+    def write(self, frame, t: Optional[float] = None) -> None:
+        h = dhash(frame)
+        if self._last_hash is not None and hamming(h, self._last_hash) <= self.max_distance:
+            self.skipped += 1
+            if self._in_run:
+                run = self._runs[-1]
+                run[2] = t
+                run[3] += 1
+            else:
+                self._runs.append([self.start_number + self.kept - 1, t, t, 1])
+                self._in_run = True
+            return
+        self._last_hash = h
+        self._in_run = False
+        self.kept += 1
+        self.sink.write(frame, t)
+
+    def write_bytes(self, data: bytes, t: Optional[float] = None) -> None:
+        """Accept one packed BGR24 frame (as piped from FFmpeg); needs `shape`."""
+        import numpy as np
+
+        if self.shape is None:
+            raise RuntimeError("Frame size unknown for raw byte input")
+        self.write(np.frombuffer(data, dtype=np.uint8).reshape(self.shape[0], self.shape[1], 3), t)
+
+    def _write_sidecar(self) -> None:
+        with open(self.sidecar, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["kept_frame", "first_time", "last_time", "skipped"])
+            for kept, first, last, count in self._runs:
+                writer.writerow([kept, "" if first is None else f"{first:.6f}", "" if last is None else f"{last:.6f}", count])
+
+    def close(self, extra: Optional[dict] = None) -> int:
+        extra = dict(extra or {})
+        extra["duplicates_skipped"] = self.skipped
+        try:
+            return self.sink.close(extra)
+        finally:
+            self._write_sidecar()
+
+    def abort(self) -> None:
+        self.sink.abort()
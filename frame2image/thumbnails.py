@@ -0,0 +1,163 @@
+"""Keyframe-only thumbnail strips for the preview filmstrip.
+
+Each thumbnail is produced by its own short ffmpeg run that seeks to the slot's
+timestamp and decodes only keyframes (`-skip_frame nokey`), so a strip costs a
+handful of keyframe decodes no matter how long the video is. Finished strips are
+stored as JPEG files under the user cache dir, keyed by the file's identity, and
+the oldest strips are removed once more than `MAX_CACHED_STRIPS` videos are cached.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from .cache import cache_dir, file_identity
+from .probe import find_ffmpeg
+
+logger = logging.getLogger("frame2image")
+
+MAX_CACHED_STRIPS = 64
+
+_prune_lock = threading.Lock()
+
+
+def thumbnails_root() -> Path:
+    return cache_dir() / "thumbnails"
+
+
+def thumbnail_times(duration_s: float, count: int) -> list[float]:
+    """Slot-centred timestamps for `count` thumbnails across `duration_s` seconds."""
+    if duration_s <= 0 or count <= 0:
+        return []
+    step = duration_s / count
+    return [(i + 0.5) * step for i in range(count)]
+
+
+def strip_dir(video_path: str, count: int, height: int) -> Optional[Path]:
+    """Cache folder for one video's strip, or None if the file cannot be stat'ed."""
+    ident = file_identity(video_path)
+    if ident is None:
+        return None
+    key = hashlib.sha1(repr((ident, int(count), int(height))).encode("utf-8")).hexdigest()[:20]
+    return thumbnails_root() / key
+
+
+def extract_keyframe_thumbnail(ffmpeg_path: str, video_path: str, t: float, height: int,
+                               timeout: float = 20.0) -> Optional[bytes]:
+    """Return JPEG bytes of the keyframe at or before `t`, scaled to `height` pixels."""
+    cmd = [
+        ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostdin",
+        "-skip_frame", "nokey",
+        "-ss", f"{max(0.0, t):.3f}", "-noaccurate_seek",
+        "-i", video_path,
+        "-an", "-sn", "-dn",
+        "-frames:v", "1",
+        # The keyframe lands before the seek point (negative timestamp); keep it anyway
+        "-vsync", "0",
+        "-vf", f"scale=-2:{int(height)}",
+        "-q:v", "5",
+        "-f", "image2pipe", "-c:v", "mjpeg", "pipe:1",
+    ]
+    try:
+        out = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    except Exception as e:
+        logger.debug("Thumbnail at %.3fs failed for %s: %s", t, video_path, e)
+        return None
+    if out.returncode != 0 or not out.stdout:
+        logger.debug("Thumbnail at %.3fs failed for %s: %s", t, video_path,
+                     out.stderr.decode("utf-8", "ignore").strip()[-200:])
+        return None
+    return out.stdout
+
+
+def generate_thumbnails(video_path: str, duration_s: float, count: int = 12, height: int = 64,
+                        on_thumb: Optional[Callable[[int, float, bytes], None]] = None,
+                        should_cancel: Optional[Callable[[], bool]] = None,
+                        use_cache: bool = True) -> list[Optional[bytes]]:
+    """Build (or load) a strip of `count` keyframe thumbnails, reporting each one as it is ready.
+
+    `on_thumb(index, seconds, jpeg_bytes)` fires per thumbnail, cached ones first. Slots
+    that could not be decoded are None. A canceled run keeps what it already wrote so
+    the next run only fills the gaps.
+    """
+    times = thumbnail_times(duration_s, count)
+    thumbs: list[Optional[bytes]] = [None] * len(times)
+    if not times:
+        return thumbs
+    folder = strip_dir(video_path, count, height) if use_cache else None
+    if folder is not None and folder.is_dir():
+        try:
+            # Mark as recently used for pruning
+            os.utime(folder)
+        except Exception:
+            pass
+    missing: list[int] = []
+    for i, t in enumerate(times):
+        data = None
+        if folder is not None:
+            try:
+                data = (folder / f"{i:03d}.jpg").read_bytes()
+            except Exception:
+                data = None
+        if data:
+            thumbs[i] = data
+            if on_thumb is not None:
+                on_thumb(i, t, data)
+        else:
+            missing.append(i)
+    if not missing:
+        return thumbs
+    ffmpeg_path = find_ffmpeg()
+    if not ffmpeg_path:
+        logger.info("Filmstrip unavailable for %s: FFmpeg not found", video_path)
+        return thumbs
+    if folder is not None:
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+        except Exception:
+            folder = None
+    t0 = time.time()
+    for i in missing:
+        if should_cancel is not None and should_cancel():
+            break
+        data = extract_keyframe_thumbnail(ffmpeg_path, video_path, times[i], height)
+        if not data:
+            continue
+        thumbs[i] = data
+        if folder is not None:
+            try:
+                tmp = folder / f"{i:03d}.jpg.tmp"
+                tmp.write_bytes(data)
+                tmp.replace(folder / f"{i:03d}.jpg")
+            except Exception:
+                pass
+        if on_thumb is not None:
+            on_thumb(i, times[i], data)
+    logger.debug("Filmstrip for %s: %d thumbnails decoded in %.2fs", video_path, len(missing), time.time() - t0)
+    if folder is not None:
+        _prune_strips(keep=folder)
+    return thumbs
+
+
+def _prune_strips(keep: Optional[Path] = None) -> None:
+    """Remove the least recently written strips beyond MAX_CACHED_STRIPS."""
+    with _prune_lock:
+        try:
+            dirs = [d for d in thumbnails_root().iterdir() if d.is_dir() and d != keep]
+        except Exception:
+            return
+        excess = len(dirs) + (1 if keep is not None else 0) - MAX_CACHED_STRIPS
+        if excess <= 0:
+            return
+        dirs.sort(key=lambda d: d.stat().st_mtime)
+        for d in dirs[:excess]:
+            shutil.rmtree(d, ignore_errors=True)
+
+
+def clear_thumbnails() -> None:
+    shutil.rmtree(thumbnails_root(), ignore_errors=True)
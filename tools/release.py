@@ -7,7 +7,7 @@ Usage examples:
   python tools/release.py --version 0.1.2 --date 2025-08-23 --push
 
 What it does:
-- Update __version__ in app.py
+- Update __version__ in frame2image/__init__.py
 - Ensure CHANGELOG.md has a section for vX.Y.Z with the given date
 - Optionally git add/commit/tag/push
 
@@ -26,7 +26,7 @@ import sys
 from pathlib import Path
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
-APP_FILE = REPO_ROOT / "app.py"
+APP_FILE = REPO_ROOT / "frame2image" / "__init__.py"
 CHANGELOG = REPO_ROOT / "CHANGELOG.md"
 
 VERSION_RE = re.compile(r'(^\s*__version__\s*=\s*")[^"]+("\s*$)', re.MULTILINE)
@@ -42,14 +42,14 @@ def run(cmd: list[str]) -> int:
 def update_app_version(new_version: str) -> None:
     text = APP_FILE.read_text(encoding="utf-8")
     if "__version__" not in text:
-        print("ERROR: __version__ not found in app.py", file=sys.stderr)
+        print(f"ERROR: __version__ not found in {APP_FILE.name}", file=sys.stderr)
         sys.exit(1)
     new_text = VERSION_RE.sub(rf'__version__ = "{new_version}"', text)
     if new_text == text:
-        print("app.py version already set or pattern not changed; continuing…")
+        print("Version already set or pattern not changed; continuing…")
     else:
         APP_FILE.write_text(new_text, encoding="utf-8")
-        print(f"Updated app.py to __version__={new_version}")
+        print(f"Updated frame2image/__init__.py to __version__={new_version}")
 
 
 def ensure_changelog_version(new_version: str, date_str: str) -> None:
@@ -94,7 +94,7 @@ def main() -> int:
     date_str = args.date or dt.date.today().isoformat()
 
     if not APP_FILE.exists() or not CHANGELOG.exists():
-        print("ERROR: Run from repository; app.py or CHANGELOG.md missing.", file=sys.stderr)
+        print("ERROR: Run from repository; frame2image/__init__.py or CHANGELOG.md missing.", file=sys.stderr)
         return 1
 
     update_app_version(new_version)